@@ -0,0 +1,98 @@
+"""
+Module de précalcul des images d'une carte animée (année par année / mois par mois)
+"""
+
+import numpy as np
+import pandas as pd
+from typing import List, Dict
+
+from .core.ingest import lambert93_to_wgs84
+
+# Codes compacts des catégories (int8) utilisés dans les images
+CATEGORY_CODES = {'Petit feu': 0, 'Feu moyen': 1, 'Grand feu': 2}
+
+BUFFER_POINTS = 50
+
+
+def _period_codes(dates: pd.Series, period: str) -> np.ndarray:
+    """Code entier de période : année (AAAA) ou mois (AAAA * 12 + mois - 1)"""
+    if period == 'M':
+        return (dates.dt.year * 12 + dates.dt.month - 1).to_numpy(dtype=np.int64)
+    return dates.dt.year.to_numpy(dtype=np.int64)
+
+
+def _period_label(code: int, period: str) -> str:
+    if period == 'M':
+        return f"{code % 12 + 1:02d}/{code // 12}"
+    return str(code)
+
+
+def _split_by_period(codes: np.ndarray, periods: np.ndarray) -> np.ndarray:
+    """Bornes (offsets) de chaque période dans un tableau trié par code"""
+    return np.searchsorted(codes, np.append(periods, periods[-1] + 1)) if len(periods) else np.array([0])
+
+
+def precompute_animation_frames(df: pd.DataFrame, big_fires: pd.DataFrame,
+                                analysis_results: List[Dict], buffer_radius_km: float,
+                                period: str = 'Y') -> Dict:
+    """
+    Précalcule les images de l'animation sous forme de tableaux compacts
+    Chaque couche (points, grands feux validés, buffers) est un tableau unique trié par période
+    accompagné de ses offsets : l'image i correspond à la tranche offsets[i]:offsets[i+1]
+    """
+    df_valid = df[df['date_alerte'].notna()]
+    point_codes = _period_codes(df_valid['date_alerte'], period)
+
+    # Grands feux validés
+    valid_mask = np.array([r['condition_met'] for r in analysis_results], dtype=bool)
+    if len(big_fires) == 0 or len(valid_mask) == 0:
+        valid_mask = np.zeros(len(big_fires), dtype=bool)
+    bf_valid = big_fires[valid_mask]
+    bf_codes = _period_codes(bf_valid['date_alerte'], period)
+
+    periods = np.unique(np.concatenate([point_codes, bf_codes]))
+    if period == 'M' and len(periods) > 0:
+        # Série continue de mois pour un défilement régulier
+        periods = np.arange(periods.min(), periods.max() + 1)
+
+    # Couche 1 : tous les feux de la période
+    order = np.argsort(point_codes, kind='stable')
+    lat, lon = lambert93_to_wgs84(df_valid['x'].to_numpy()[order], df_valid['y'].to_numpy()[order])
+    cat = df_valid['categorie'].map(CATEGORY_CODES).fillna(0).to_numpy(dtype=np.int8)[order]
+    points = {
+        'lat': lat.astype(np.float32),
+        'lon': lon.astype(np.float32),
+        'cat': cat,
+        'offsets': _split_by_period(point_codes[order], periods)
+    }
+
+    # Couche 2 : grands feux validés
+    order_bf = np.argsort(bf_codes, kind='stable')
+    lat_bf, lon_bf = lambert93_to_wgs84(bf_valid['x'].to_numpy()[order_bf], bf_valid['y'].to_numpy()[order_bf])
+    big = {
+        'lat': lat_bf.astype(np.float32),
+        'lon': lon_bf.astype(np.float32),
+        'surface': bf_valid['surface_ha'].to_numpy(dtype=np.float32)[order_bf],
+        'commune': bf_valid['commune'].to_numpy(dtype=object)[order_bf],
+        'date': bf_valid['date_alerte'].dt.strftime('%d/%m/%Y').to_numpy(dtype=object)[order_bf],
+        'offsets': _split_by_period(bf_codes[order_bf], periods)
+    }
+
+    # Couche 3 : cercles des buffers, séparés par NaN pour tenir dans une seule trace
+    radius_deg = buffer_radius_km * 0.009
+    angles = 2 * np.pi * np.arange(BUFFER_POINTS + 1) / BUFFER_POINTS
+    nan_col = np.full((len(lat_bf), 1), np.nan)
+    circle_lat = np.hstack([lat_bf[:, None] + radius_deg * np.cos(angles)[None, :], nan_col])
+    circle_lon = np.hstack([lon_bf[:, None] + radius_deg * np.sin(angles)[None, :] / 0.72, nan_col])
+    buffers = {
+        'lat': circle_lat.astype(np.float32),
+        'lon': circle_lon.astype(np.float32)
+    }
+
+    return {
+        'period': period,
+        'labels': [_period_label(int(c), period) for c in periods],
+        'points': points,
+        'big': big,
+        'buffers': buffers
+    }
@@ -0,0 +1,186 @@
+"""
+Module d'autocorrélation spatiale : indices de Moran global et local (LISA) par année
+"""
+
+from typing import TYPE_CHECKING, Dict, Tuple
+import numpy as np
+import pandas as pd
+
+# scipy.sparse n'est chargé qu'au premier calcul
+if TYPE_CHECKING:
+    from scipy import sparse
+
+from .hotspots import distance_band_weights
+
+# Quadrants LISA (0 : non significatif)
+LISA_QUADRANTS = ['Non significatif', 'Haut-Haut', 'Bas-Haut', 'Bas-Bas', 'Haut-Bas']
+
+# Variables analysées par cellule et par année
+MORAN_VARIABLES = {
+    'nb_feux': 'Nombre de feux',
+    'surface_ha': 'Surface brûlée (log)'
+}
+
+# Nombre d'éléments (cellules × permutations × voisins) traités par bloc
+_CHUNK_ELEMENTS = 4_000_000
+
+
+def row_standardize(weights: 'sparse.csr_matrix') -> 'sparse.csr_matrix':
+    """Normalise les poids par ligne (les cellules isolées gardent une ligne nulle)"""
+    from scipy import sparse
+    row_sum = np.asarray(weights.sum(axis=1)).ravel()
+    scale = np.divide(1.0, row_sum, out=np.zeros_like(row_sum), where=row_sum > 0)
+    return sparse.csr_matrix(sparse.diags(scale) @ weights)
+
+
+def _folded_p_values(observed: np.ndarray, simulated: np.ndarray) -> np.ndarray:
+    """p-values de permutation (queue la plus proche de l'observé), simulations sur le dernier axe"""
+    n_permutations = simulated.shape[-1]
+    larger = (simulated >= observed[..., None]).sum(axis=-1)
+    larger = np.minimum(larger, n_permutations - larger)
+    return (larger + 1) / (n_permutations + 1)
+
+
+def global_moran(values: np.ndarray, weights: 'sparse.csr_matrix', n_permutations: int = 999,
+                 rng: np.random.Generator = None) -> Dict:
+    """
+    I de Moran global
+    Les permutations sont les colonnes d'une matrice n × P : un seul produit creux W @ Z
+    donne les décalages spatiaux de toutes les permutations
+    """
+    rng = rng or np.random.default_rng(0)
+    n = len(values)
+    s0 = weights.sum()
+    z = values - values.mean()
+    zz = z @ z
+    if n < 3 or zz == 0 or s0 == 0:
+        return {'I': np.nan, 'esperance': -1 / max(n - 1, 1), 'p_value': np.nan}
+
+    moran_i = n / s0 * (z @ (weights @ z)) / zz
+    result = {'I': moran_i, 'esperance': -1 / (n - 1), 'p_value': np.nan}
+    if n_permutations > 0:
+        z_perm = z[rng.random((n, n_permutations)).argsort(axis=0)]
+        simulated = n / s0 * (z_perm * (weights @ z_perm)).sum(axis=0) / zz
+        result['p_value'] = float(_folded_p_values(np.array(moran_i), simulated))
+    return result
+
+
+def local_moran(values: np.ndarray, weights: 'sparse.csr_matrix', n_permutations: int = 999,
+                rng: np.random.Generator = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    I de Moran local (LISA) avec permutations conditionnelles
+    Un même tirage (P × k_max) d'indices parmi les n-1 autres cellules sert à toutes les cellules ;
+    les décalages simulés sont calculés par blocs de cellules, permutations en colonnes
+    Retourne: (I local, p-value, quadrant)
+    """
+    rng = rng or np.random.default_rng(0)
+    n = len(values)
+    z = values - values.mean()
+    m2 = (z @ z) / n
+    if n < 3 or m2 == 0:
+        return np.zeros(n), np.ones(n), np.zeros(n, dtype=np.int8)
+
+    lag = weights @ z
+    local_i = z * lag / m2
+
+    quadrant = np.zeros(n, dtype=np.int8)
+    quadrant[(z > 0) & (lag > 0)] = 1
+    quadrant[(z < 0) & (lag > 0)] = 2
+    quadrant[(z < 0) & (lag < 0)] = 3
+    quadrant[(z > 0) & (lag < 0)] = 4
+
+    if n_permutations <= 0:
+        return local_i, np.full(n, np.nan), quadrant
+
+    # Poids de chaque cellule alignés à gauche dans une matrice n × k_max
+    degree = np.diff(weights.indptr)
+    k_max = int(degree.max())
+    if k_max == 0:
+        return local_i, np.ones(n), np.zeros(n, dtype=np.int8)
+    positions = np.arange(weights.nnz) - np.repeat(weights.indptr[:-1], degree)
+    padded = np.zeros((n, k_max))
+    padded[np.repeat(np.arange(n), degree), positions] = weights.data
+
+    draws = rng.random((n_permutations, n - 1)).argpartition(k_max - 1, axis=1)[:, :k_max]
+    p_values = np.empty(n)
+    chunk = max(1, _CHUNK_ELEMENTS // (n_permutations * k_max))
+    for a in range(0, n, chunk):
+        cells = np.arange(a, min(a + chunk, n))
+        # Indices parmi les autres cellules : on saute la cellule elle-même
+        others = draws[None, :, :] + (draws[None, :, :] >= cells[:, None, None])
+        simulated_lag = (z[others] * padded[cells, None, :]).sum(axis=2)
+        simulated = z[cells, None] * simulated_lag / m2
+        p_values[cells] = _folded_p_values(local_i[cells], simulated)
+
+    return local_i, p_values, quadrant
+
+
+def _cell_year_values(df: pd.DataFrame, cell_size_m: float) -> Tuple[np.ndarray, np.ndarray, Dict]:
+    """Centres des cellules et valeurs (cellules × années) de chaque variable"""
+    cells = np.column_stack([
+        np.floor(df['x'].to_numpy(dtype=float) / cell_size_m),
+        np.floor(df['y'].to_numpy(dtype=float) / cell_size_m)
+    ]).astype(np.int64)
+    unique_cells, loc = np.unique(cells, axis=0, return_inverse=True)
+    loc = loc.ravel()
+    years = np.sort(df['annee'].unique())
+    year_idx = np.searchsorted(years, df['annee'].to_numpy())
+
+    n_loc, n_years = len(unique_cells), len(years)
+    flat = loc * n_years + year_idx
+    counts = np.bincount(flat, minlength=n_loc * n_years).reshape(n_loc, n_years)
+    surfaces = np.bincount(flat, weights=df['surface_ha'].to_numpy(dtype=float),
+                           minlength=n_loc * n_years).reshape(n_loc, n_years)
+    values = {
+        'nb_feux': counts.astype(float),
+        'surface_ha': np.log1p(surfaces)
+    }
+    return (unique_cells + 0.5) * cell_size_m, years, values
+
+
+def moran_by_year(df: pd.DataFrame, cell_size_m: float = 5000, distance_m: float = 10000,
+                  n_permutations: int = 999, seed: int = 0, alpha: float = 0.05) -> Dict:
+    """
+    Moran global et LISA par année pour le nombre de feux et la surface brûlée (log1p)
+    La grille et les poids (bande de distance, KD-tree) sont construits une seule fois
+    puis réutilisés pour toutes les années et toutes les variables
+    """
+    df = df[df['annee'].notna()]
+    if len(df) == 0:
+        return {
+            'global': pd.DataFrame(columns=['annee', 'variable', 'I', 'esperance', 'p_value']),
+            'x': np.array([]), 'y': np.array([]), 'years': np.array([]), 'values': {}, 'local': {},
+            'cell_size_m': cell_size_m, 'distance_m': distance_m, 'alpha': alpha
+        }
+
+    centres, years, values = _cell_year_values(df, cell_size_m)
+    weights = row_standardize(distance_band_weights(centres, distance_m, include_self=False))
+    rng = np.random.default_rng(seed)
+
+    rows = []
+    local = {}
+    for variable, matrix in values.items():
+        local_i = np.zeros(matrix.shape)
+        p_values = np.ones(matrix.shape)
+        quadrants = np.zeros(matrix.shape, dtype=np.int8)
+        for k, year in enumerate(years):
+            stats = global_moran(matrix[:, k], weights, n_permutations, rng)
+            rows.append({'annee': int(year), 'variable': variable, **stats})
+            local_i[:, k], p_values[:, k], quadrants[:, k] = local_moran(
+                matrix[:, k], weights, n_permutations, rng
+            )
+        # Quadrant conservé seulement si significatif
+        quadrants[~(p_values <= alpha)] = 0
+        local[variable] = {'I': local_i, 'p_value': p_values, 'quadrant': quadrants}
+
+    return {
+        'global': pd.DataFrame(rows),
+        'x': centres[:, 0],
+        'y': centres[:, 1],
+        'years': years,
+        'values': values,
+        'local': local,
+        'cell_size_m': cell_size_m,
+        'distance_m': distance_m,
+        'alpha': alpha
+    }
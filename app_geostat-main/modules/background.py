@@ -0,0 +1,140 @@
+"""
+Module de calculs en arrière-plan (pool de threads, résultats en cache, annulation des tâches périmées)
+La page lance les sections lentes dès que leurs paramètres sont connus et affiche les sections
+rapides sans attendre ; chaque résultat est repris quand son futur est terminé
+"""
+
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Set
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+
+class BackgroundJobs:
+    """
+    Futurs indexés par clé compacte (section, version des données, paramètres)
+    - une clé déjà soumise renvoie le même futur (résultat en cache, calcul partagé entre sessions)
+    - chaque futur garde la liste des sessions qui l'attendent (abonnés)
+    - les futurs terminés sont conservés en LRU (max_entries)
+    - une tâche remplacée (paramètres modifiés) n'est annulée que si plus aucune session ne l'attend
+      et qu'elle n'a pas encore démarré
+    """
+
+    def __init__(self, max_workers: int = 3, max_entries: int = 32):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='geostat-job')
+        self._futures: "OrderedDict[Hashable, Future]" = OrderedDict()
+        self._subscribers: Dict[Hashable, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.max_entries = max_entries
+        self.cancelled = 0
+
+    def _release(self, key: Hashable, subscriber: Optional[str]) -> None:
+        """Désabonne une session d'une clé ; tâche annulée si personne d'autre ne l'attend (verrou tenu)"""
+        subscribers = self._subscribers.get(key, set())
+        subscribers.discard(subscriber)
+        if subscribers:
+            return
+        self._subscribers.pop(key, None)
+        stale = self._futures.get(key)
+        if stale is not None and stale.cancel():
+            del self._futures[key]
+            self.cancelled += 1
+
+    def submit(self, key: Hashable, fn: Callable, *args, subscriber: Optional[str] = None,
+               replaces: Optional[Hashable] = None) -> Future:
+        """
+        Futur de fn(*args) pour cette clé
+        subscriber : identifiant de la session qui attend le résultat
+        replaces : clé précédente de la même section pour cette session
+        """
+        with self._lock:
+            if replaces is not None and replaces != key:
+                self._release(replaces, subscriber)
+            self._subscribers.setdefault(key, set()).add(subscriber)
+
+            future = self._futures.get(key)
+            # Une tâche annulée ou en échec est relancée
+            if future is not None and not future.cancelled() and (not future.done() or future.exception() is None):
+                self._futures.move_to_end(key)
+                return future
+
+            future = self._executor.submit(fn, *args)
+            self._futures[key] = future
+            # Éviction des plus anciens futurs terminés au-delà du budget
+            excess = len(self._futures) - self.max_entries
+            if excess > 0:
+                for old_key in [k for k, f in self._futures.items() if f.done()][:excess]:
+                    del self._futures[old_key]
+                    self._subscribers.pop(old_key, None)
+            return future
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'entries': len(self._futures),
+                'running': sum(1 for f in self._futures.values() if f.running()),
+                'done': sum(1 for f in self._futures.values() if f.done()),
+                'cancelled': self.cancelled
+            }
+
+
+@st.cache_resource
+def get_background_jobs() -> BackgroundJobs:
+    """Pool partagé des calculs en arrière-plan (un par processus Streamlit)"""
+    return BackgroundJobs()
+
+
+def submit_section(section: str, version: str, params: tuple, fn: Callable, *args) -> Future:
+    """
+    Lance (ou retrouve) le calcul d'une section de la page
+    La clé précédente de la section est mémorisée dans la session : un changement de paramètres
+    annule la tâche périmée si elle attend encore dans le pool et qu'aucune autre session ne l'attend
+    """
+    key = (section, version, params)
+    state_key = f'_job_{section}'
+    subscriber = st.session_state.setdefault('_job_subscriber', uuid.uuid4().hex)
+    future = get_background_jobs().submit(key, fn, *args, subscriber=subscriber,
+                                          replaces=st.session_state.get(state_key))
+    st.session_state[state_key] = key
+    return future
+
+
+def _fragment_rerun() -> bool:
+    """Vrai si seul un fragment est réexécuté (le reste de la page n'est pas redessiné)"""
+    ctx = get_script_run_ctx()
+    return bool(ctx is not None and ctx.fragment_ids_this_run)
+
+
+def render_when_done(job: Future, render: Callable[[Any], None], message: str) -> None:
+    """
+    Affiche render(résultat du futur) à cet endroit de la page
+    - résultat prêt, ou fragment réexécuté seul : affichage immédiat (attente sur place)
+    - rendu complet de la page : emplacement réservé, rempli par render_pending() en fin de page,
+      les sections suivantes ne l'attendent pas
+    """
+    if job.done() or _fragment_rerun():
+        with st.spinner(message):
+            result = job.result()
+        render(result)
+        return
+    slot = st.empty()
+    slot.caption(message)
+    st.session_state.setdefault('_pending_sections', []).append((slot, job, render, message))
+
+
+def reset_pending() -> None:
+    """Début d'un rendu complet : oublie les emplacements d'un rendu interrompu"""
+    st.session_state['_pending_sections'] = []
+
+
+def render_pending() -> None:
+    """Remplit, dans l'ordre de la page, les emplacements réservés par render_when_done()"""
+    pending = st.session_state.pop('_pending_sections', [])
+    for slot, job, render, message in pending:
+        with slot.container():
+            with st.spinner(message):
+                result = job.result()
+            render(result)
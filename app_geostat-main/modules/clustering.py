@@ -0,0 +1,111 @@
+"""
+Module de regroupement spatio-temporel des incendies (ST-DBSCAN)
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Optional
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+
+from .core.indexes import SpatioTemporalIndex
+
+
+def st_dbscan(index: SpatioTemporalIndex, eps_km: float, eps_days: float,
+              min_samples: int) -> np.ndarray:
+    """
+    ST-DBSCAN : un point est « cœur » s'il a au moins min_samples points (lui compris)
+    à moins de eps_km ET eps_days. Les clusters sont les composantes connexes des cœurs ;
+    les points de bordure rejoignent le cluster d'un cœur voisin, les autres sont du bruit (-1)
+    Retourne les étiquettes dans l'ordre chronologique de l'index
+    """
+    n = len(index)
+    labels = np.full(n, -1, dtype=np.int64)
+    if n == 0:
+        return labels
+
+    indptr, indices = index.neighbours(eps_km * 1000, eps_days)
+    degree = np.diff(indptr)
+    core = degree + 1 >= min_samples
+    if not core.any():
+        return labels
+
+    src = np.repeat(np.arange(n), degree)
+    core_edges = core[src] & core[indices]
+
+    # Composantes connexes du graphe des points cœurs
+    graph = csr_matrix(
+        (np.ones(core_edges.sum(), dtype=np.int8), (src[core_edges], indices[core_edges])),
+        shape=(n, n)
+    )
+    _, components = connected_components(graph, directed=False)
+    _, core_labels = np.unique(components[core], return_inverse=True)
+    labels[core] = core_labels
+
+    # Points de bordure : premier cœur voisin
+    border_edges = ~core[src] & core[indices]
+    border_src = src[border_edges]
+    border_dst = indices[border_edges]
+    border_points, first = np.unique(border_src, return_index=True)
+    labels[border_points] = labels[border_dst[first]]
+
+    return labels
+
+
+def cluster_fires(df: pd.DataFrame, eps_km: float = 5.0, eps_days: float = 7.0,
+                  min_samples: int = 5, index: Optional[SpatioTemporalIndex] = None) -> pd.Series:
+    """Étiquettes ST-DBSCAN alignées sur les lignes du DataFrame (-1 : bruit ou date manquante)"""
+    if index is None:
+        index = SpatioTemporalIndex.from_frame(df)
+    labels = np.full(len(df), -1, dtype=np.int64)
+    labels[index.rows] = st_dbscan(index, eps_km, eps_days, min_samples)
+    return pd.Series(labels, index=df.index, name='cluster')
+
+
+def summarize_clusters(df: pd.DataFrame, labels: pd.Series) -> pd.DataFrame:
+    """
+    Résumé par cluster : effectifs par catégorie, emprise temporelle, centroïde
+    Un cluster est « précurseur » s'il contient un grand feu précédé de petits feux du même cluster
+    """
+    clustered = df.assign(cluster=labels.to_numpy())
+    clustered = clustered[clustered['cluster'] >= 0]
+    if len(clustered) == 0:
+        return pd.DataFrame(columns=[
+            'cluster', 'nb_feux', 'petits_feux', 'moyens_feux', 'grands_feux', 'debut', 'fin',
+            'duree_jours', 'x', 'y', 'surface_totale_ha', 'commune', 'petits_feux_avant_grand', 'precurseur'
+        ])
+
+    cat = clustered['categorie']
+    clustered = clustered.assign(
+        is_petit=(cat == 'Petit feu').astype(int),
+        is_moyen=(cat == 'Feu moyen').astype(int),
+        is_grand=(cat == 'Grand feu').astype(int),
+        date_grand=clustered['date_alerte'].where(cat == 'Grand feu')
+    )
+    grouped = clustered.groupby('cluster')
+    summary = grouped.agg(
+        nb_feux=('cluster', 'size'),
+        petits_feux=('is_petit', 'sum'),
+        moyens_feux=('is_moyen', 'sum'),
+        grands_feux=('is_grand', 'sum'),
+        debut=('date_alerte', 'min'),
+        fin=('date_alerte', 'max'),
+        x=('x', 'mean'),
+        y=('y', 'mean'),
+        surface_totale_ha=('surface_ha', 'sum'),
+        premier_grand=('date_grand', 'min')
+    )
+    summary['duree_jours'] = (summary['fin'] - summary['debut']).dt.total_seconds() / 86400
+    summary['commune'] = grouped['commune'].agg(lambda c: c.mode().iat[0])
+
+    # Petits feux survenus avant le premier grand feu du cluster
+    first_big = clustered['cluster'].map(summary['premier_grand'])
+    before = (clustered['is_petit'] == 1) & (clustered['date_alerte'] < first_big)
+    summary['petits_feux_avant_grand'] = before.groupby(clustered['cluster']).sum()
+    summary['precurseur'] = summary['petits_feux_avant_grand'] > 0
+
+    summary = summary.drop(columns='premier_grand').reset_index()
+    return summary[[
+        'cluster', 'nb_feux', 'petits_feux', 'moyens_feux', 'grands_feux', 'debut', 'fin',
+        'duree_jours', 'x', 'y', 'surface_totale_ha', 'commune', 'petits_feux_avant_grand', 'precurseur'
+    ]].sort_values(['precurseur', 'nb_feux'], ascending=False).reset_index(drop=True)
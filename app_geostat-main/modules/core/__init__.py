@@ -0,0 +1,8 @@
+"""
+Cœur de calcul sans dépendance à Streamlit, importable par des traitements par lots
+- ingest : lecture et classification des feux
+- indexes : index spatio-temporel (scipy.spatial chargé à la première requête)
+- precursors : moteur d'analyse des petits feux précurseurs
+- statistics : corrélation croisée, Granger, information mutuelle (imports différés)
+La mise en cache Streamlit est une couche d'adaptation séparée (modules.dataset, modules.pipeline)
+"""
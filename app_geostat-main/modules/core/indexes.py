@@ -0,0 +1,156 @@
+"""
+Module d'index spatio-temporels : tri chronologique + KD-tree (Lambert 93)
+"""
+
+import numpy as np
+import pandas as pd
+from typing import TYPE_CHECKING, Iterator, Optional, Tuple
+
+if TYPE_CHECKING:
+    from scipy.spatial import cKDTree
+
+NS_PER_DAY = 86400 * 10**9
+
+
+def _kdtree(points: np.ndarray) -> 'cKDTree':
+    """KD-tree scipy (import différé : scipy.spatial n'est chargé qu'à la première requête)"""
+    from scipy.spatial import cKDTree
+    return cKDTree(points)
+
+
+def dates_to_days(dates: pd.Series) -> np.ndarray:
+    """Convertit des dates en jours fractionnaires depuis l'époque Unix"""
+    return dates.to_numpy(dtype='datetime64[ns]').astype(np.int64) / NS_PER_DAY
+
+
+class SpatioTemporalIndex:
+    """
+    Index des incendies trié par date d'alerte
+    - fenêtres temporelles par recherche dichotomique (searchsorted)
+    - voisinages spatiaux par KD-tree, construits par blocs chronologiques
+      pour ne jamais matérialiser de matrice de distances N × N
+    """
+
+    def __init__(self, x: np.ndarray, y: np.ndarray, t_days: np.ndarray,
+                 rows: Optional[np.ndarray] = None):
+        order = np.argsort(t_days, kind='stable')
+        self.x = np.asarray(x, dtype=float)[order]
+        self.y = np.asarray(y, dtype=float)[order]
+        self.t = np.asarray(t_days, dtype=float)[order]
+        # Position de chaque point indexé dans le tableau d'origine
+        self.rows = order if rows is None else np.asarray(rows)[order]
+        self._tree = None
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'SpatioTemporalIndex':
+        """Construit l'index sur les lignes datées d'un DataFrame (rows = positions iloc)"""
+        valid = df['date_alerte'].notna().to_numpy()
+        rows = np.flatnonzero(valid)
+        return cls(
+            df['x'].to_numpy(dtype=float)[valid],
+            df['y'].to_numpy(dtype=float)[valid],
+            dates_to_days(df['date_alerte'][valid]),
+            rows
+        )
+
+    def __len__(self) -> int:
+        return len(self.t)
+
+    @property
+    def xy(self) -> np.ndarray:
+        return np.column_stack([self.x, self.y])
+
+    @property
+    def tree(self) -> 'cKDTree':
+        """KD-tree spatial sur l'ensemble des points (construit une seule fois)"""
+        if self._tree is None:
+            self._tree = _kdtree(self.xy)
+        return self._tree
+
+    def time_range(self, t_start: float, t_end: float) -> Tuple[int, int]:
+        """Bornes [lo, hi) des points dont la date est dans [t_start, t_end)"""
+        return (int(np.searchsorted(self.t, t_start, side='left')),
+                int(np.searchsorted(self.t, t_end, side='left')))
+
+    def iter_pairs(self, max_dist_m: float, max_lag_days: float,
+                   block_size: int = 2048) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Parcourt les paires (i, j), i < j en ordre chronologique, à moins de max_dist_m
+        et max_lag_days, bloc par bloc : chaque bloc n'est comparé qu'à sa fenêtre temporelle
+        Produit: (i, j, distance_m, décalage_jours)
+        """
+        n = len(self)
+        xy = self.xy
+        for a in range(0, n, block_size):
+            b = min(a + block_size, n)
+            hi = int(np.searchsorted(self.t, self.t[b - 1] + max_lag_days, side='right'))
+            block_tree = _kdtree(xy[a:b])
+            window_tree = _kdtree(xy[a:hi])
+            pairs = block_tree.sparse_distance_matrix(window_tree, max_dist_m, output_type='ndarray')
+            i = pairs['i'].astype(np.int64) + a
+            j = pairs['j'].astype(np.int64) + a
+            keep = j > i
+            i, j, dist = i[keep], j[keep], pairs['v'][keep]
+            lag = self.t[j] - self.t[i]
+            keep = lag <= max_lag_days
+            yield i[keep], j[keep], dist[keep], lag[keep]
+
+    def iter_pairs_before(self, qx: np.ndarray, qy: np.ndarray, qt: np.ndarray, radius_m: float,
+                          window_days: float, block_size: int = 2048
+                          ) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Paires (requête, point) à moins de radius_m (inclus) avec un point daté dans [qt - window_days, qt)
+        Requêtes triées par date et traitées par blocs : chaque bloc n'est comparé qu'aux points
+        de sa fenêtre temporelle (un KD-tree par bloc, aucune boucle par requête)
+        Produit: (indice de requête, indice de point dans l'index, distance_m, décalage_jours)
+        """
+        qt = np.asarray(qt, dtype=float)
+        order = np.argsort(qt, kind='stable')
+        q_xy = np.column_stack([np.asarray(qx, dtype=float), np.asarray(qy, dtype=float)])[order]
+        q_t = qt[order]
+        xy = self.xy
+
+        for a in range(0, len(q_t), block_size):
+            b = min(a + block_size, len(q_t))
+            lo, hi = self.time_range(q_t[a] - window_days, q_t[b - 1])
+            if hi <= lo:
+                continue
+            pairs = _kdtree(q_xy[a:b]).sparse_distance_matrix(
+                _kdtree(xy[lo:hi]), radius_m, output_type='ndarray'
+            )
+            i = pairs['i'].astype(np.int64) + a
+            j = pairs['j'].astype(np.int64) + lo
+            lag = q_t[i] - self.t[j]
+            keep = (lag > 0) & (lag <= window_days)
+            yield order[i[keep]], j[keep], pairs['v'][keep], lag[keep]
+
+    def count_before(self, qx: np.ndarray, qy: np.ndarray, qt: np.ndarray, radius_m: float,
+                     window_days: float, block_size: int = 2048) -> np.ndarray:
+        """Nombre de points à moins de radius_m dans [qt - window_days, qt) pour un lot de requêtes"""
+        counts = np.zeros(len(qt), dtype=np.int64)
+        for q, _, _, _ in self.iter_pairs_before(qx, qy, qt, radius_m, window_days, block_size):
+            counts += np.bincount(q, minlength=len(counts))
+        return counts
+
+    def neighbours(self, eps_m: float, eps_days: float,
+                   block_size: int = 2048) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Voisinages spatio-temporels symétriques au format CSR (indptr, indices)
+        La mémoire est proportionnelle au nombre de paires voisines, pas à N²
+        """
+        chunks_i, chunks_j = [], []
+        for i, j, _, _ in self.iter_pairs(eps_m, eps_days, block_size):
+            chunks_i.append(i)
+            chunks_j.append(j)
+        if chunks_i:
+            i = np.concatenate(chunks_i)
+            j = np.concatenate(chunks_j)
+        else:
+            i = j = np.array([], dtype=np.int64)
+
+        src = np.concatenate([i, j])
+        dst = np.concatenate([j, i])
+        order = np.argsort(src, kind='stable')
+        indptr = np.zeros(len(self) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=len(self)), out=indptr[1:])
+        return indptr, dst[order]
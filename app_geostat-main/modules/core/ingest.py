@@ -0,0 +1,99 @@
+"""
+Module de lecture et de classification des données d'incendies (sans dépendance à Streamlit)
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Tuple, Dict
+
+# Libellés des catégories, dans l'ordre de leurs codes int8
+FIRE_CATEGORIES = ['Petit feu', 'Feu moyen', 'Grand feu', 'Non classé']
+
+
+def read_fires(file_path: str) -> pd.DataFrame:
+    """Lit et prétraite les données d'incendies (sans cache, voir modules.dataset)"""
+    df = pd.read_csv(file_path, sep=';', encoding='utf-8', low_memory=False, decimal=',')
+    
+    # Nettoyage et conversion des colonnes
+    # Compatibilité avec les deux formats de fichier
+    if 'join_surf_ha' in df.columns:
+        df['surface_ha'] = pd.to_numeric(df['join_surf_ha'], errors='coerce')
+    elif 'surf_ha' in df.columns:
+        df['surface_ha'] = pd.to_numeric(df['surf_ha'], errors='coerce')
+    
+    df['annee'] = pd.to_numeric(df['annee'], errors='coerce')
+    
+    # Parse date d'alerte
+    if 'join_Alert' in df.columns:
+        df['date_alerte'] = pd.to_datetime(df['join_Alert'], format='%d/%m/%Y %H:%M', errors='coerce')
+    elif 'Alerte' in df.columns:
+        df['date_alerte'] = pd.to_datetime(df['Alerte'], format='%d/%m/%Y %H:%M', errors='coerce')
+    
+    # Nettoyage des coordonnées
+    if df['x_coord'].dtype == 'object':
+        df['x'] = pd.to_numeric(df['x_coord'].str.replace(',', '.'), errors='coerce')
+        df['y'] = pd.to_numeric(df['y_coord'].str.replace(',', '.'), errors='coerce')
+    else:
+        df['x'] = pd.to_numeric(df['x_coord'], errors='coerce')
+        df['y'] = pd.to_numeric(df['y_coord'], errors='coerce')
+    
+    # Supprimer les lignes sans données essentielles
+    df = df.dropna(subset=['surface_ha', 'annee', 'x', 'y'])
+    
+    # Convertir l'année en entier
+    df['annee'] = df['annee'].astype(int)
+    
+    # Commune
+    if 'join_Commu' in df.columns:
+        df['commune'] = df['join_Commu'].fillna('Inconnue')
+    elif 'Commune' in df.columns:
+        df['commune'] = df['Commune'].fillna('Inconnue')
+    
+    return df
+
+
+def calculate_distance_km(x1: float, y1: float, x2: float, y2: float) -> float:
+    """Calcule la distance euclidienne entre deux points en km (Lambert 93)"""
+    distance_m = np.sqrt((x2 - x1)**2 + (y2 - y1)**2)
+    return distance_m / 1000
+
+
+def classify_fires(df: pd.DataFrame, seuil_petit: float, seuil_grand: float) -> pd.DataFrame:
+    """
+    Classifie les incendies par taille (mise en cache par modules.dataset.classified_fires)
+    Colonne 'categorie' catégorielle : codes int8 et libellés FIRE_CATEGORIES
+    """
+    df = df.copy()
+    
+    surface = df['surface_ha'].to_numpy(dtype=float)
+    conditions = [
+        surface < seuil_petit,
+        surface >= seuil_grand,
+        (surface >= seuil_petit) & (surface < seuil_grand)
+    ]
+    codes = np.select(conditions, [0, 2, 1], default=3).astype(np.int8)
+    df['categorie'] = pd.Categorical.from_codes(codes, categories=FIRE_CATEGORIES)
+    
+    return df
+
+
+def category_counts(sorted_surface: np.ndarray, seuil_petit: float, seuil_grand: float) -> Dict[str, int]:
+    """
+    Nombre de feux par catégorie à partir des surfaces triées (NaN exclus) : deux recherches
+    dichotomiques, mêmes règles que classify_fires, sans parcourir le tableau
+    """
+    n = len(sorted_surface)
+    petits = int(np.searchsorted(sorted_surface, seuil_petit, side='left'))
+    grands = n - int(np.searchsorted(sorted_surface, max(seuil_petit, seuil_grand), side='left'))
+    return {
+        'Petit feu': petits,
+        'Feu moyen': n - petits - grands,
+        'Grand feu': grands
+    }
+
+
+def lambert93_to_wgs84(x: float, y: float) -> Tuple[float, float]:
+    """Convertit les coordonnées Lambert 93 en WGS84 (lat/lon)"""
+    lat = 46.5 + (y - 6600000) / 111320
+    lon = 3.0 + (x - 700000) / (111320 * 0.72)
+    return lat, lon
@@ -1,77 +1,11 @@
 """
-Module de traitement des données
+Module du moteur d'analyse des petits feux précurseurs (fenêtre temporelle ET buffer spatial)
 """
 
 import pandas as pd
 import numpy as np
 from datetime import timedelta
-from typing import Tuple, Dict
-import streamlit as st
-
-
-@st.cache_data
-def load_data(file_path: str) -> pd.DataFrame:
-    """Charge et prétraite les données d'incendies"""
-    df = pd.read_csv(file_path, sep=';', encoding='utf-8', low_memory=False, decimal=',')
-    
-    # Nettoyage et conversion des colonnes
-    # Compatibilité avec les deux formats de fichier
-    if 'join_surf_ha' in df.columns:
-        df['surface_ha'] = pd.to_numeric(df['join_surf_ha'], errors='coerce')
-    elif 'surf_ha' in df.columns:
-        df['surface_ha'] = pd.to_numeric(df['surf_ha'], errors='coerce')
-    
-    df['annee'] = pd.to_numeric(df['annee'], errors='coerce')
-    
-    # Parse date d'alerte
-    if 'join_Alert' in df.columns:
-        df['date_alerte'] = pd.to_datetime(df['join_Alert'], format='%d/%m/%Y %H:%M', errors='coerce')
-    elif 'Alerte' in df.columns:
-        df['date_alerte'] = pd.to_datetime(df['Alerte'], format='%d/%m/%Y %H:%M', errors='coerce')
-    
-    # Nettoyage des coordonnées
-    if df['x_coord'].dtype == 'object':
-        df['x'] = pd.to_numeric(df['x_coord'].str.replace(',', '.'), errors='coerce')
-        df['y'] = pd.to_numeric(df['y_coord'].str.replace(',', '.'), errors='coerce')
-    else:
-        df['x'] = pd.to_numeric(df['x_coord'], errors='coerce')
-        df['y'] = pd.to_numeric(df['y_coord'], errors='coerce')
-    
-    # Supprimer les lignes sans données essentielles
-    df = df.dropna(subset=['surface_ha', 'annee', 'x', 'y'])
-    
-    # Convertir l'année en entier
-    df['annee'] = df['annee'].astype(int)
-    
-    # Commune
-    if 'join_Commu' in df.columns:
-        df['commune'] = df['join_Commu'].fillna('Inconnue')
-    elif 'Commune' in df.columns:
-        df['commune'] = df['Commune'].fillna('Inconnue')
-    
-    return df
-
-
-def calculate_distance_km(x1: float, y1: float, x2: float, y2: float) -> float:
-    """Calcule la distance euclidienne entre deux points en km (Lambert 93)"""
-    distance_m = np.sqrt((x2 - x1)**2 + (y2 - y1)**2)
-    return distance_m / 1000
-
-
-@st.cache_data
-def classify_fires(df: pd.DataFrame, seuil_petit: float, seuil_grand: float) -> pd.DataFrame:
-    """Classifie les incendies par taille"""
-    df = df.copy()
-    
-    conditions = [
-        df['surface_ha'] < seuil_petit,
-        df['surface_ha'] >= seuil_grand,
-        (df['surface_ha'] >= seuil_petit) & (df['surface_ha'] < seuil_grand)
-    ]
-    choices = ['Petit feu', 'Grand feu', 'Feu moyen']
-    df['categorie'] = np.select(conditions, choices, default='Non classé')
-    
-    return df
+from typing import Tuple, Dict, List
 
 
 def get_fires_in_buffer(df: pd.DataFrame, center_x: float, center_y: float, 
@@ -165,8 +99,48 @@ def analyze_fires_before_big_fire(df: pd.DataFrame, big_fire_row: pd.Series,
     }
 
 
-def lambert93_to_wgs84(x: float, y: float) -> Tuple[float, float]:
-    """Convertit les coordonnées Lambert 93 en WGS84 (lat/lon)"""
-    lat = 46.5 + (y - 6600000) / 111320
-    lon = 3.0 + (x - 700000) / (111320 * 0.72)
-    return lat, lon
+def deduplicate_big_fires(df: pd.DataFrame) -> pd.DataFrame:
+    """Grands feux datés, dédupliqués (même commune, date, coordonnées, surface)"""
+    big_fires = df[(df['categorie'] == 'Grand feu') & (df['date_alerte'].notna())]
+    return big_fires.drop_duplicates(
+        subset=['commune', 'date_alerte', 'x', 'y', 'surface_ha'],
+        keep='first'
+    ).reset_index(drop=True)
+
+
+def analyze_big_fires(df: pd.DataFrame, big_fires: pd.DataFrame, temporal_window_days: int,
+                      buffer_radius_km: float, min_fires_before: int) -> List[Dict]:
+    """Analyse de chaque grand feu, dans l'ordre de big_fires"""
+    return [
+        analyze_fires_before_big_fire(df, big_fire, temporal_window_days, buffer_radius_km, min_fires_before)
+        for _, big_fire in big_fires.iterrows()
+    ]
+
+
+def summarize_results(big_fires: pd.DataFrame, analysis_results: List[Dict]) -> Dict:
+    """
+    Tableau des grands feux qui vérifient la condition et totaux associés
+    valid_indices : position de chaque ligne du tableau dans big_fires
+    """
+    rows, valid_indices = [], []
+    for idx, result in enumerate(analysis_results):
+        if result['condition_met']:
+            bf = big_fires.iloc[idx]
+            valid_indices.append(idx)
+            rows.append({
+                'Date': bf['date_alerte'].strftime('%d/%m/%Y'),
+                'DateTime': bf['date_alerte'].strftime('%d/%m/%Y %H:%M'),
+                'Commune': bf['commune'],
+                'Surface (ha)': bf['surface_ha'],
+                'Petits feux': result['small_fires_count'],
+                'Moyens feux': result['medium_fires_count'],
+                'Total buffer': len(result['fires_in_buffer']),
+                'Tendance': result['trend']
+            })
+    table = pd.DataFrame(rows)
+    return {
+        'table': table,
+        'valid_indices': valid_indices,
+        'total_small': int(table['Petits feux'].sum()) if len(table) else 0,
+        'total_medium': int(table['Moyens feux'].sum()) if len(table) else 0
+    }
@@ -0,0 +1,131 @@
+"""
+Module des statistiques de corrélation petits feux → grands feux
+(corrélation croisée, causalité de Granger, information mutuelle)
+scipy, statsmodels et sklearn ne sont importés qu'au premier calcul
+"""
+
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Tuple
+
+
+def prepare_time_series_for_correlation(df: pd.DataFrame) -> Tuple[pd.Series, pd.Series]:
+    """Prépare les séries temporelles pour l'analyse de corrélation entre petits et grands feux"""
+    # Filtrer les dates valides
+    df_valid = df[df['date_alerte'].notna()].copy()
+    
+    # Créer une série temporelle journalière
+    df_valid['date_only'] = df_valid['date_alerte'].dt.date
+    
+    # Compter petits feux et grands feux par jour
+    petits_feux = df_valid[df_valid['categorie'] == 'Petit feu'].groupby('date_only').size()
+    grands_feux = df_valid[df_valid['categorie'] == 'Grand feu'].groupby('date_only').size()
+    
+    # Créer une plage de dates complète
+    date_min = df_valid['date_only'].min()
+    date_max = df_valid['date_only'].max()
+    date_range = pd.date_range(start=date_min, end=date_max, freq='D')
+    
+    # Réindexer pour avoir toutes les dates (remplir avec 0)
+    petits_series = petits_feux.reindex(date_range.date, fill_value=0)
+    grands_series = grands_feux.reindex(date_range.date, fill_value=0)
+    
+    return petits_series, grands_series
+
+
+def calculate_cross_correlation(df: pd.DataFrame, max_lag: int = 30) -> Tuple[np.ndarray, np.ndarray, int, float]:
+    """
+    Calcule la corrélation croisée entre petits et grands feux
+    Retourne: (lags, correlations, best_lag, best_corr)
+    """
+    petits_series, grands_series = prepare_time_series_for_correlation(df)
+    
+    # Normaliser les séries
+    petits_norm = (petits_series - petits_series.mean()) / (petits_series.std() + 1e-10)
+    grands_norm = (grands_series - grands_series.mean()) / (grands_series.std() + 1e-10)
+    
+    # Calculer la corrélation croisée
+    from scipy import signal
+    correlation = signal.correlate(petits_norm, grands_norm, mode='full', method='auto')
+    lags = signal.correlation_lags(len(petits_norm), len(grands_norm), mode='full')
+    
+    # Normaliser la corrélation
+    correlation = correlation / len(petits_norm)
+    
+    # Filtrer les lags pertinents
+    mask = (lags >= -max_lag) & (lags <= max_lag)
+    lags_filtered = lags[mask]
+    correlation_filtered = correlation[mask]
+    
+    # Trouver le meilleur lag
+    best_idx = np.argmax(np.abs(correlation_filtered))
+    best_lag = lags_filtered[best_idx]
+    best_corr = correlation_filtered[best_idx]
+    
+    return lags_filtered, correlation_filtered, best_lag, best_corr
+
+
+def calculate_granger_causality(df: pd.DataFrame, max_lag: int = 15) -> Tuple[Dict, float, int]:
+    """
+    Teste la causalité de Granger entre petits et grands feux
+    Retourne: (résultats, p-value minimale, meilleur lag)
+    """
+    petits_series, grands_series = prepare_time_series_for_correlation(df)
+    
+    # Créer un DataFrame pour le test
+    data = pd.DataFrame({
+        'grands_feux': grands_series.values,
+        'petits_feux': petits_series.values
+    })
+    
+    try:
+        from statsmodels.tsa.stattools import grangercausalitytests
+        # Test de causalité: est-ce que petits_feux cause grands_feux?
+        gc_results = grangercausalitytests(data[['grands_feux', 'petits_feux']], maxlag=max_lag, verbose=False)
+        
+        # Extraire les p-values pour chaque lag
+        p_values = {}
+        for lag in range(1, max_lag + 1):
+            # Utiliser le test F
+            p_value = gc_results[lag][0]['ssr_ftest'][1]
+            p_values[lag] = p_value
+        
+        # Trouver le meilleur lag (p-value la plus faible)
+        best_lag = min(p_values, key=p_values.get)
+        min_p_value = p_values[best_lag]
+        
+        return p_values, min_p_value, best_lag
+    except Exception as e:
+        # En cas d'erreur, retourner des valeurs par défaut
+        return {}, 1.0, 0
+
+
+def calculate_mutual_information(df: pd.DataFrame) -> Tuple[float, List[float], List[int]]:
+    """
+    Calcule l'information mutuelle entre petits et grands feux avec différents décalages
+    Retourne: (meilleure MI, liste des MI, liste des lags)
+    """
+    petits_series, grands_series = prepare_time_series_for_correlation(df)
+    
+    from sklearn.metrics import mutual_info_score
+    
+    lags_to_test = list(range(0, 31, 1))
+    mi_scores = []
+    
+    for lag in lags_to_test:
+        if lag == 0:
+            # Pas de décalage
+            mi = mutual_info_score(petits_series, grands_series)
+        elif lag > 0:
+            # Décaler les petits feux vers l'avant (petits feux arrivent avant grands feux)
+            petits_shifted = petits_series[:-lag]
+            grands_shifted = grands_series[lag:]
+            mi = mutual_info_score(petits_shifted, grands_shifted)
+        
+        mi_scores.append(mi)
+    
+    best_idx = np.argmax(mi_scores)
+    best_mi = mi_scores[best_idx]
+    best_lag = lags_to_test[best_idx]
+    
+    return best_mi, mi_scores, lags_to_test
@@ -0,0 +1,76 @@
+"""
+Module de poignées de jeu de données : clés de cache compactes à la place du hachage des DataFrames
+"""
+
+import hashlib
+from dataclasses import dataclass, replace
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from .core.ingest import read_fires, classify_fires
+from .figure_cache import dataset_version
+
+
+def _fingerprint(dataset_id: str, annee_debut: int, annee_fin: int) -> str:
+    return hashlib.sha1(repr((dataset_id, annee_debut, annee_fin)).encode('utf-8')).hexdigest()[:16]
+
+
+@dataclass(frozen=True)
+class DatasetHandle:
+    """
+    Poignée immuable d'un état du jeu de données : source versionnée, période et empreinte précalculée
+    st.cache_data ne hache que ces quelques champs, jamais le DataFrame correspondant
+    n_fires : nombre de feux de la source entière
+    """
+    dataset_id: str
+    file_path: str
+    annee_debut: int
+    annee_fin: int
+    fingerprint: str
+    n_fires: int
+
+    def select_years(self, annee_debut: int, annee_fin: int) -> 'DatasetHandle':
+        """Poignée de la même source restreinte à une période"""
+        annee_debut, annee_fin = int(annee_debut), int(annee_fin)
+        return replace(self, annee_debut=annee_debut, annee_fin=annee_fin,
+                       fingerprint=_fingerprint(self.dataset_id, annee_debut, annee_fin))
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _source_frame(file_path: str, dataset_id: str) -> pd.DataFrame:
+    """Jeu complet lu une fois par version du fichier (partagé : ne jamais le modifier)"""
+    return read_fires(file_path)
+
+
+def open_dataset(file_path: str) -> DatasetHandle:
+    """Poignée de toute la période du fichier ; la version ne dépend que des métadonnées du fichier"""
+    dataset_id = dataset_version(file_path)
+    df = _source_frame(file_path, dataset_id)
+    annee_debut, annee_fin = (int(df['annee'].min()), int(df['annee'].max())) if len(df) else (0, 0)
+    return DatasetHandle(dataset_id, file_path, annee_debut, annee_fin,
+                         _fingerprint(dataset_id, annee_debut, annee_fin), len(df))
+
+
+def source_frame(dataset: DatasetHandle) -> pd.DataFrame:
+    """Jeu complet de la source de la poignée (partagé, en lecture seule)"""
+    return _source_frame(dataset.file_path, dataset.dataset_id)
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def sorted_surfaces(dataset: DatasetHandle) -> np.ndarray:
+    """Surfaces (ha) triées de la période, NaN exclus (partagé : ne jamais le modifier)"""
+    df = source_frame(dataset)
+    surface = df.loc[(df['annee'] >= dataset.annee_debut) & (df['annee'] <= dataset.annee_fin),
+                     'surface_ha'].to_numpy(dtype=float)
+    surface = np.sort(surface[~np.isnan(surface)])
+    surface.flags.writeable = False
+    return surface
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def classified_fires(dataset: DatasetHandle, seuil_petit: float, seuil_grand: float) -> pd.DataFrame:
+    """Feux de la période de la poignée, classifiés ; clé : poignée et seuils"""
+    df = source_frame(dataset)
+    df = df[(df['annee'] >= dataset.annee_debut) & (df['annee'] <= dataset.annee_fin)]
+    return classify_fires(df, seuil_petit, seuil_grand)
@@ -0,0 +1,170 @@
+"""
+Module de génération différée des fichiers à télécharger (cache disque, éviction LRU, budget en octets)
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Hashable, Iterator
+import streamlit as st
+
+DOWNLOAD_CACHE_DIR = 'cache/downloads'
+
+
+class DownloadCache:
+    """
+    Cache LRU de fichiers générés sur disque
+    Clé : (format, version des données, paramètres) ; le fichier n'est produit qu'à la première
+    demande, par un constructeur qui l'écrit lui-même (par blocs s'il le souhaite)
+    Un fichier en cours de lecture est épinglé : l'éviction ne le supprime pas avant sa libération
+    """
+
+    def __init__(self, root: str = DOWNLOAD_CACHE_DIR, max_bytes: int = 512 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._building: Dict[str, threading.Lock] = {}
+        self._pins: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(root, exist_ok=True)
+
+        # Fichiers d'une session précédente, du plus ancien au plus récent
+        existing = [os.path.join(root, f) for f in os.listdir(root) if not f.endswith('.tmp')]
+        for path in sorted(existing, key=os.path.getmtime):
+            self._entries[path] = os.path.getsize(path)
+            self._size += self._entries[path]
+        self._evict()
+
+    def path_for(self, key: Hashable, extension: str) -> str:
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()[:20]
+        return os.path.join(self.root, f'{digest}.{extension}')
+
+    def _evict(self) -> None:
+        """Supprime les fichiers les plus anciens non épinglés au-delà du budget (verrou tenu par l'appelant)"""
+        for path in list(self._entries):
+            if self._size <= self.max_bytes or len(self._entries) <= 1:
+                break
+            if self._pins.get(path):
+                continue
+            self._size -= self._entries.pop(path)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _pin_if_cached(self, path: str) -> bool:
+        """Épingle un fichier présent (MRU) et compte le succès (verrou tenu par l'appelant)"""
+        if path not in self._entries or not os.path.exists(path):
+            return False
+        self._entries.move_to_end(path)
+        self._pins[path] = self._pins.get(path, 0) + 1
+        self.hits += 1
+        return True
+
+    def _acquire(self, key: Hashable, extension: str, builder: Callable[[str], None]) -> str:
+        """
+        Chemin épinglé du fichier en cache, construit via builder(chemin) s'il est absent
+        Écriture dans un fichier temporaire puis renommage : jamais de fichier partiel servi
+        """
+        path = self.path_for(key, extension)
+        with self._lock:
+            if self._pin_if_cached(path):
+                return path
+            building = self._building.setdefault(path, threading.Lock())
+
+        # Une seule construction par clé, les demandes concurrentes attendent son résultat
+        try:
+            with building:
+                with self._lock:
+                    if self._pin_if_cached(path):
+                        return path
+                    self.misses += 1
+
+                tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+                try:
+                    builder(tmp_path)
+                    os.replace(tmp_path, path)
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+
+                with self._lock:
+                    size = os.path.getsize(path)
+                    self._size += size - self._entries.pop(path, 0)
+                    self._entries[path] = size
+                    self._pins[path] = self._pins.get(path, 0) + 1
+                    self._evict()
+        finally:
+            # Verrou de construction libéré même si le constructeur échoue
+            with self._lock:
+                self._building.pop(path, None)
+        return path
+
+    def _release(self, path: str) -> None:
+        with self._lock:
+            self._pins[path] -= 1
+            if not self._pins[path]:
+                del self._pins[path]
+            self._evict()
+
+    @contextmanager
+    def pinned(self, key: Hashable, extension: str, builder: Callable[[str], None]) -> Iterator[str]:
+        """Chemin du fichier en cache (construit s'il est absent), protégé de l'éviction dans le bloc with"""
+        path = self._acquire(key, extension, builder)
+        try:
+            yield path
+        finally:
+            self._release(path)
+
+    def read(self, key: Hashable, extension: str, builder: Callable[[str], None]) -> bytes:
+        """Contenu du fichier en cache, lu pendant qu'il est épinglé"""
+        with self.pinned(key, extension, builder) as path:
+            with open(path, 'rb') as f:
+                return f.read()
+
+    def clear(self) -> None:
+        with self._lock:
+            for path in [p for p in self._entries if not self._pins.get(p)]:
+                self._size -= self._entries.pop(path)
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+@st.cache_resource
+def get_download_cache() -> DownloadCache:
+    """Instance partagée du cache de téléchargements (une par processus Streamlit)"""
+    return DownloadCache()
+
+
+def bytes_builder(producer: Callable[[], bytes]) -> Callable[[str], None]:
+    """Constructeur de fichier à partir d'une fonction qui produit le contenu en mémoire"""
+    def build(path: str) -> None:
+        with open(path, 'wb') as f:
+            f.write(producer())
+    return build
+
+
+def deferred_download(fmt: str, version: str, params: tuple, extension: str,
+                      builder: Callable[[str], None]) -> Callable:
+    """
+    Données différées pour st.download_button : rien n'est calculé au rendu de la page,
+    le fichier est produit (ou relu du cache) au clic puis lu depuis le disque
+    Limite : st.download_button ne sert que des octets en mémoire, le fichier est donc relu en entier
+    (une copie, conservée par Streamlit) ; seule sa production (write_csv, Excel en flux) est à mémoire bornée
+    """
+    def read_payload() -> bytes:
+        return get_download_cache().read((fmt, version, params), extension, builder)
+    return read_payload
@@ -2,9 +2,126 @@
 Module d'export des données
 """
 
+import argparse
+import json
+import os
+import tempfile
+import zlib
+import numpy as np
 import pandas as pd
 import io
-from typing import List, Dict, Optional
+import pyarrow as pa
+import pyarrow.parquet as pq
+import shapely
+import xlsxwriter
+from typing import Iterable, Iterator, List, Dict, Optional
+
+# Import optionnel de geopandas (export GeoPackage)
+try:
+    import geopandas as gpd
+    HAS_GEOPANDAS = True
+except ImportError:
+    HAS_GEOPANDAS = False
+
+# Limite de lignes d'une feuille Excel (en-tête compris)
+EXCEL_MAX_ROWS = 1_048_576
+
+# Grands feux traités par lot lors de l'écriture en flux de Feux_buffers
+_STREAM_BATCH_FIRES = 500
+
+# Lignes sérialisées par bloc lors de l'export CSV en flux
+CSV_CHUNK_ROWS = 50_000
+
+# Coordonnées x / y du jeu de données : RGF93 / Lambert-93
+LAMBERT93_EPSG = 2154
+
+
+def _retained_positions(analysis_results: List[Dict]) -> List[int]:
+    """Positions des grands feux valides qui remplissent la condition"""
+    return [idx for idx, result in enumerate(analysis_results)
+            if result['valid'] and result['condition_met']]
+
+
+def analysis_sheet(big_fires: pd.DataFrame, analysis_results: List[Dict],
+                   retained: List[int]) -> pd.DataFrame:
+    """Feuille Analyse : attributs des grands feux retenus (sélection groupée) et résultats"""
+    bf = big_fires.iloc[retained]
+    results = [analysis_results[idx] for idx in retained]
+    return pd.DataFrame({
+        'Grand_feu_date': bf['date_alerte'].to_numpy(),
+        'Commune': bf['commune'].to_numpy(),
+        'Surface_ha': bf['surface_ha'].to_numpy(),
+        'Petits_feux_avant': [r['small_fires_count'] for r in results],
+        'Moyens_feux_avant': [r['medium_fires_count'] for r in results],
+        'Tendance': [r['trend'] for r in results],
+        'Pente': [r['slope'] for r in results],
+        'Feux_dans_buffer': [len(r['fires_in_buffer']) for r in results]
+    })
+
+
+def buffer_fires_sheet(big_fires: pd.DataFrame, analysis_results: List[Dict],
+                       retained: List[int]) -> pd.DataFrame:
+    """
+    Feuille Feux_buffers : feux des buffers concaténés en une fois,
+    attributs du grand feu répétés selon la taille de chaque buffer
+    """
+    columns = ['date_alerte', 'commune', 'categorie', 'surface_ha', 'distance_km']
+    buffers = [analysis_results[idx]['fires_in_buffer'] for idx in retained]
+    sizes = np.array([len(b) for b in buffers], dtype=np.int64)
+    if sizes.sum() == 0:
+        return pd.DataFrame()
+    fires = pd.concat([b[columns] for b in buffers if len(b) > 0], ignore_index=True)
+    owner = np.repeat(np.asarray(retained, dtype=np.int64), sizes)
+    return pd.DataFrame({
+        'Grand_feu_commune': big_fires['commune'].to_numpy()[owner],
+        'Grand_feu_date': big_fires['date_alerte'].to_numpy()[owner],
+        'Feu_buffer_date': fires['date_alerte'].to_numpy(),
+        'Feu_buffer_commune': fires['commune'].to_numpy(),
+        'Type': fires['categorie'].to_numpy(),
+        'Surface_ha': fires['surface_ha'].to_numpy(),
+        'Distance_km': fires['distance_km'].to_numpy()
+    })
+
+
+def _write_correlation_explanations(workbook) -> None:
+    """Feuille d'interprétation des résultats de corrélation (écrite ligne après ligne)"""
+    worksheet_exp = workbook.add_worksheet('Explications_Correlation')
+    
+    bold_format = workbook.add_format({'bold': True, 'font_size': 12})
+    text_format = workbook.add_format({'text_wrap': True, 'valign': 'top'})
+    worksheet_exp.set_column(0, 0, 80)
+    
+    row = 0
+    worksheet_exp.write(row, 0, 'Interprétation des Résultats de Corrélation', bold_format)
+    row += 2
+    
+    worksheet_exp.write(row, 0, 'Cross-Correlation:', bold_format)
+    row += 1
+    worksheet_exp.write(row, 0, '• Mesure la similarité entre les séries temporelles de petits et grands feux', text_format)
+    row += 1
+    worksheet_exp.write(row, 0, '• Valeur proche de 1 : forte corrélation positive', text_format)
+    row += 1
+    worksheet_exp.write(row, 0, '• Valeur proche de -1 : forte corrélation négative', text_format)
+    row += 1
+    worksheet_exp.write(row, 0, '• Valeur proche de 0 : pas de corrélation linéaire', text_format)
+    row += 2
+    
+    worksheet_exp.write(row, 0, 'Granger Causality:', bold_format)
+    row += 1
+    worksheet_exp.write(row, 0, '• Teste si les petits feux permettent de prédire les grands feux', text_format)
+    row += 1
+    worksheet_exp.write(row, 0, '• p-value < 0.05 : causalité significative (les petits feux prédisent les grands feux)', text_format)
+    row += 1
+    worksheet_exp.write(row, 0, '• p-value ≥ 0.05 : pas de causalité statistiquement significative', text_format)
+    row += 2
+    
+    worksheet_exp.write(row, 0, 'Mutual Information:', bold_format)
+    row += 1
+    worksheet_exp.write(row, 0, '• Quantifie l\'information partagée entre petits et grands feux', text_format)
+    row += 1
+    worksheet_exp.write(row, 0, '• Valeur élevée : forte dépendance entre les deux phénomènes', text_format)
+    row += 1
+    worksheet_exp.write(row, 0, '• Valeur proche de 0 : phénomènes indépendants', text_format)
 
 
 def export_results(big_fires: pd.DataFrame, analysis_results: List[Dict], 
@@ -18,94 +135,287 @@ def export_results(big_fires: pd.DataFrame, analysis_results: List[Dict],
         big_fires_export.to_excel(writer, sheet_name='Grands_feux', index=False)
         
         # Feuille 2 : Analyse détaillée
-        if analysis_results:
-            analysis_data = []
-            for idx, result in enumerate(analysis_results):
-                if result['valid'] and result['condition_met']:
-                    bf = big_fires.iloc[idx]
-                    analysis_data.append({
-                        'Grand_feu_date': bf['date_alerte'],
-                        'Commune': bf['commune'],
-                        'Surface_ha': bf['surface_ha'],
-                        'Petits_feux_avant': result['small_fires_count'],
-                        'Moyens_feux_avant': result['medium_fires_count'],
-                        'Tendance': result['trend'],
-                        'Pente': result['slope'],
-                        'Feux_dans_buffer': len(result['fires_in_buffer'])
-                    })
-            
-            if analysis_data:
-                pd.DataFrame(analysis_data).to_excel(writer, sheet_name='Analyse', index=False)
+        retained = _retained_positions(analysis_results)
+        if retained:
+            analysis_sheet(big_fires, analysis_results, retained).to_excel(
+                writer, sheet_name='Analyse', index=False
+            )
         
         # Feuille 3 : Détails des feux dans buffers
-        if analysis_results:
-            all_buffer_fires = []
-            for idx, result in enumerate(analysis_results):
-                if result['valid'] and result['condition_met']:
-                    bf = big_fires.iloc[idx]
-                    for _, fire in result['fires_in_buffer'].iterrows():
-                        all_buffer_fires.append({
-                            'Grand_feu_commune': bf['commune'],
-                            'Grand_feu_date': bf['date_alerte'],
-                            'Feu_buffer_date': fire['date_alerte'],
-                            'Feu_buffer_commune': fire['commune'],
-                            'Type': fire['categorie'],
-                            'Surface_ha': fire['surface_ha'],
-                            'Distance_km': fire['distance_km']
-                        })
-            
-            if all_buffer_fires:
-                pd.DataFrame(all_buffer_fires).to_excel(writer, sheet_name='Feux_buffers', index=False)
+        if retained:
+            buffer_fires = buffer_fires_sheet(big_fires, analysis_results, retained)
+            if len(buffer_fires) > 0:
+                buffer_fires.to_excel(writer, sheet_name='Feux_buffers', index=False)
         
         # Feuille 4 : Analyse de corrélation
         if correlation_summary is not None:
             correlation_summary.to_excel(writer, sheet_name='Correlation', index=False)
             
             # Ajouter une feuille avec des explications
-            workbook = writer.book
-            worksheet_exp = workbook.add_worksheet('Explications_Correlation')
-            
-            bold_format = workbook.add_format({'bold': True, 'font_size': 12})
-            text_format = workbook.add_format({'text_wrap': True, 'valign': 'top'})
-            
-            row = 0
-            worksheet_exp.write(row, 0, 'Interprétation des Résultats de Corrélation', bold_format)
-            row += 2
-            
-            worksheet_exp.write(row, 0, 'Cross-Correlation:', bold_format)
-            row += 1
-            worksheet_exp.write(row, 0, '• Mesure la similarité entre les séries temporelles de petits et grands feux', text_format)
-            row += 1
-            worksheet_exp.write(row, 0, '• Valeur proche de 1 : forte corrélation positive', text_format)
-            row += 1
-            worksheet_exp.write(row, 0, '• Valeur proche de -1 : forte corrélation négative', text_format)
-            row += 1
-            worksheet_exp.write(row, 0, '• Valeur proche de 0 : pas de corrélation linéaire', text_format)
-            row += 2
-            
-            worksheet_exp.write(row, 0, 'Granger Causality:', bold_format)
-            row += 1
-            worksheet_exp.write(row, 0, '• Teste si les petits feux permettent de prédire les grands feux', text_format)
-            row += 1
-            worksheet_exp.write(row, 0, '• p-value < 0.05 : causalité significative (les petits feux prédisent les grands feux)', text_format)
-            row += 1
-            worksheet_exp.write(row, 0, '• p-value ≥ 0.05 : pas de causalité statistiquement significative', text_format)
-            row += 2
-            
-            worksheet_exp.write(row, 0, 'Mutual Information:', bold_format)
-            row += 1
-            worksheet_exp.write(row, 0, '• Quantifie l\'information partagée entre petits et grands feux', text_format)
-            row += 1
-            worksheet_exp.write(row, 0, '• Valeur élevée : forte dépendance entre les deux phénomènes', text_format)
-            row += 1
-            worksheet_exp.write(row, 0, '• Valeur proche de 0 : phénomènes indépendants', text_format)
-            
-            worksheet_exp.set_column(0, 0, 80)
+            _write_correlation_explanations(writer.book)
     
     output.seek(0)
     return output.getvalue()
 
 
+class _SheetStream:
+    """
+    Feuille écrite ligne à ligne (mode constant_memory) : les lignes au-delà de la limite
+    d'Excel continuent sur une nouvelle feuille (nom_2, nom_3...) avec le même en-tête
+    """
+
+    def __init__(self, workbook, name: str, columns: List[str], formats: Dict,
+                 max_rows: int = EXCEL_MAX_ROWS):
+        self.workbook = workbook
+        self.name = name
+        self.columns = list(columns)
+        self.formats = formats
+        self.max_rows = max_rows
+        self.parts = 0
+        self.worksheet = None
+        self.row = max_rows
+
+    def _next_sheet(self) -> None:
+        self.parts += 1
+        suffix = '' if self.parts == 1 else f'_{self.parts}'
+        self.worksheet = self.workbook.add_worksheet(f'{self.name[:31 - len(suffix)]}{suffix}')
+        self.worksheet.write_row(0, 0, self.columns, self.formats['header'])
+        self.row = 1
+
+    def write(self, frame: pd.DataFrame) -> None:
+        """Ajoute les lignes du DataFrame (colonnes converties une fois, NaN / NaT laissés vides)"""
+        values = [frame[name].astype(object).where(frame[name].notna(), None).to_numpy()
+                  for name in self.columns]
+        for row_values in zip(*values):
+            if self.row >= self.max_rows:
+                self._next_sheet()
+            self.worksheet.write_row(self.row, 0, row_values)
+            self.row += 1
+
+    def close(self) -> None:
+        """Crée la feuille (en-tête seul) si aucune ligne n'a été écrite"""
+        if self.parts == 0:
+            self._next_sheet()
+
+
+def _stream_frames(workbook, name: str, frames: Iterable[pd.DataFrame], formats: Dict,
+                   max_rows: int = EXCEL_MAX_ROWS) -> None:
+    """Écrit une suite de DataFrames de mêmes colonnes dans une feuille découpée si besoin"""
+    stream = None
+    for frame in frames:
+        if stream is None:
+            stream = _SheetStream(workbook, name, frame.columns, formats, max_rows)
+        stream.write(frame)
+    if stream is not None:
+        stream.close()
+
+
+def export_results_to_file(big_fires: pd.DataFrame, analysis_results: List[Dict],
+                           correlation_summary: Optional[pd.DataFrame] = None,
+                           path: Optional[str] = None, max_rows: int = EXCEL_MAX_ROWS) -> str:
+    """
+    Export Excel en flux vers un fichier (mêmes feuilles que export_results)
+    - xlsxwriter en mode constant_memory : chaque ligne est écrite sur disque dès sa création
+    - Feux_buffers assemblée par lots de grands feux, jamais en entier en mémoire
+    - feuilles découpées au-delà de max_rows lignes (limite d'Excel)
+    Retourne: chemin du fichier (temporaire si path n'est pas fourni)
+    """
+    if path is None:
+        handle, path = tempfile.mkstemp(prefix='analyse_incendies_', suffix='.xlsx')
+        os.close(handle)
+
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True,
+                                          'default_date_format': 'yyyy-mm-dd hh:mm:ss'})
+    formats = {'header': workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})}
+    try:
+        # Feuille 1 : Grands feux
+        _stream_frames(workbook, 'Grands_feux',
+                       [big_fires[['annee', 'commune', 'date_alerte', 'surface_ha', 'x', 'y']]],
+                       formats, max_rows)
+
+        retained = _retained_positions(analysis_results)
+        if retained:
+            # Feuille 2 : Analyse détaillée
+            _stream_frames(workbook, 'Analyse', [analysis_sheet(big_fires, analysis_results, retained)],
+                           formats, max_rows)
+
+            # Feuille 3 : Détails des feux dans buffers, par lots
+            batches = (buffer_fires_sheet(big_fires, analysis_results,
+                                          retained[start:start + _STREAM_BATCH_FIRES])
+                       for start in range(0, len(retained), _STREAM_BATCH_FIRES))
+            _stream_frames(workbook, 'Feux_buffers', (b for b in batches if len(b) > 0), formats, max_rows)
+
+        # Feuille 4 : Analyse de corrélation
+        if correlation_summary is not None:
+            _stream_frames(workbook, 'Correlation', [correlation_summary], formats, max_rows)
+            _write_correlation_explanations(workbook)
+    finally:
+        workbook.close()
+    return path
+
+
+def export_parquet(df: pd.DataFrame) -> bytes:
+    """Exporte un DataFrame en Parquet (types conservés, compression zstd)"""
+    output = io.BytesIO()
+    df.to_parquet(output, index=False, compression='zstd')
+    return output.getvalue()
+
+
+def export_arrow(df: pd.DataFrame) -> bytes:
+    """Exporte un DataFrame en fichier Arrow IPC compressé zstd (lecture avec pyarrow / polars)"""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    options = pa.ipc.IpcWriteOptions(compression='zstd')
+    with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def big_fire_geometries(big_fires: pd.DataFrame, buffer_radius_km: float, quad_segs: int = 16):
+    """Points des grands feux et buffers circulaires (appels shapely vectorisés, Lambert-93)"""
+    points = shapely.points(big_fires['x'].to_numpy(dtype=float), big_fires['y'].to_numpy(dtype=float))
+    return points, shapely.buffer(points, buffer_radius_km * 1000, quad_segs=quad_segs)
+
+
+def big_fire_table(big_fires: pd.DataFrame, analysis_results: List[Dict]) -> pd.DataFrame:
+    """Attributs de chaque grand feu et résultat de son analyse (tous les grands feux)"""
+    return pd.DataFrame({
+        'annee': big_fires['annee'].to_numpy(),
+        'commune': big_fires['commune'].to_numpy(),
+        'date_alerte': big_fires['date_alerte'].to_numpy(),
+        'surface_ha': big_fires['surface_ha'].to_numpy(),
+        'x': big_fires['x'].to_numpy(),
+        'y': big_fires['y'].to_numpy(),
+        'petits_feux_avant': [r.get('small_fires_count', 0) for r in analysis_results],
+        'moyens_feux_avant': [r.get('medium_fires_count', 0) for r in analysis_results],
+        'feux_dans_buffer': [len(r['fires_in_buffer']) for r in analysis_results],
+        'tendance': [r.get('trend') for r in analysis_results],
+        'condition_remplie': [bool(r['valid'] and r['condition_met']) for r in analysis_results]
+    })
+
+
+def _lambert93_projjson() -> Dict:
+    """CRS Lambert-93 au format PROJJSON (complet si pyproj est disponible)"""
+    try:
+        from pyproj import CRS
+        return CRS.from_epsg(LAMBERT93_EPSG).to_json_dict()
+    except ImportError:
+        return {'type': 'ProjectedCRS', 'name': 'RGF93 v1 / Lambert-93',
+                'id': {'authority': 'EPSG', 'code': LAMBERT93_EPSG}}
+
+
+def export_geoparquet(big_fires: pd.DataFrame, analysis_results: List[Dict],
+                      buffer_radius_km: float) -> bytes:
+    """
+    GeoParquet 1.0 des grands feux : buffer (géométrie principale) et point, encodés en WKB
+    Écrit directement avec pyarrow (métadonnées 'geo'), sans dépendre de geopandas
+    """
+    points, buffers = big_fire_geometries(big_fires, buffer_radius_km)
+    table = pa.Table.from_pandas(big_fire_table(big_fires, analysis_results), preserve_index=False)
+    table = table.append_column('geometry', pa.array(shapely.to_wkb(buffers), pa.binary()))
+    table = table.append_column('point', pa.array(shapely.to_wkb(points), pa.binary()))
+
+    crs = _lambert93_projjson()
+    geo = {
+        'version': '1.0.0',
+        'primary_column': 'geometry',
+        'columns': {
+            'geometry': {'encoding': 'WKB', 'geometry_types': ['Polygon'], 'crs': crs,
+                         'bbox': shapely.total_bounds(buffers).tolist()},
+            'point': {'encoding': 'WKB', 'geometry_types': ['Point'], 'crs': crs,
+                      'bbox': shapely.total_bounds(points).tolist()}
+        }
+    }
+    metadata = {**(table.schema.metadata or {}), b'geo': json.dumps(geo).encode('utf-8')}
+    output = io.BytesIO()
+    pq.write_table(table.replace_schema_metadata(metadata), output, compression='zstd')
+    return output.getvalue()
+
+
+def export_geopackage(big_fires: pd.DataFrame, analysis_results: List[Dict],
+                      buffer_radius_km: float) -> Optional[bytes]:
+    """GeoPackage à deux couches (grands_feux : points, buffers : polygones) ; None sans geopandas"""
+    if not HAS_GEOPANDAS:
+        return None
+    points, buffers = big_fire_geometries(big_fires, buffer_radius_km)
+    attributes = big_fire_table(big_fires, analysis_results)
+    crs = f'EPSG:{LAMBERT93_EPSG}'
+
+    handle, path = tempfile.mkstemp(suffix='.gpkg')
+    os.close(handle)
+    os.remove(path)
+    try:
+        gpd.GeoDataFrame(attributes, geometry=points, crs=crs).to_file(path, layer='grands_feux', driver='GPKG')
+        gpd.GeoDataFrame(attributes, geometry=buffers, crs=crs).to_file(path, layer='buffers', driver='GPKG')
+        with open(path, 'rb') as f:
+            return f.read()
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
 def export_csv(df: pd.DataFrame) -> str:
     """Exporte les données filtrées en CSV"""
     return df.to_csv(index=False, sep=';')
+
+
+def iter_csv_chunks(df: pd.DataFrame, sep: str = ';', chunk_rows: int = CSV_CHUNK_ROWS,
+                    compress: bool = False, encoding: str = 'utf-8') -> Iterator[bytes]:
+    """
+    CSV en flux : blocs d'octets encodés (en-tête puis chunk_rows lignes à la fois),
+    compressés en gzip à la volée si compress ; le contenu décompressé est identique à export_csv
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if compress else None
+
+    def encode(text: str) -> bytes:
+        data = text.encode(encoding)
+        return compressor.compress(data) if compressor else data
+
+    yield encode(df.iloc[:0].to_csv(index=False, sep=sep))
+    for start in range(0, len(df), chunk_rows):
+        chunk = encode(df.iloc[start:start + chunk_rows].to_csv(index=False, header=False, sep=sep))
+        if chunk:
+            yield chunk
+    if compressor:
+        yield compressor.flush()
+
+
+def write_csv(df: pd.DataFrame, path: str, compress: bool = False, chunk_rows: int = CSV_CHUNK_ROWS) -> str:
+    """
+    Écrit le CSV bloc par bloc dans un fichier (mémoire bornée par chunk_rows)
+    La borne vaut pour le fichier et la ligne de commande ; le téléchargement depuis la page relit
+    le fichier en entier (voir download_cache.deferred_download)
+    """
+    with open(path, 'wb') as f:
+        for chunk in iter_csv_chunks(df, chunk_rows=chunk_rows, compress=compress):
+            f.write(chunk)
+    return path
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Export CSV en ligne de commande : python -m modules.export data.csv sortie.csv.gz --gzip"""
+    from .core.ingest import read_fires, classify_fires
+
+    parser = argparse.ArgumentParser(description="Export CSV (en flux) des incendies filtrés et classifiés")
+    parser.add_argument('source', help="Fichier CSV des incendies")
+    parser.add_argument('output', help="Fichier CSV de sortie")
+    parser.add_argument('--annee-debut', type=int, default=None)
+    parser.add_argument('--annee-fin', type=int, default=None)
+    parser.add_argument('--seuil-petit', type=float, default=1.0)
+    parser.add_argument('--seuil-grand', type=float, default=10.0)
+    parser.add_argument('--gzip', action='store_true', help="Compression gzip à la volée")
+    parser.add_argument('--chunk-rows', type=int, default=CSV_CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    df = read_fires(args.source)
+    if args.annee_debut is not None:
+        df = df[df['annee'] >= args.annee_debut]
+    if args.annee_fin is not None:
+        df = df[df['annee'] <= args.annee_fin]
+    df = classify_fires(df, args.seuil_petit, args.seuil_grand)
+    write_csv(df, args.output, compress=args.gzip, chunk_rows=args.chunk_rows)
+    print(f"{len(df)} feux exportés dans {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+"""
+Module de table de features précurseurs pour tous les feux (stockage Parquet versionné)
+"""
+
+import hashlib
+import os
+from typing import Optional, Sequence
+import numpy as np
+import pandas as pd
+
+from .core.indexes import SpatioTemporalIndex
+
+FEATURE_RADII_KM = (2, 5, 10)
+FEATURE_WINDOWS_DAYS = (7, 15, 30)
+FEATURE_STORE_DIR = 'cache/features'
+
+# Catégories comptées avant chaque feu (préfixe des colonnes)
+_COUNTED = {'Petit feu': 'petits', 'Feu moyen': 'moyens'}
+
+
+def _departement(df: pd.DataFrame) -> pd.Series:
+    """Code département sur deux caractères (colonne 'depart', à défaut le code INSEE)"""
+    if 'depart' in df.columns:
+        codes = pd.to_numeric(df['depart'], errors='coerce')
+    elif 'Code INSEE' in df.columns:
+        codes = pd.to_numeric(df['Code INSEE'], errors='coerce') // 1000
+    else:
+        return pd.Series('', index=df.index)
+    return codes.map(lambda c: f'{int(c):02d}' if pd.notna(c) else '')
+
+
+def precursor_counts(index: SpatioTemporalIndex, marks: np.ndarray, n_marks: int,
+                     radii_m: np.ndarray, lags_days: np.ndarray,
+                     recency_radius_m: float) -> tuple:
+    """
+    Balayage unique des paires (antérieur → feu) à moins du plus grand rayon et de la plus grande fenêtre
+    - comptes cumulés (feu × catégorie × rayon ≤ r × décalage ≤ τ), fenêtre [t - τ, t)
+    - délai depuis le dernier feu à moins de recency_radius_m (NaN au-delà de la plus grande fenêtre)
+    Ordre chronologique de l'index
+    """
+    n, nr, nt = len(index), len(radii_m), len(lags_days)
+    hist = np.zeros(n * n_marks * nr * nt, dtype=np.int64)
+    last = np.full(n, np.inf)
+
+    for i, j, dist, lag in index.iter_pairs(radii_m[-1], lags_days[-1]):
+        keep = lag > 0
+        i, j, dist, lag = i[keep], j[keep], dist[keep], lag[keep]
+        near = dist <= recency_radius_m
+        np.minimum.at(last, j[near], lag[near])
+
+        counted = marks[i] >= 0
+        i, j, dist, lag = i[counted], j[counted], dist[counted], lag[counted]
+        # Classes fermées à droite : un feu à exactement r km / τ jours est compté
+        ri = np.searchsorted(radii_m, dist, side='left')
+        ti = np.searchsorted(lags_days, lag, side='left')
+        flat = ((j * n_marks + marks[i]) * nr + ri) * nt + ti
+        hist += np.bincount(flat, minlength=hist.size)
+
+    counts = hist.reshape(n, n_marks, nr, nt).cumsum(axis=2).cumsum(axis=3)
+    return counts, np.where(np.isfinite(last), last, np.nan)
+
+
+def build_feature_table(df: pd.DataFrame, radii_km: Sequence[float] = FEATURE_RADII_KM,
+                        windows_days: Sequence[float] = FEATURE_WINDOWS_DAYS,
+                        recency_radius_km: float = 5.0) -> pd.DataFrame:
+    """
+    Table de features pour chaque feu daté (index du DataFrame conservé)
+    - petits_/moyens_{r}km_{w}j : feux de la catégorie dans le rayon et la fenêtre précédents
+    - pente_petits_{r}km_{w}j : tendance des petits feux (moitié récente - moitié ancienne, par jour) ;
+      les données n'ont pas de relief, la « pente » locale est celle de l'activité
+    - jours_depuis_feu_proche, heure, mois, jour_annee, jour_semaine, departement
+    """
+    df_valid = df[df['date_alerte'].notna()]
+    index = SpatioTemporalIndex.from_frame(df_valid)
+
+    radii_km = sorted(radii_km)
+    windows_days = sorted(windows_days)
+    radii_m = np.asarray(radii_km, dtype=float) * 1000
+    # Demi-fenêtres ajoutées aux bornes pour la pente
+    lags = np.unique(np.concatenate([windows_days, np.asarray(windows_days) / 2])).astype(float)
+
+    categories = list(_COUNTED)
+    marks = pd.Categorical(df_valid['categorie'], categories=categories).codes.astype(np.int64)[index.rows]
+    counts, last = precursor_counts(index, marks, len(categories), radii_m, lags, recency_radius_km * 1000)
+
+    # Retour à l'ordre des lignes du DataFrame
+    position = np.empty(len(index), dtype=np.int64)
+    position[index.rows] = np.arange(len(index))
+    counts = counts[position]
+
+    dates = df_valid['date_alerte']
+    table = pd.DataFrame({
+        'date_alerte': dates,
+        'annee': df_valid['annee'],
+        'x': df_valid['x'],
+        'y': df_valid['y'],
+        'commune': df_valid['commune'],
+        'categorie': df_valid['categorie'],
+        'surface_ha': df_valid['surface_ha'],
+        'departement': _departement(df_valid),
+        'heure': dates.dt.hour.astype(np.int8),
+        'mois': dates.dt.month.astype(np.int8),
+        'jour_annee': dates.dt.dayofyear.astype(np.int16),
+        'jour_semaine': dates.dt.dayofweek.astype(np.int8),
+        'jours_depuis_feu_proche': last[position]
+    }, index=df_valid.index)
+
+    features = {}
+    for c, prefix in enumerate(categories):
+        for r, radius in enumerate(radii_km):
+            for window in windows_days:
+                t = int(np.searchsorted(lags, window))
+                features[f'{_COUNTED[prefix]}_{radius:g}km_{window:g}j'] = counts[:, c, r, t].astype(np.int32)
+    for r, radius in enumerate(radii_km):
+        for window in windows_days:
+            full = counts[:, 0, r, int(np.searchsorted(lags, window))]
+            recent = counts[:, 0, r, int(np.searchsorted(lags, window / 2))]
+            features[f'pente_petits_{radius:g}km_{window:g}j'] = (2 * recent - full) / (window / 2)
+
+    return pd.concat([table, pd.DataFrame(features, index=df_valid.index)], axis=1)
+
+
+def feature_store_path(version: str, seuil_petit: float, seuil_grand: float,
+                       radii_km: Sequence[float] = FEATURE_RADII_KM,
+                       windows_days: Sequence[float] = FEATURE_WINDOWS_DAYS,
+                       root: str = FEATURE_STORE_DIR) -> str:
+    """Chemin Parquet versionné par jeu de données, seuils et grille de rayons / fenêtres"""
+    key = repr((version, float(seuil_petit), float(seuil_grand),
+                tuple(sorted(radii_km)), tuple(sorted(windows_days))))
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    stem = os.path.splitext(version.split(':')[0])[0]
+    return os.path.join(root, f'{stem}_{digest}.parquet')
+
+
+def load_or_build_features(df: pd.DataFrame, version: str, seuil_petit: float, seuil_grand: float,
+                           radii_km: Sequence[float] = FEATURE_RADII_KM,
+                           windows_days: Sequence[float] = FEATURE_WINDOWS_DAYS,
+                           root: str = FEATURE_STORE_DIR) -> pd.DataFrame:
+    """
+    Lit la table de features si elle existe pour cette version, sinon la construit et l'écrit
+    df doit être classifié avec (seuil_petit, seuil_grand) ; écriture atomique (fichier temporaire)
+    """
+    path = feature_store_path(version, seuil_petit, seuil_grand, radii_km, windows_days, root)
+    if os.path.exists(path):
+        return pd.read_parquet(path)
+
+    table = build_feature_table(df, radii_km, windows_days)
+    table.attrs = {
+        'dataset_version': version,
+        'seuil_petit': float(seuil_petit),
+        'seuil_grand': float(seuil_grand),
+        'radii_km': [float(r) for r in radii_km],
+        'windows_days': [float(w) for w in windows_days]
+    }
+    os.makedirs(root, exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    table.to_parquet(tmp_path)
+    os.replace(tmp_path, path)
+    return table
+
+
+def feature_columns(table: pd.DataFrame) -> list:
+    """Colonnes numériques utilisables comme variables explicatives"""
+    prefixes = ('petits_', 'moyens_', 'pente_')
+    return [c for c in table.columns if c.startswith(prefixes)] + [
+        'jours_depuis_feu_proche', 'heure', 'mois', 'jour_annee', 'jour_semaine'
+    ]
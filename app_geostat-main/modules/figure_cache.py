@@ -0,0 +1,94 @@
+"""
+Module de mémoïsation des figures Plotly (JSON sérialisé, éviction LRU, budget en octets)
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional
+import plotly.graph_objects as go
+import plotly.io as pio
+import streamlit as st
+
+
+class FigureCache:
+    """
+    Cache LRU de figures sérialisées en JSON
+    Les clés sont des identifiants compacts (version des données, paramètres, index du feu)
+    afin de ne jamais hacher de DataFrame
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[go.Figure]:
+        """Retourne la figure en cache (et la marque comme récente) ou None"""
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return pio.from_json(payload.decode('utf-8'), skip_invalid=True)
+
+    def put(self, key: Hashable, fig: go.Figure) -> None:
+        """Sérialise et stocke une figure, puis évince les plus anciennes au-delà du budget"""
+        payload = fig.to_json().encode('utf-8')
+        if len(payload) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = payload
+            self._size += len(payload)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def get_or_create(self, key: Hashable, builder: Callable[[], go.Figure]) -> go.Figure:
+        """Retourne la figure en cache ou la construit via builder()"""
+        fig = self.get(key)
+        if fig is None:
+            fig = builder()
+            self.put(key, fig)
+        return fig
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+@st.cache_resource
+def get_figure_cache() -> FigureCache:
+    """Instance partagée du cache de figures (une par processus Streamlit)"""
+    return FigureCache()
+
+
+def dataset_version(file_path: str) -> str:
+    """Version du jeu de données à partir des métadonnées du fichier (sans le lire)"""
+    stat = os.stat(file_path)
+    return f"{os.path.basename(file_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def cached_figure(name: str, version: str, params: tuple,
+                  builder: Callable[[], go.Figure]) -> go.Figure:
+    """Raccourci : figure identifiée par (nom, version des données, paramètres)"""
+    return get_figure_cache().get_or_create((name, version, params), builder)
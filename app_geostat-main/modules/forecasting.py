@@ -0,0 +1,291 @@
+"""
+Module de prévision des grands feux (cellule × jour) avec validation à origine glissante
+"""
+
+import itertools
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import average_precision_score, roc_auc_score
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+from .hotspots import distance_band_weights
+
+FORECAST_MODELS = {
+    'logistic': 'Régression logistique',
+    'gradient_boosting': 'Gradient boosting'
+}
+
+SEASONS = np.array(['Hiver', 'Hiver', 'Printemps', 'Printemps', 'Printemps', 'Été',
+                    'Été', 'Été', 'Automne', 'Automne', 'Automne', 'Hiver'])
+
+_WINDOWS_DAYS = (7, 30, 90)
+
+
+# Budget mémoire de la matrice de features (float32) : au-delà, la maille est trop fine
+MAX_MATRIX_BYTES = 256 * 1024 * 1024
+
+
+class MatrixTooLargeError(ValueError):
+    """Matrice de prévision au-delà du budget mémoire (maille trop fine pour la période)"""
+
+FEATURE_COLUMNS = (
+    [f'{kind}_{window}j' for window in _WINDOWS_DAYS for kind in ('petits', 'moyens')]
+    + ['tendance_petits', 'grands_365j', 'grands_historique', 'jours_depuis_petit_feu',
+       'saison_sin', 'saison_cos', 'x_km', 'y_km']
+)
+
+
+def _past_counts(cum: np.ndarray, window: int) -> np.ndarray:
+    """Comptes sur [j - window, j) à partir des cumuls (cellules × jours + 1)"""
+    n_days = cum.shape[1] - 1
+    days = np.arange(n_days)
+    return cum[:, days] - cum[:, np.maximum(days - window, 0)]
+
+
+def _cumulative(cube: np.ndarray) -> np.ndarray:
+    """Cumuls par cellule (cellules × jours + 1, première colonne nulle), comptes entiers en int32"""
+    cum = np.zeros((cube.shape[0], cube.shape[1] + 1), dtype=np.int32)
+    np.cumsum(cube, axis=1, out=cum[:, 1:], dtype=np.int32)
+    return cum
+
+
+def build_forecast_matrix(df: pd.DataFrame, cell_size_m: float = 10000,
+                          horizon_days: int = 14, max_bytes: int = MAX_MATRIX_BYTES) -> Dict:
+    """
+    Matrice de features (cellule × jour) calculée une seule fois, uniquement à partir du passé
+    Les lignes sont ordonnées par jour : l'apprentissage d'un pli est un préfixe des lignes
+    Seules les cellules contenant au moins un feu forment des lignes ; chaque feature est écrite
+    directement dans sa colonne float32 (un seul tableau cellules × jours temporaire à la fois)
+    Cible : au moins un grand feu dans la cellule pendant [j, j + horizon)
+    """
+    df_valid = df[df['date_alerte'].notna()]
+    cells = np.column_stack([
+        np.floor(df_valid['x'].to_numpy(dtype=float) / cell_size_m),
+        np.floor(df_valid['y'].to_numpy(dtype=float) / cell_size_m)
+    ]).astype(np.int64)
+    unique_cells, loc = np.unique(cells, axis=0, return_inverse=True)
+    loc = loc.ravel()
+    centres = (unique_cells + 0.5) * cell_size_m
+
+    day0 = df_valid['date_alerte'].min().normalize()
+    day = ((df_valid['date_alerte'] - day0).dt.days).to_numpy(dtype=np.int64)
+    n_cells, n_days = len(centres), int(day.max()) + 1
+    dates = pd.date_range(day0, periods=n_days, freq='D')
+
+    n_bytes = n_cells * n_days * len(FEATURE_COLUMNS) * np.dtype(np.float32).itemsize
+    if n_bytes > max_bytes:
+        raise MatrixTooLargeError(
+            f"Matrice de prévision trop volumineuse ({n_cells} cellules × {n_days} jours, "
+            f"{n_bytes / 1024 ** 2:.0f} Mo) : augmentez la maille"
+        )
+
+    # Ordre jour-majeur : ligne = jour × n_cellules + cellule
+    X = np.empty((n_days * n_cells, len(FEATURE_COLUMNS)), dtype=np.float32)
+
+    def put(name: str, values: np.ndarray) -> None:
+        """Écrit une feature (cellules × jours) dans sa colonne, sans copie intermédiaire de X"""
+        X[:, FEATURE_COLUMNS.index(name)].reshape(n_days, n_cells)[...] = values.T
+
+    def daily(category: str) -> np.ndarray:
+        mask = (df_valid['categorie'] == category).to_numpy()
+        return np.bincount(loc[mask] * n_days + day[mask],
+                           minlength=n_cells * n_days).reshape(n_cells, n_days).astype(np.int32)
+
+    # Voisinage : la cellule et ses 8 voisines (poids creux appliqués à tous les jours)
+    weights = distance_band_weights(centres, 1.5 * cell_size_m)
+
+    small = weights @ daily('Petit feu')
+    small_cum = _cumulative(small)
+    # Jours depuis le dernier petit feu du voisinage (plafonné à un an)
+    last = np.where(small > 0, np.arange(n_days)[None, :], -10**6)
+    del small
+    np.maximum.accumulate(last, axis=1, out=last)
+    since = np.empty_like(last)
+    since[:, 0] = 365
+    since[:, 1:] = np.arange(1, n_days)[None, :] - 1 - last[:, :-1]
+    del last
+    put('jours_depuis_petit_feu', np.minimum(since, 365))
+    del since
+
+    medium_cum = _cumulative(weights @ daily('Feu moyen'))
+    for window in _WINDOWS_DAYS:
+        put(f'petits_{window}j', _past_counts(small_cum, window))
+        put(f'moyens_{window}j', _past_counts(medium_cum, window))
+    del medium_cum
+    put('tendance_petits', _past_counts(small_cum, 7) - _past_counts(small_cum, 30) * 7 / 30)
+    del small_cum
+
+    big = daily('Grand feu')
+    big_cum = _cumulative(weights @ big)
+    put('grands_365j', _past_counts(big_cum, 365))
+    put('grands_historique', big_cum[:, :-1])
+    del big_cum
+
+    doy = dates.dayofyear.to_numpy()
+    X[:, FEATURE_COLUMNS.index('saison_sin')] = np.repeat(np.sin(2 * np.pi * doy / 365.25), n_cells)
+    X[:, FEATURE_COLUMNS.index('saison_cos')] = np.repeat(np.cos(2 * np.pi * doy / 365.25), n_cells)
+    X[:, FEATURE_COLUMNS.index('x_km')] = np.tile(centres[:, 0] / 1000, n_days)
+    X[:, FEATURE_COLUMNS.index('y_km')] = np.tile(centres[:, 1] / 1000, n_days)
+
+    # Cible : grand feu dans la cellule pendant les horizon_days jours suivants
+    own_big_cum = _cumulative(big)
+    days = np.arange(n_days)
+    future = own_big_cum[:, np.minimum(days + horizon_days, n_days)] - own_big_cum[:, days]
+
+    return {
+        'X': X,
+        'y': (future.T.ravel() > 0).astype(np.int8),
+        'columns': list(FEATURE_COLUMNS),
+        'dates': dates,
+        'n_cells': n_cells,
+        'centres': centres,
+        'cell_size_m': cell_size_m,
+        'horizon_days': horizon_days
+    }
+
+
+def _make_model(model: str):
+    if model == 'logistic':
+        return make_pipeline(StandardScaler(), LogisticRegression(class_weight='balanced', max_iter=1000))
+    if model == 'gradient_boosting':
+        return HistGradientBoostingClassifier(max_iter=200, learning_rate=0.05, class_weight='balanced',
+                                              random_state=0)
+    raise ValueError(f"Modèle inconnu : {model}")
+
+
+def _matrix_arrays(source):
+    """
+    (X, y, lignes conservées) : tableaux en mémoire (même processus) ou, pour un sous-processus,
+    fichiers .npy projetés en mémoire (memmap) : X n'est jamais sérialisé vers les workers
+    """
+    if isinstance(source, str):
+        return tuple(np.load(os.path.join(source, f'{name}.npy'), mmap_mode='r')
+                     for name in ('X', 'y', 'kept_rows'))
+    return source
+
+
+def _run_fold(args) -> List[Dict]:
+    """Entraîne sur le préfixe du pli et évalue par saison sur la période de test (sous-processus)"""
+    model_name, fold, source, n_train, test_start, test_end, test_months = args
+    X, y, kept_rows = _matrix_arrays(source)
+    train_rows = kept_rows[:n_train]
+    y_train = np.asarray(y[train_rows])
+    if y_train.sum() == 0:
+        return []
+    X_train = np.asarray(X[train_rows])
+    X_test = np.asarray(X[test_start:test_end])
+    y_test = np.asarray(y[test_start:test_end])
+    start = time.perf_counter()
+    model = _make_model(model_name).fit(X_train, y_train)
+    scores = model.predict_proba(X_test)[:, 1]
+    fit_seconds = time.perf_counter() - start
+
+    rows = []
+    seasons = SEASONS[test_months - 1]
+    for season in ['Toutes'] + [s for s in ['Hiver', 'Printemps', 'Été', 'Automne'] if s in seasons]:
+        mask = np.ones(len(y_test), dtype=bool) if season == 'Toutes' else seasons == season
+        y_s, p_s = y_test[mask], scores[mask]
+        both = 0 < y_s.sum() < len(y_s)
+        rows.append({
+            'modele': model_name,
+            'pli': fold,
+            'saison': season,
+            'lignes': int(mask.sum()),
+            'positifs': int(y_s.sum()),
+            'taux_base': float(y_s.mean()) if len(y_s) else np.nan,
+            'roc_auc': roc_auc_score(y_s, p_s) if both else np.nan,
+            'pr_auc': average_precision_score(y_s, p_s) if both else np.nan,
+            'secondes': fit_seconds
+        })
+    return rows
+
+
+def rolling_origin_backtest(matrix: Dict, model: str = 'gradient_boosting',
+                            test_years: Optional[Sequence[int]] = None, negative_rate: float = 0.2,
+                            seed: int = 0, n_jobs: Optional[int] = None) -> pd.DataFrame:
+    """
+    Validation à origine glissante : un pli par année de test, apprentissage sur tout le passé
+    Les lignes dont la cible déborde sur la période de test sont exclues (pas de fuite)
+    Apprentissage sur tous les positifs et une fraction negative_rate des négatifs (les classes
+    sont rééquilibrées par le modèle) ; test sur toutes les lignes
+    Les plis sont entraînés en parallèle ; métriques ROC / PR par saison
+    """
+    dates, n_cells, horizon = matrix['dates'], matrix['n_cells'], matrix['horizon_days']
+    years = np.unique(dates.year)
+    if test_years is None:
+        test_years = years[2:]
+
+    # Tirage des négatifs commun à tous les plis : chaque apprentissage en est un préfixe
+    rng = np.random.default_rng(seed)
+    keep = (matrix['y'] > 0) | (rng.random(len(matrix['y'])) < negative_rate)
+    kept_rows = np.flatnonzero(keep)
+
+    tasks = []
+    for year in test_years:
+        origin = int(np.searchsorted(dates, pd.Timestamp(f'{year}-01-01')))
+        end = int(np.searchsorted(dates, pd.Timestamp(f'{year + 1}-01-01')))
+        train_end = max(origin - horizon + 1, 0)
+        # Les derniers jours du jeu n'ont pas d'horizon complet
+        end = min(end, len(dates) - horizon)
+        if train_end == 0 or end <= origin:
+            continue
+        test_months = np.repeat(dates.month.to_numpy()[origin:end], n_cells)
+        n_train = int(np.searchsorted(kept_rows, train_end * n_cells))
+        tasks.append((int(year), n_train, origin * n_cells, end * n_cells, test_months))
+    if not tasks:
+        return pd.DataFrame()
+
+    n_jobs = max(1, min(n_jobs or os.cpu_count() or 1, len(tasks)))
+    if n_jobs == 1:
+        source = (matrix['X'], matrix['y'], kept_rows)
+        results = [_run_fold((model, task[0], source) + task[1:]) for task in tasks]
+    else:
+        # Matrice écrite une fois sur disque, chaque worker la projette en mémoire (pages partagées)
+        with tempfile.TemporaryDirectory(prefix='geostat-forecast-') as source:
+            for name, array in (('X', matrix['X']), ('y', matrix['y']), ('kept_rows', kept_rows)):
+                np.save(os.path.join(source, f'{name}.npy'), array)
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                results = list(executor.map(
+                    _run_fold, [(model, task[0], source) + task[1:] for task in tasks]
+                ))
+    return pd.DataFrame([row for rows in results for row in rows])
+
+
+def evaluate_configurations(df: pd.DataFrame, models: Sequence[str] = tuple(FORECAST_MODELS),
+                            horizons_days: Sequence[int] = (7, 14, 30),
+                            cell_sizes_m: Sequence[float] = (5000, 10000),
+                            n_jobs: Optional[int] = None) -> pd.DataFrame:
+    """
+    Évalue une grille de configurations (modèle × horizon × maille), une matrice par (maille, horizon)
+    Retourne le classement par PR-AUC moyenne toutes saisons
+    """
+    summaries = []
+    for cell_size_m, horizon in itertools.product(cell_sizes_m, horizons_days):
+        matrix = build_forecast_matrix(df, cell_size_m, horizon)
+        for model in models:
+            metrics = rolling_origin_backtest(matrix, model, n_jobs=n_jobs)
+            if len(metrics) == 0:
+                continue
+            overall = metrics[metrics['saison'] == 'Toutes']
+            summaries.append({
+                'modele': model,
+                'maille_km': cell_size_m / 1000,
+                'horizon_jours': horizon,
+                'plis': len(overall),
+                'roc_auc': overall['roc_auc'].mean(),
+                'pr_auc': overall['pr_auc'].mean(),
+                'taux_base': overall['taux_base'].mean()
+            })
+    ranking = pd.DataFrame(summaries)
+    if len(ranking) == 0:
+        return ranking
+    ranking['gain_pr'] = ranking['pr_auc'] / ranking['taux_base']
+    return ranking.sort_values('pr_auc', ascending=False).reset_index(drop=True)
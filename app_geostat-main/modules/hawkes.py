@@ -0,0 +1,235 @@
+"""
+Module de processus ponctuel auto-excitant (Hawkes) spatio-temporel marqué par catégorie
+"""
+
+import time
+from typing import Dict, Optional, Sequence
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+
+from .density import compute_density_raster, density_extent
+from .core.indexes import SpatioTemporalIndex
+
+HAWKES_TYPES = ['Petit feu', 'Feu moyen', 'Grand feu']
+
+# Colonnes de probabilité de déclenchement par catégorie source
+_SOURCE_COLUMNS = {'Petit feu': 'p_petit', 'Feu moyen': 'p_moyen', 'Grand feu': 'p_grand'}
+
+
+def _background_density(x: np.ndarray, y: np.ndarray, marks: np.ndarray, n_types: int,
+                        bandwidth_km: float) -> np.ndarray:
+    """
+    Densité spatiale de fond de chaque feu pour sa propre catégorie (probabilité / km²)
+    Raster de densité par noyau (binning linéaire + FFT) lu au nœud le plus proche
+    """
+    cell_size_m = max(250.0, bandwidth_km * 1000 / 4)
+    extent = density_extent(x, y, cell_size_m, margin_m=3 * bandwidth_km * 1000)
+    ix = np.rint((x - extent[0]) / cell_size_m).astype(np.int64)
+    iy = np.rint((y - extent[1]) / cell_size_m).astype(np.int64)
+
+    density = np.zeros(len(x))
+    for k in range(n_types):
+        members = marks == k
+        if not members.any():
+            continue
+        raster = compute_density_raster(
+            pd.DataFrame({'x': x[members], 'y': y[members]}),
+            cell_size_m=cell_size_m, bandwidth_m=bandwidth_km * 1000, extent=extent
+        )
+        density[members] = raster['density'][iy[members], ix[members]] / members.sum()
+    # Plancher numérique : aucun feu n'a une intensité de fond nulle
+    return np.maximum(density, 1e-12)
+
+
+class _PairTable:
+    """
+    Paires (source antérieure → cible) à moins de cutoff_km et max_lag_days, calculées une fois
+    par l'index spatio-temporel ; chaque évaluation de la vraisemblance est alors O(paires)
+    """
+
+    def __init__(self, index: SpatioTemporalIndex, cutoff_km: float, max_lag_days: float):
+        src, dst, dist, lag = [], [], [], []
+        for i, j, d, tau in index.iter_pairs(cutoff_km * 1000, max_lag_days):
+            # Feux simultanés : pas d'ordre causal
+            keep = tau > 0
+            src.append(i[keep])
+            dst.append(j[keep])
+            dist.append(d[keep] / 1000)
+            lag.append(tau[keep])
+        empty = np.array([], dtype=np.int64)
+        self.src = np.concatenate(src) if src else empty
+        self.dst = np.concatenate(dst) if dst else empty
+        self.dist_sq = np.concatenate(dist) ** 2 if dist else np.array([])
+        self.lag = np.concatenate(lag) if lag else np.array([])
+
+    def __len__(self) -> int:
+        return len(self.src)
+
+
+class MarkedHawkes:
+    """
+    Processus de Hawkes marqué : intensité du type k en (t, s)
+        λ_k(t, s) = μ_k f_k(s) + Σ_{t_j < t} α[m_j, k] h(t - t_j) g(s - s_j)
+    h : noyau exponentiel β e^{-βτ} tronqué à max_lag_days, g : gaussien de largeur σ tronqué
+    à cutoff_km ; les deux sont normalisés, donc α[a, k] est le nombre moyen de feux de type k
+    déclenchés directement par un feu de type a (matrice de branchement)
+    """
+
+    def __init__(self, cutoff_km: float = 10.0, max_lag_days: float = 60.0,
+                 background_bandwidth_km: float = 5.0):
+        self.cutoff_km = cutoff_km
+        self.max_lag_days = max_lag_days
+        self.background_bandwidth_km = background_bandwidth_km
+
+    def _prepare(self, index: SpatioTemporalIndex, marks: np.ndarray, n_types: int) -> None:
+        self.marks = marks
+        self.n_types = n_types
+        self.t = index.t
+        self.horizon = index.t[-1] - index.t[0]
+        self.pairs = _PairTable(index, self.cutoff_km, self.max_lag_days)
+        self.pair_types = marks[self.pairs.src] * n_types + marks[self.pairs.dst]
+        self.background = _background_density(index.x, index.y, marks, n_types, self.background_bandwidth_km)
+        # Temps restant avant la fin de l'observation (borné par la troncature du noyau)
+        self.remaining = np.minimum(index.t[-1] - index.t, self.max_lag_days)
+        self.type_counts = np.bincount(marks, minlength=n_types)
+
+    def _unpack(self, theta: np.ndarray):
+        k = self.n_types
+        params = np.exp(theta)
+        return params[:k], params[k:k + k * k].reshape(k, k), params[-2], params[-1]
+
+    def _terms(self, beta: float, sigma: float):
+        """Noyaux des paires et leurs dérivées logarithmiques par rapport à β et σ"""
+        lag, dist_sq = self.pairs.lag, self.pairs.dist_sq
+        L, R2 = self.max_lag_days, self.cutoff_km ** 2
+
+        t_norm = -np.expm1(-beta * L)
+        h_t = beta * np.exp(-beta * lag) / t_norm
+        dlog_t = 1 / beta - lag - L * np.exp(-beta * L) / t_norm
+
+        c = R2 / (2 * sigma ** 2)
+        s_norm = -np.expm1(-c)
+        g_s = np.exp(-dist_sq / (2 * sigma ** 2)) / (2 * np.pi * sigma ** 2 * s_norm)
+        dlog_s = dist_sq / sigma ** 3 - 2 / sigma + (R2 / sigma ** 3) * np.exp(-c) / s_norm
+        return h_t * g_s, dlog_t, dlog_s
+
+    def _compensator(self, beta: float):
+        """Intégrale du noyau temporel sur le temps restant, et sa dérivée par rapport à β"""
+        u, L = self.remaining, self.max_lag_days
+        t_norm = -np.expm1(-beta * L)
+        num = -np.expm1(-beta * u)
+        F = num / t_norm
+        dF = (u * np.exp(-beta * u) * t_norm - num * L * np.exp(-beta * L)) / t_norm ** 2
+        return F, dF
+
+    def negative_log_likelihood(self, theta: np.ndarray):
+        """Opposé de la log-vraisemblance et son gradient analytique (paramètres en log)"""
+        k = self.n_types
+        mu, alpha, beta, sigma = self._unpack(theta)
+        n = len(self.t)
+
+        kernel, dlog_t, dlog_s = self._terms(beta, sigma)
+        alpha_pairs = alpha.ravel()[self.pair_types]
+        contrib = alpha_pairs * kernel
+        base = mu[self.marks] * self.background
+        lam = base + np.bincount(self.pairs.dst, weights=contrib, minlength=n)
+
+        F, dF = self._compensator(beta)
+        out_alpha = alpha.sum(axis=1)[self.marks]
+        log_lik = np.log(lam).sum() - mu.sum() * self.horizon - (out_alpha * F).sum()
+
+        # Gradient : termes des feux (1/λ) moins termes du compensateur
+        inv_lam = 1 / lam
+        w = contrib * inv_lam[self.pairs.dst]
+        grad_mu = np.bincount(self.marks, weights=self.background * inv_lam, minlength=k) - self.horizon
+        F_by_type = np.bincount(self.marks, weights=F, minlength=k)
+        grad_alpha = (np.bincount(self.pair_types, weights=kernel * inv_lam[self.pairs.dst],
+                                  minlength=k * k).reshape(k, k) - F_by_type[:, None])
+        grad_beta = (w * dlog_t).sum() - (out_alpha * dF).sum()
+        grad_sigma = (w * dlog_s).sum()
+
+        grad = np.concatenate([grad_mu * mu, (grad_alpha * alpha).ravel(), [grad_beta * beta, grad_sigma * sigma]])
+        return -log_lik, -grad
+
+    def fit(self, index: SpatioTemporalIndex, marks: np.ndarray, n_types: int,
+            max_iter: int = 500) -> Dict:
+        """Estimation par maximum de vraisemblance (L-BFGS-B sur les log-paramètres)"""
+        self._prepare(index, marks, n_types)
+        k = n_types
+        horizon = max(self.horizon, 1.0)
+        mu0 = np.maximum(self.type_counts, 1) / horizon * 0.5
+        theta0 = np.log(np.concatenate([mu0, np.full(k * k, 0.05), [1 / 7, self.cutoff_km / 4]]))
+        bounds = ([(None, None)] * (k + k * k)
+                  + [(np.log(1e-3), np.log(50.0)),
+                     (np.log(0.05), np.log(self.cutoff_km))])
+
+        start = time.perf_counter()
+        result = minimize(self.negative_log_likelihood, theta0, jac=True, method='L-BFGS-B',
+                          bounds=bounds, options={'maxiter': max_iter})
+        self.theta = result.x
+        self.mu, self.alpha, self.beta, self.sigma = self._unpack(result.x)
+        return {
+            'log_likelihood': -result.fun,
+            'converged': bool(result.success),
+            'iterations': int(result.nit),
+            'seconds': time.perf_counter() - start
+        }
+
+    def triggering_probabilities(self) -> np.ndarray:
+        """Probabilité que chaque feu vienne du fond (colonne 0) ou d'un feu de chaque type"""
+        n, k = len(self.t), self.n_types
+        kernel, _, _ = self._terms(self.beta, self.sigma)
+        contrib = self.alpha.ravel()[self.pair_types] * kernel
+        by_source = np.bincount(self.pairs.dst * k + self.marks[self.pairs.src], weights=contrib,
+                                minlength=n * k).reshape(n, k)
+        base = (self.mu[self.marks] * self.background)[:, None]
+        total = base + by_source.sum(axis=1, keepdims=True)
+        return np.hstack([base, by_source]) / total
+
+
+def fit_hawkes(df: pd.DataFrame, cutoff_km: float = 10.0, max_lag_days: float = 60.0,
+               background_bandwidth_km: float = 5.0, types: Optional[Sequence[str]] = None) -> Dict:
+    """
+    Ajuste le processus de Hawkes marqué sur les feux individuels
+    Retourne la matrice de branchement (source × cible), les paramètres des noyaux
+    et, pour chaque grand feu, la probabilité d'avoir été déclenché par chaque catégorie
+    """
+    types = list(types or HAWKES_TYPES)
+    df_valid = df[df['date_alerte'].notna() & df['categorie'].isin(types)]
+    index = SpatioTemporalIndex.from_frame(df_valid)
+    if len(index) < 10:
+        return {'n_events': len(index), 'types': types}
+
+    marks = pd.Categorical(df_valid['categorie'], categories=types).codes.astype(np.int64)[index.rows]
+    model = MarkedHawkes(cutoff_km, max_lag_days, background_bandwidth_km)
+    fit_info = model.fit(index, marks, len(types))
+
+    probabilities = model.triggering_probabilities()
+    columns = ['p_fond'] + [_SOURCE_COLUMNS.get(t, f'p_{t}') for t in types]
+    triggering = pd.DataFrame(probabilities, columns=columns)
+    rows = df_valid.iloc[index.rows]
+    triggering.insert(0, 'categorie', rows['categorie'].to_numpy())
+    triggering.insert(1, 'date_alerte', rows['date_alerte'].to_numpy())
+    triggering.insert(2, 'commune', rows['commune'].to_numpy())
+    triggering.insert(3, 'surface_ha', rows['surface_ha'].to_numpy())
+
+    big = triggering[triggering['categorie'] == 'Grand feu'].drop(columns='categorie')
+
+    return {
+        'n_events': len(index),
+        'n_pairs': len(model.pairs),
+        'types': types,
+        'mu': pd.Series(model.mu, index=types),
+        'alpha': pd.DataFrame(model.alpha, index=types, columns=types),
+        'beta': model.beta,
+        'half_life_days': np.log(2) / model.beta,
+        'sigma_km': model.sigma,
+        'branching_ratio': float(np.max(np.abs(np.linalg.eigvals(model.alpha)))),
+        'origin': triggering.groupby('categorie')[columns].mean().reindex(types),
+        'big_fires': big.reset_index(drop=True),
+        'share_big_from_small': float(big['p_petit'].mean()) if 'p_petit' in big and len(big) else np.nan,
+        'cutoff_km': cutoff_km,
+        'max_lag_days': max_lag_days,
+        **fit_info
+    }
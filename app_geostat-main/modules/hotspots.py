@@ -0,0 +1,194 @@
+"""
+Module d'analyse des points chauds émergents (Getis-Ord Gi* sur un cube espace-temps)
+"""
+
+from typing import TYPE_CHECKING, Dict, Tuple
+import numpy as np
+import pandas as pd
+
+# scipy (sparse, spatial, stats) n'est chargé qu'au premier calcul
+if TYPE_CHECKING:
+    from scipy import sparse
+
+# Classes de tendance (nomenclature des points chauds émergents)
+HOTSPOT_CLASSES = [
+    'Nouveau point chaud', 'Point chaud consécutif', 'Point chaud en intensification',
+    'Point chaud persistant', 'Point chaud en diminution', 'Point chaud sporadique',
+    'Point chaud oscillant', 'Point chaud historique',
+    'Nouveau point froid', 'Point froid consécutif', 'Point froid en intensification',
+    'Point froid persistant', 'Point froid en diminution', 'Point froid sporadique',
+    'Point froid oscillant', 'Point froid historique',
+    'Aucune tendance'
+]
+
+
+def build_space_time_cube(df: pd.DataFrame, cell_size_m: float = 2000,
+                          period: str = 'M') -> Tuple[np.ndarray, np.ndarray, pd.PeriodIndex]:
+    """
+    Cube des comptes (cellules × pas de temps) sur une grille Lambert 93
+    Seules les cellules ayant connu au moins un feu sont retenues
+    Retourne: (cube, centres des cellules, périodes)
+    """
+    df_valid = df[df['date_alerte'].notna()]
+    x = df_valid['x'].to_numpy(dtype=float)
+    y = df_valid['y'].to_numpy(dtype=float)
+
+    cells = np.column_stack([np.floor(x / cell_size_m), np.floor(y / cell_size_m)]).astype(np.int64)
+    unique_cells, loc = np.unique(cells, axis=0, return_inverse=True)
+    loc = loc.ravel()
+    centres = (unique_cells + 0.5) * cell_size_m
+
+    # Pas de temps continus du premier au dernier feu (les périodes sans feu comptent zéro)
+    fire_periods = df_valid['date_alerte'].dt.to_period(period)
+    periods = pd.period_range(fire_periods.min(), fire_periods.max(), freq=period)
+    tbin = fire_periods.array.asi8 - periods[0].ordinal
+
+    n_loc, n_bins = len(centres), len(periods)
+    cube = np.bincount(loc * n_bins + tbin, minlength=n_loc * n_bins).reshape(n_loc, n_bins)
+    return cube.astype(float), centres, periods
+
+
+def distance_band_weights(centres: np.ndarray, distance_m: float,
+                          include_self: bool = True) -> 'sparse.csr_matrix':
+    """Poids binaires de bande de distance (KD-tree), cellule elle-même incluse pour Gi*"""
+    from scipy import sparse
+    from scipy.spatial import cKDTree
+    tree = cKDTree(centres)
+    pairs = tree.query_pairs(distance_m, output_type='ndarray')
+    n = len(centres)
+    diagonal = np.arange(n) if include_self else np.array([], dtype=np.int64)
+    rows = np.concatenate([pairs[:, 0], pairs[:, 1], diagonal])
+    cols = np.concatenate([pairs[:, 1], pairs[:, 0], diagonal])
+    return sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, n))
+
+
+def getis_ord_gi_star(cube: np.ndarray, weights: 'sparse.csr_matrix') -> np.ndarray:
+    """
+    Scores z de Gi* pour toutes les tranches temporelles à la fois
+    Un seul produit creux × dense (W @ X) ; moyenne et écart-type sont calculés par tranche
+    """
+    n = cube.shape[0]
+    if n < 2:
+        return np.zeros_like(cube)
+
+    lag = weights @ cube
+    w_sum = np.asarray(weights.sum(axis=1)).ravel()
+    w_sq = np.asarray(weights.multiply(weights).sum(axis=1)).ravel()
+
+    mean = cube.mean(axis=0)
+    std = np.sqrt((cube ** 2).mean(axis=0) - mean ** 2)
+    denom = np.sqrt(np.clip((n * w_sq - w_sum ** 2) / (n - 1), 0, None))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = (lag - np.outer(w_sum, mean)) / np.outer(denom, std)
+    # Tranche sans aucun feu (ou voisinage couvrant tout) : pas de signal
+    return np.nan_to_num(z, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def mann_kendall(series: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Test de tendance de Mann-Kendall vectorisé sur les lignes (une série par cellule)
+    Boucle sur les décalages uniquement : O(T) opérations sur des tableaux cellules × T
+    Retourne: (score z, p-value bilatérale)
+    """
+    n_bins = series.shape[1]
+    s = np.zeros(series.shape[0])
+    for k in range(1, n_bins):
+        s += np.sign(series[:, k:] - series[:, :-k]).sum(axis=1)
+
+    from scipy.stats import norm
+    var = n_bins * (n_bins - 1) * (2 * n_bins + 5) / 18
+    if var <= 0:
+        return np.zeros_like(s), np.ones_like(s)
+    z = (s - np.sign(s)) / np.sqrt(var)
+    return z, 2 * norm.sf(np.abs(z))
+
+
+def _classify_side(sig: np.ndarray, opposite: np.ndarray, trend_z: np.ndarray, trend_p: np.ndarray,
+                   alpha: float, kind: str) -> np.ndarray:
+    """Classes de tendance d'un côté (chaud ou froid) à partir des tranches significatives"""
+    n_loc, n_bins = sig.shape
+    labels = np.full(n_loc, '', dtype=object)
+    share = sig.mean(axis=1)
+    last = sig[:, -1]
+    n_sig = sig.sum(axis=1)
+    ever_opposite = opposite.any(axis=1)
+
+    # Série significative finale ininterrompue, sans épisode antérieur
+    not_sig = ~sig[:, ::-1]
+    run = np.where(not_sig.any(axis=1), not_sig.argmax(axis=1), n_bins)
+    consecutive = (run > 1) & (n_sig == run)
+
+    # Tendance de l'intensité : croissante pour les points chauds, décroissante pour les froids
+    direction = trend_z if kind == 'chaud' else -trend_z
+    intensifying = (trend_p < alpha) & (direction > 0)
+    diminishing = (trend_p < alpha) & (direction < 0)
+    mostly = share >= 0.9
+
+    rules = [
+        (last & (n_sig == 1), f'Nouveau point {kind}'),
+        (last & consecutive & ~mostly, f'Point {kind} consécutif'),
+        (last & mostly & intensifying, f'Point {kind} en intensification'),
+        (last & mostly & diminishing, f'Point {kind} en diminution'),
+        (last & mostly, f'Point {kind} persistant'),
+        (last & ~mostly & ever_opposite, f'Point {kind} oscillant'),
+        (last & ~mostly, f'Point {kind} sporadique'),
+        (~last & mostly, f'Point {kind} historique'),
+    ]
+    # Première règle satisfaite prioritaire
+    for mask, label in rules[::-1]:
+        labels[mask] = label
+    return labels
+
+
+def emerging_hotspots(df: pd.DataFrame, cell_size_m: float = 2000, distance_m: float = 5000,
+                      period: str = 'M', alpha: float = 0.05) -> Dict:
+    """
+    Analyse des points chauds émergents
+    - Gi* par cellule et par pas de temps (poids creux appliqués à tout le cube)
+    - tendance de Mann-Kendall des scores z par cellule
+    - classe par cellule (nouveau, consécutif, en intensification, persistant, ...)
+    """
+    if df['date_alerte'].notna().sum() == 0:
+        return {
+            'cells': pd.DataFrame(columns=['x', 'y', 'nb_feux', 'z_dernier', 'tendance_z',
+                                           'tendance_p', 'part_chaud', 'part_froid', 'classe']),
+            'periods': pd.PeriodIndex([], freq=period),
+            'z': np.zeros((0, 0)),
+            'cell_size_m': cell_size_m,
+            'distance_m': distance_m
+        }
+
+    cube, centres, periods = build_space_time_cube(df, cell_size_m, period)
+    weights = distance_band_weights(centres, distance_m)
+    z = getis_ord_gi_star(cube, weights)
+
+    from scipy.stats import norm
+    critical = norm.isf(alpha / 2)
+    hot = z >= critical
+    cold = z <= -critical
+    trend_z, trend_p = mann_kendall(z)
+
+    labels = _classify_side(hot, cold, trend_z, trend_p, alpha, 'chaud')
+    cold_labels = _classify_side(cold, hot, trend_z, trend_p, alpha, 'froid')
+    labels = np.where(labels == '', cold_labels, labels)
+    labels = np.where(labels == '', 'Aucune tendance', labels)
+
+    cells = pd.DataFrame({
+        'x': centres[:, 0],
+        'y': centres[:, 1],
+        'nb_feux': cube.sum(axis=1).astype(int),
+        'z_dernier': z[:, -1],
+        'tendance_z': trend_z,
+        'tendance_p': trend_p,
+        'part_chaud': hot.mean(axis=1),
+        'part_froid': cold.mean(axis=1),
+        'classe': pd.Categorical(labels, categories=HOTSPOT_CLASSES)
+    })
+    return {
+        'cells': cells,
+        'periods': periods,
+        'z': z,
+        'cell_size_m': cell_size_m,
+        'distance_m': distance_m
+    }
@@ -0,0 +1,176 @@
+"""
+Module de modèle nul Monte Carlo pour les comptes de petits feux précurseurs
+Des pseudo grands feux (même saison, même densité locale de feux) servent de référence
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+import numpy as np
+import pandas as pd
+
+from .density import compute_density_raster, density_extent
+from .core.indexes import SpatioTemporalIndex, dates_to_days
+
+
+def density_strata(x: np.ndarray, y: np.ndarray, px: np.ndarray, py: np.ndarray,
+                   n_strata: int, bandwidth_m: float = 5000, cell_size_m: float = 1000):
+    """
+    Strate de densité locale (quantiles de la densité de noyau de tous les feux)
+    Retourne: (strate des feux, strate des points demandés)
+    """
+    extent = density_extent(np.concatenate([x, px]), np.concatenate([y, py]), cell_size_m,
+                            margin_m=3 * bandwidth_m)
+    raster = compute_density_raster(pd.DataFrame({'x': x, 'y': y}), cell_size_m=cell_size_m,
+                                    bandwidth_m=bandwidth_m, extent=extent)
+
+    def lookup(qx, qy):
+        ix = np.rint((qx - extent[0]) / cell_size_m).astype(np.int64)
+        iy = np.rint((qy - extent[1]) / cell_size_m).astype(np.int64)
+        return raster['density'][iy, ix]
+
+    density = lookup(x, y)
+    edges = np.quantile(density, np.linspace(0, 1, n_strata + 1)[1:-1])
+    return np.searchsorted(edges, density), np.searchsorted(edges, lookup(px, py))
+
+
+def sample_pseudo_events(rng: np.random.Generator, cand_x: np.ndarray, cand_y: np.ndarray,
+                         cand_by_stratum: list, target_strata: np.ndarray, target_doy: np.ndarray,
+                         years_start: np.ndarray, season_days: float):
+    """
+    Un pseudo événement par cible : emplacement d'un feu de la même strate de densité,
+    même jour de l'année (± season_days) dans une année tirée au hasard
+    Retourne: (x, y, t_jours)
+    """
+    n = len(target_doy)
+    pick = np.empty(n, dtype=np.int64)
+    for stratum, members in enumerate(cand_by_stratum):
+        rows = np.flatnonzero(target_strata == stratum)
+        if len(rows):
+            pick[rows] = members[rng.integers(0, len(members), len(rows))]
+    year_start = years_start[rng.integers(0, len(years_start), n)]
+    t = year_start + target_doy + rng.uniform(-season_days, season_days, n)
+    return cand_x[pick], cand_y[pick], t
+
+
+def _null_counts(args) -> np.ndarray:
+    """
+    Réplicats Monte Carlo (sous-processus) : tous les pseudo grands feux d'un lot de réplicats
+    sont comptés en une seule requête groupée sur l'index
+    """
+    (small_x, small_y, small_t, cand_x, cand_y, cand_by_stratum, big_strata, big_doy,
+     years_start, radius_m, window_days, season_days, seeds) = args
+    index = SpatioTemporalIndex(small_x, small_y, small_t)
+    n_big = len(big_doy)
+    out = np.empty((len(seeds), n_big), dtype=np.int64)
+
+    for k, seed in enumerate(seeds):
+        rng = np.random.default_rng(seed)
+        px, py, pt = sample_pseudo_events(rng, cand_x, cand_y, cand_by_stratum, big_strata, big_doy,
+                                          years_start, season_days)
+        out[k] = index.count_before(px, py, pt, radius_m, window_days)
+    return out
+
+
+def precursor_null_model(df: pd.DataFrame, big_fires: pd.DataFrame, buffer_radius_km: float,
+                         temporal_window_days: int, min_fires_before: int, n_replicates: int = 999,
+                         season_days: float = 15, n_strata: int = 10, seed: int = 0,
+                         n_jobs: Optional[int] = None) -> Dict:
+    """
+    Compare les petits feux précédant chaque grand feu à ceux précédant des pseudo grands feux
+    - mêmes règles de comptage que analyze_fires_before_big_fire (rayon inclus, fenêtre [t - w, t))
+    - pseudo feux appariés sur la saison et la strate de densité locale des feux
+    Retourne: tableau par grand feu (percentile, z, p-value) et ratio d'enrichissement agrégé
+    """
+    df_valid = df[df['date_alerte'].notna()]
+    small = df_valid[df_valid['categorie'] == 'Petit feu']
+    big = big_fires[big_fires['date_alerte'].notna()]
+    radius_m = buffer_radius_km * 1000
+
+    # Aucun grand feu daté : rien à comparer (pas de jour de l'année de référence pour les pseudo feux)
+    if len(big) == 0:
+        return {
+            'per_fire': pd.DataFrame(columns=['date_alerte', 'commune', 'surface_ha', 'petits_feux', 'attendu',
+                                              'p5', 'p95', 'percentile', 'z_score', 'p_value']),
+            'n_big_fires': 0, 'n_replicates': n_replicates, 'observed_total': 0, 'expected_total': 0.0,
+            'enrichment_ratio': np.nan, 'p_value': np.nan, 'condition_rate': np.nan,
+            'null_condition_rate': np.nan, 'seconds': 0.0, 'ms_per_replicate': 0.0
+        }
+
+    small_x = small['x'].to_numpy(dtype=float)
+    small_y = small['y'].to_numpy(dtype=float)
+    small_t = dates_to_days(small['date_alerte'])
+    index = SpatioTemporalIndex(small_x, small_y, small_t)
+
+    big_x = big['x'].to_numpy(dtype=float)
+    big_y = big['y'].to_numpy(dtype=float)
+    big_t = dates_to_days(big['date_alerte'])
+    observed = index.count_before(big_x, big_y, big_t, radius_m, temporal_window_days)
+
+    # Candidats : emplacements de tous les feux, répartis en strates de densité
+    cand_x = df_valid['x'].to_numpy(dtype=float)
+    cand_y = df_valid['y'].to_numpy(dtype=float)
+    cand_strata, big_strata = density_strata(cand_x, cand_y, big_x, big_y, n_strata)
+    cand_by_stratum = [np.flatnonzero(cand_strata == s) for s in range(n_strata)]
+    # Strate vide (peu probable) : repli sur tous les candidats
+    cand_by_stratum = [m if len(m) else np.arange(len(cand_x)) for m in cand_by_stratum]
+
+    # Années dont la fenêtre précédente est entièrement observée
+    years = np.unique(df_valid['date_alerte'].dt.year)
+    years_start = dates_to_days(pd.Series(pd.to_datetime([f'{y}-01-01' for y in years])))
+    big_doy = big_t - dates_to_days(big['date_alerte'].dt.to_period('Y').dt.start_time)
+    t_min = small_t.min() if len(small_t) else 0.0
+    valid_years = years_start + big_doy.min() - season_days - temporal_window_days >= t_min
+    years_start = years_start[valid_years] if valid_years.any() else years_start
+
+    start = time.perf_counter()
+    seeds = np.random.SeedSequence(seed).generate_state(n_replicates)
+    n_jobs = max(1, min(n_jobs or os.cpu_count() or 1, n_replicates))
+    tasks = [(small_x, small_y, small_t, cand_x, cand_y, cand_by_stratum, big_strata, big_doy,
+              years_start, radius_m, temporal_window_days, season_days, chunk)
+             for chunk in np.array_split(seeds, n_jobs)]
+    if n_jobs == 1:
+        null = _null_counts(tasks[0])
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            null = np.concatenate(list(executor.map(_null_counts, tasks)))
+    elapsed = time.perf_counter() - start
+
+    # Statistiques par grand feu (percentile en rang moyen, z-score, p-value unilatérale)
+    null_mean = null.mean(axis=0)
+    null_std = null.std(axis=0)
+    below = (null < observed[None, :]).mean(axis=0)
+    ties = (null == observed[None, :]).mean(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z_scores = np.where(null_std > 0, (observed - null_mean) / null_std, 0.0)
+
+    per_fire = pd.DataFrame({
+        'date_alerte': big['date_alerte'].to_numpy(),
+        'commune': big['commune'].to_numpy(),
+        'surface_ha': big['surface_ha'].to_numpy(),
+        'petits_feux': observed,
+        'attendu': null_mean,
+        'p5': np.percentile(null, 5, axis=0),
+        'p95': np.percentile(null, 95, axis=0),
+        'percentile': 100 * (below + 0.5 * ties),
+        'z_score': z_scores,
+        'p_value': (1 + (null >= observed[None, :]).sum(axis=0)) / (n_replicates + 1)
+    })
+
+    # Agrégat : total observé contre la distribution des totaux simulés
+    null_totals = null.sum(axis=1)
+    null_condition = (null >= min_fires_before).mean(axis=1)
+    return {
+        'per_fire': per_fire,
+        'n_big_fires': len(big),
+        'n_replicates': n_replicates,
+        'observed_total': int(observed.sum()),
+        'expected_total': float(null_totals.mean()),
+        'enrichment_ratio': float(observed.sum() / null_totals.mean()) if null_totals.mean() > 0 else np.nan,
+        'p_value': float((1 + (null_totals >= observed.sum()).sum()) / (n_replicates + 1)),
+        'condition_rate': float((observed >= min_fires_before).mean()) if len(big) else np.nan,
+        'null_condition_rate': float(null_condition.mean()),
+        'seconds': elapsed,
+        'ms_per_replicate': 1000 * elapsed / max(n_replicates, 1)
+    }
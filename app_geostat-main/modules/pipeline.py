@@ -0,0 +1,96 @@
+"""
+Module adaptateur Streamlit : étapes en cache de la page d'analyse
+Graphe : période → classification → grands feux → résultats précurseurs → tableau des résultats
+Chaque étape n'est recalculée que si ses propres paramètres changent (clé : poignée + paramètres) ;
+les calculs eux-mêmes sont dans modules.core et les modules d'analyse, sans dépendance à Streamlit
+"""
+
+from concurrent.futures import Future
+from typing import Dict, List
+import pandas as pd
+import streamlit as st
+
+from .core.precursors import deduplicate_big_fires, analyze_big_fires, summarize_results
+from .dataset import DatasetHandle, classified_fires
+from .density import compute_density_raster
+from .hotspots import emerging_hotspots
+from .autocorrelation import moran_by_year
+from .animation import precompute_animation_frames
+from .background import submit_section
+
+
+def _category_frame(df: pd.DataFrame, categorie: str) -> pd.DataFrame:
+    return df if categorie == 'Tous' else df[df['categorie'] == categorie]
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def big_fire_events(dataset: DatasetHandle, seuil_petit: float, seuil_grand: float) -> pd.DataFrame:
+    """Grands feux datés de la période, dédupliqués"""
+    return deduplicate_big_fires(classified_fires(dataset, seuil_petit, seuil_grand))
+
+
+@st.cache_resource(show_spinner='Analyse en cours...', max_entries=16)
+def precursor_results(dataset: DatasetHandle, seuil_petit: float, seuil_grand: float,
+                      temporal_window: int, buffer_radius: float, min_fires_before: int) -> List[Dict]:
+    """
+    Analyse de chaque grand feu (même ordre que big_fire_events)
+    Partagé entre les sessions sans copie : ne jamais modifier les résultats
+    """
+    return analyze_big_fires(classified_fires(dataset, seuil_petit, seuil_grand),
+                             big_fire_events(dataset, seuil_petit, seuil_grand),
+                             temporal_window, buffer_radius, min_fires_before)
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def results_table(dataset: DatasetHandle, seuil_petit: float, seuil_grand: float,
+                  temporal_window: int, buffer_radius: float, min_fires_before: int) -> Dict:
+    """Tableau des grands feux qui vérifient la condition, positions et totaux"""
+    return summarize_results(big_fire_events(dataset, seuil_petit, seuil_grand),
+                             precursor_results(dataset, seuil_petit, seuil_grand,
+                                               temporal_window, buffer_radius, min_fires_before))
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def density_raster(dataset: DatasetHandle, seuil_petit: float, seuil_grand: float, categorie: str,
+                   cell_size_m: float, bandwidth_m: float) -> Dict:
+    """Raster de densité mis en cache par (poignée du jeu, seuils, catégorie, largeur de bande)"""
+    df = _category_frame(classified_fires(dataset, seuil_petit, seuil_grand), categorie)
+    return compute_density_raster(df, cell_size_m=cell_size_m, bandwidth_m=bandwidth_m)
+
+
+def hotspot_job(dataset: DatasetHandle, df: pd.DataFrame, class_params: tuple, categorie: str,
+                cell_size_m: float, distance_m: float, period: str) -> Future:
+    """
+    Points chauds émergents calculés en arrière-plan, en cache par (poignée du jeu, seuils, catégorie,
+    grille, pas de temps) ; df : feux classifiés de la poignée
+    """
+    return submit_section(
+        'hotspots', dataset.fingerprint, class_params + (categorie, cell_size_m, distance_m, period),
+        lambda: emerging_hotspots(_category_frame(df, categorie), cell_size_m=cell_size_m,
+                                  distance_m=distance_m, period=period)
+    )
+
+
+def moran_job(dataset: DatasetHandle, df: pd.DataFrame, class_params: tuple, categorie: str,
+              cell_size_m: float, distance_m: float, n_permutations: int) -> Future:
+    """
+    Autocorrélation spatiale calculée en arrière-plan, en cache par (poignée du jeu, seuils, catégorie,
+    grille, permutations) ; df : feux classifiés de la poignée
+    """
+    return submit_section(
+        'moran', dataset.fingerprint, class_params + (categorie, cell_size_m, distance_m, n_permutations),
+        lambda: moran_by_year(_category_frame(df, categorie), cell_size_m=cell_size_m,
+                              distance_m=distance_m, n_permutations=n_permutations)
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def animation_frames(_big_fires: pd.DataFrame, _analysis_results: List[Dict], dataset: DatasetHandle,
+                     seuil_petit: float, seuil_grand: float, buffer_radius_km: float,
+                     temporal_window: int, min_fires_before: int, period: str) -> Dict:
+    """
+    Images de l'animation mises en cache par (poignée du jeu, paramètres)
+    Les résultats (préfixés par _) ne sont pas hachés : ils découlent de la poignée et des paramètres
+    """
+    df = classified_fires(dataset, seuil_petit, seuil_grand)
+    return precompute_animation_frames(df, _big_fires, _analysis_results, buffer_radius_km, period)
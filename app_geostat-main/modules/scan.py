@@ -0,0 +1,192 @@
+"""
+Module de statistique de balayage spatio-temporelle par permutation (type SaTScan)
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+from scipy.special import xlogy
+
+from .core.indexes import dates_to_days
+
+# Nombre d'éléments (centres × rayons × pas de temps) traités par bloc
+_CHUNK_ELEMENTS = 2_000_000
+
+
+def _count_cube(loc: np.ndarray, tbin: np.ndarray, n_loc: int, n_bins: int) -> np.ndarray:
+    """Cube des comptes (cellules × pas de temps) ; une ligne nulle sentinelle est ajoutée"""
+    cube = np.bincount(loc * n_bins + tbin, minlength=n_loc * n_bins).reshape(n_loc, n_bins)
+    return np.vstack([cube, np.zeros((1, n_bins), dtype=cube.dtype)])
+
+
+def _poisson_llr(c: np.ndarray, mu: np.ndarray, total: float) -> np.ndarray:
+    """Log-vraisemblance de Kulldorff (excès uniquement : nulle si c ≤ μ)"""
+    llr = np.zeros(c.shape)
+    excess = c > mu
+    ce, me = c[excess], mu[excess]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        llr[excess] = xlogy(ce, ce / me) + xlogy(total - ce, (total - ce) / (total - me))
+    return llr
+
+
+def _scan(cube: np.ndarray, neighbours: np.ndarray, max_duration: int,
+          return_best: bool = False):
+    """
+    Balaye tous les cylindres : pour chaque centre, les rayons croissants (k plus proches cellules)
+    et toutes les fenêtres de 1 à max_duration pas. Les comptes sont obtenus par sommes cumulées
+    sur les voisins puis sur le temps ; l'attendu se factorise (marge spatiale × marge temporelle / C)
+    Retourne le maximum de LLR, ou le meilleur cylindre de chaque centre si return_best
+    """
+    n_centres = neighbours.shape[0]
+    n_loc, n_bins = cube.shape[0] - 1, cube.shape[1]
+    total = float(cube.sum())
+    loc_tot = cube.sum(axis=1).astype(float)
+    time_cum = np.concatenate([[0.0], np.cumsum(cube.sum(axis=0))])
+
+    best = np.zeros(n_centres)
+    best_k = np.zeros(n_centres, dtype=np.int64)
+    best_start = np.zeros(n_centres, dtype=np.int64)
+    best_len = np.ones(n_centres, dtype=np.int64)
+
+    # Centres regroupés par nombre de voisins réels pour limiter le remplissage par la sentinelle
+    n_real = (neighbours < n_loc).sum(axis=1)
+    order = np.argsort(n_real, kind='stable')
+    chunk = max(1, _CHUNK_ELEMENTS // (neighbours.shape[1] * (n_bins + 1)))
+    for a in range(0, n_centres, chunk):
+        ids = order[a:a + chunk]
+        k_chunk = max(1, int(n_real[ids].max()))
+        nb = neighbours[ids, :k_chunk]
+        m = len(ids)
+
+        space = np.cumsum(loc_tot[nb], axis=1)
+        series = np.cumsum(cube[nb], axis=1)
+        prefix = np.concatenate([np.zeros((m, k_chunk, 1)), np.cumsum(series, axis=2)], axis=2)
+
+        for length in range(1, min(max_duration, n_bins) + 1):
+            c = prefix[:, :, length:] - prefix[:, :, :-length]
+            t_sum = time_cum[length:] - time_cum[:-length]
+            mu = space[:, :, None] * t_sum[None, None, :] / total
+            llr = _poisson_llr(c, mu, total).reshape(m, -1)
+
+            arg = llr.argmax(axis=1)
+            value = llr[np.arange(m), arg]
+            better = value > best[ids]
+            if better.any():
+                rows = np.flatnonzero(better)
+                best[ids[rows]] = value[rows]
+                best_k[ids[rows]] = arg[rows] // c.shape[2]
+                best_start[ids[rows]] = arg[rows] % c.shape[2]
+                best_len[ids[rows]] = length
+
+    if return_best:
+        return best, best_k, best_start, best_len
+    return best.max() if n_centres else 0.0
+
+
+def _replicate_max(args) -> np.ndarray:
+    """Réplicats Monte Carlo : permutation des pas de temps entre les feux (sous-processus)"""
+    loc, tbin, n_loc, n_bins, neighbours, max_duration, seeds = args
+    out = np.empty(len(seeds))
+    for k, seed in enumerate(seeds):
+        rng = np.random.default_rng(seed)
+        cube = _count_cube(loc, rng.permutation(tbin), n_loc, n_bins)
+        out[k] = _scan(cube, neighbours, max_duration)
+    return out
+
+
+def _grid_locations(x: np.ndarray, y: np.ndarray, cell_size_m: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Cellule de chaque feu et centres des cellules non vides"""
+    cells = np.column_stack([np.floor(x / cell_size_m), np.floor(y / cell_size_m)]).astype(np.int64)
+    unique_cells, loc = np.unique(cells, axis=0, return_inverse=True)
+    centres = (unique_cells + 0.5) * cell_size_m
+    return loc.ravel(), centres
+
+
+def spacetime_permutation_scan(df: pd.DataFrame, cell_size_km: float = 5.0, time_bin_days: int = 7,
+                               max_radius_km: float = 15.0, max_duration_bins: int = 4,
+                               max_cells: int = 50, n_replicates: int = 99, max_clusters: int = 10,
+                               seed: int = 0, n_jobs: Optional[int] = None) -> pd.DataFrame:
+    """
+    Statistique de balayage espace-temps par permutation (Kulldorff, 2005)
+    Cylindres centrés sur les cellules de la grille, rayons ≤ max_radius_km (au plus max_cells cellules),
+    durées de 1 à max_duration_bins pas de time_bin_days jours
+    Retourne les clusters classés (sans recouvrement géographique) avec leur p-value Monte Carlo
+    """
+    df_valid = df[df['date_alerte'].notna()]
+    columns = ['rang', 'x', 'y', 'rayon_km', 'nb_cellules', 'date_debut', 'date_fin', 'observe',
+               'attendu', 'ratio', 'llr', 'p_value', 'commune']
+    if len(df_valid) < 2:
+        return pd.DataFrame(columns=columns)
+
+    x = df_valid['x'].to_numpy(dtype=float)
+    y = df_valid['y'].to_numpy(dtype=float)
+    t = dates_to_days(df_valid['date_alerte'])
+    t0 = np.floor(t.min())
+    tbin = ((t - t0) // time_bin_days).astype(np.int64)
+    n_bins = int(tbin.max()) + 1
+
+    loc, centres = _grid_locations(x, y, cell_size_km * 1000)
+    n_loc = len(centres)
+    k_max = min(max_cells, n_loc)
+    dist, neighbours = cKDTree(centres).query(centres, k=k_max, distance_upper_bound=max_radius_km * 1000)
+    neighbours = neighbours.reshape(n_loc, k_max)
+    dist = dist.reshape(n_loc, k_max)
+
+    cube = _count_cube(loc, tbin, n_loc, n_bins)
+    best, best_k, best_start, best_len = _scan(cube, neighbours, max_duration_bins, return_best=True)
+
+    # Distribution nulle du maximum, réplicats répartis sur les cœurs
+    if n_replicates > 0:
+        seeds = np.random.SeedSequence(seed).generate_state(n_replicates)
+        n_jobs = max(1, min(n_jobs or os.cpu_count() or 1, n_replicates))
+        tasks = [(loc, tbin, n_loc, n_bins, neighbours, max_duration_bins, chunk)
+                 for chunk in np.array_split(seeds, n_jobs)]
+        if n_jobs == 1:
+            null_max = _replicate_max(tasks[0])
+        else:
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                null_max = np.concatenate(list(executor.map(_replicate_max, tasks)))
+    else:
+        null_max = np.array([])
+
+    # Clusters secondaires : meilleurs cylindres sans cellule commune avec les précédents
+    total = float(cube.sum())
+    loc_tot = cube.sum(axis=1)
+    time_tot = cube.sum(axis=0)
+    used = np.zeros(n_loc + 1, dtype=bool)
+    clusters = []
+    for centre in np.argsort(-best):
+        if best[centre] <= 0 or len(clusters) >= max_clusters:
+            break
+        members = neighbours[centre, :best_k[centre] + 1]
+        members = np.unique(members[members < n_loc])
+        if used[members].any():
+            continue
+        used[members] = True
+
+        start, length = best_start[centre], best_len[centre]
+        observed = cube[members, start:start + length].sum()
+        expected = loc_tot[members].sum() * time_tot[start:start + length].sum() / total
+        in_cluster = np.isin(loc, members) & (tbin >= start) & (tbin < start + length)
+        communes = df_valid['commune'].to_numpy()[in_cluster]
+        clusters.append({
+            'x': centres[centre, 0],
+            'y': centres[centre, 1],
+            'rayon_km': float(dist[centre, best_k[centre]]) / 1000 + cell_size_km / 2,
+            'nb_cellules': len(members),
+            'date_debut': pd.Timestamp(0) + pd.to_timedelta(t0 + start * time_bin_days, unit='D'),
+            'date_fin': pd.Timestamp(0) + pd.to_timedelta(t0 + (start + length) * time_bin_days, unit='D'),
+            'observe': int(observed),
+            'attendu': expected,
+            'ratio': observed / expected if expected > 0 else np.nan,
+            'llr': best[centre],
+            'p_value': (1 + (null_max >= best[centre]).sum()) / (len(null_max) + 1) if len(null_max) else np.nan,
+            'commune': pd.Series(communes).mode().iat[0] if len(communes) else ''
+        })
+
+    result = pd.DataFrame(clusters, columns=columns[1:])
+    result.insert(0, 'rang', np.arange(1, len(result) + 1))
+    return result
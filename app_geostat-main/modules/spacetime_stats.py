@@ -0,0 +1,121 @@
+"""
+Module de statistiques d'interaction espace-temps : test de Knox et fonction K spatio-temporelle
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Sequence
+import numpy as np
+import pandas as pd
+from scipy.spatial import ConvexHull, QhullError
+
+from .core.indexes import SpatioTemporalIndex
+
+
+def spacetime_pair_counts(x: np.ndarray, y: np.ndarray, t: np.ndarray,
+                          distances_m: np.ndarray, lags_days: np.ndarray) -> np.ndarray:
+    """
+    Nombre de paires (non ordonnées) proches en espace ET en temps pour tous les seuils
+    Chaque paire est comptée une fois, puis histogrammée dans la grille (distance, décalage) ;
+    les cumuls donnent les comptes « ≤ d et ≤ τ » pour toutes les combinaisons en une passe
+    """
+    index = SpatioTemporalIndex(x, y, t)
+    nd, nt = len(distances_m), len(lags_days)
+    hist = np.zeros(nd * nt, dtype=np.int64)
+    for _, _, dist, lag in index.iter_pairs(distances_m[-1], lags_days[-1]):
+        # Classes fermées à droite : une paire à exactement d (grille DFCI) compte pour « ≤ d »
+        di = np.searchsorted(distances_m, dist, side='left')
+        ti = np.searchsorted(lags_days, lag, side='left')
+        hist += np.bincount(di * nt + ti, minlength=nd * nt)
+    return hist.reshape(nd, nt).cumsum(axis=0).cumsum(axis=1)
+
+
+def _permuted_counts(args) -> np.ndarray:
+    """Réplicats Monte Carlo : permutation des dates entre les emplacements (exécuté en sous-processus)"""
+    x, y, t, distances_m, lags_days, seeds = args
+    out = np.empty((len(seeds), len(distances_m), len(lags_days)), dtype=np.int64)
+    for k, seed in enumerate(seeds):
+        rng = np.random.default_rng(seed)
+        out[k] = spacetime_pair_counts(x, y, rng.permutation(t), distances_m, lags_days)
+    return out
+
+
+def permutation_null(x: np.ndarray, y: np.ndarray, t: np.ndarray, distances_m: np.ndarray,
+                     lags_days: np.ndarray, n_permutations: int, seed: int = 0,
+                     n_jobs: Optional[int] = None) -> np.ndarray:
+    """Distribution nulle des comptes, réplicats répartis sur les cœurs disponibles"""
+    seeds = np.random.SeedSequence(seed).generate_state(n_permutations)
+    n_jobs = n_jobs or os.cpu_count() or 1
+    n_jobs = max(1, min(n_jobs, n_permutations))
+    if n_jobs == 1:
+        return _permuted_counts((x, y, t, distances_m, lags_days, seeds))
+
+    tasks = [(x, y, t, distances_m, lags_days, chunk) for chunk in np.array_split(seeds, n_jobs)]
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        return np.concatenate(list(executor.map(_permuted_counts, tasks)))
+
+
+def knox_test(df: pd.DataFrame, distances_km: Sequence[float], lags_days: Sequence[float],
+              n_permutations: int = 99, seed: int = 0, n_jobs: Optional[int] = None) -> Dict:
+    """
+    Test de Knox et fonction K spatio-temporelle sur une grille (distance, décalage)
+    - observed : paires proches en espace et en temps
+    - expected : attendu sous indépendance (N_espace × N_temps / N_paires)
+    - p_values : Monte Carlo par permutation des dates
+    - D : K_st(d, τ) - K_s(d) K_t(τ), interaction espace-temps de Diggle
+    """
+    index = SpatioTemporalIndex.from_frame(df)
+    n = len(index)
+    distances_m = np.sort(np.asarray(distances_km, dtype=float)) * 1000
+    lags = np.sort(np.asarray(lags_days, dtype=float))
+
+    observed = spacetime_pair_counts(index.x, index.y, index.t, distances_m, lags)
+
+    # Marges : paires proches en espace (KD-tree, tous les rayons à la fois) et en temps (dates triées)
+    n_pairs = n * (n - 1) / 2
+    n_space = (index.tree.count_neighbors(index.tree, distances_m) - n) / 2
+    n_time = np.array([
+        (np.searchsorted(index.t, index.t + lag, side='right') - np.arange(n) - 1).sum()
+        for lag in lags
+    ], dtype=float)
+    expected = np.outer(n_space, n_time) / n_pairs if n_pairs > 0 else np.zeros_like(observed, dtype=float)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        knox_ratio = np.where(expected > 0, observed / expected, np.nan)
+
+    if n_permutations > 0 and n > 1:
+        null = permutation_null(index.x, index.y, index.t, distances_m, lags,
+                                n_permutations, seed, n_jobs)
+        p_values = (1 + (null >= observed[None, :, :]).sum(axis=0)) / (n_permutations + 1)
+        null_mean = null.mean(axis=0)
+    else:
+        p_values = np.full(observed.shape, np.nan)
+        null_mean = expected
+
+    # Fonctions K (sans correction de bord), aire = enveloppe convexe, durée = étendue des dates
+    try:
+        area = ConvexHull(index.xy).volume if n >= 3 else 0.0
+    except QhullError:
+        area = float(np.ptp(index.x) * np.ptp(index.y))
+    duration = index.t[-1] - index.t[0] if n > 1 else 0.0
+    scale = 2.0 / (n ** 2) if n > 0 else 0.0
+    k_s = area * scale * n_space
+    k_t = duration * scale * n_time
+    k_st = area * duration * scale * observed
+    d_st = k_st - np.outer(k_s, k_t)
+
+    return {
+        'n_fires': n,
+        'distances_km': distances_m / 1000,
+        'lags_days': lags,
+        'observed': observed,
+        'expected': expected,
+        'null_mean': null_mean,
+        'knox_ratio': knox_ratio,
+        'p_values': p_values,
+        'K_s': k_s,
+        'K_t': k_t,
+        'K_st': k_st,
+        'D': d_st,
+        'n_permutations': n_permutations
+    }
@@ -0,0 +1,331 @@
+"""
+Module de détection en ligne des feux précurseurs sur un flux d'événements rejouable
+"""
+
+import math
+import queue
+import time
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+NS_PER_DAY = 86400 * 10**9
+
+
+class FireEvent(NamedTuple):
+    """Événement incendie tel que reçu par le détecteur (ordre des dates d'alerte)"""
+    t_days: float
+    date_alerte: pd.Timestamp
+    x: float
+    y: float
+    categorie: str
+    surface_ha: float
+    commune: str
+
+
+def replay_events(df: pd.DataFrame) -> Iterator[FireEvent]:
+    """Rejoue un tableau d'incendies classifiés comme un flux trié par date d'alerte"""
+    df_valid = df[df['date_alerte'].notna()].sort_values('date_alerte', kind='stable')
+    t_days = df_valid['date_alerte'].to_numpy(dtype='datetime64[ns]').astype(np.int64) / NS_PER_DAY
+    columns = zip(
+        t_days,
+        df_valid['date_alerte'],
+        df_valid['x'].to_numpy(dtype=float),
+        df_valid['y'].to_numpy(dtype=float),
+        df_valid['categorie'],
+        df_valid['surface_ha'].to_numpy(dtype=float),
+        df_valid['commune']
+    )
+    for values in columns:
+        yield FireEvent(*values)
+
+
+def queue_events(q: "queue.Queue", sentinel=None, timeout: Optional[float] = None) -> Iterator[FireEvent]:
+    """Consomme une file locale (substitut d'un bus de messages) jusqu'à la sentinelle"""
+    while True:
+        try:
+            event = q.get(timeout=timeout)
+        except queue.Empty:
+            return
+        if event is sentinel:
+            return
+        yield event
+
+
+class _CellWindow:
+    """
+    Fenêtre glissante d'une sous-cellule de grille, scindée en deux moitiés (récente / ancienne)
+    pour mesurer la tendance. Chaque événement garde (t, x, y, petit feu) pour les comptes exacts
+    des sous-cellules coupées par le cercle ; les compteurs servent celles entièrement dans le cercle
+    """
+    __slots__ = ('owner', 'key', 'x0', 'y0', 'recent', 'older', 'small_recent', 'small_older', 'medium')
+
+    def __init__(self, owner: Dict, key: Tuple[int, int], size: float):
+        # Sous-cellules de la cellule parente : la fenêtre s'en retire quand elle se vide
+        self.owner = owner
+        self.key = key
+        self.x0 = key[0] * size
+        self.y0 = key[1] * size
+        self.recent = deque()
+        self.older = deque()
+        self.small_recent = 0
+        self.small_older = 0
+        self.medium = 0
+
+
+class _Cell:
+    """Cellule de la taille du rayon : sous-cellules non vides, délai entre alertes et alertes à valider"""
+    __slots__ = ('subcells', 'last_alert', 'alerts')
+
+    def __init__(self):
+        self.subcells: Dict[Tuple[int, int], _CellWindow] = {}
+        self.last_alert = -np.inf
+        self.alerts = deque()
+
+
+class PrecursorDetector:
+    """
+    Détecteur en ligne de conditions précurseurs d'un grand feu
+    L'espace est découpé en cellules de la taille du rayon du buffer (le voisinage 3×3 contient
+    tout cercle de ce rayon centré dans la cellule), elles-mêmes découpées en sous-cellules
+    d'un quart du rayon. Les compteurs des sous-cellules sont tenus à jour à l'ajout et au
+    vieillissement : une file globale dans l'ordre du flux fait changer chaque événement de moitié
+    puis sortir de la fenêtre une seule fois (O(1) amorti par événement)
+    Autour d'un événement, les sous-cellules entièrement dans le cercle sont comptées par leurs
+    compteurs ; seules celles coupées par le cercle sont filtrées feu par feu sur la distance réelle
+    (mêmes règles que analyze_fires_before_big_fire, rayon inclus)
+    """
+
+    # Sous-cellules par côté de cellule
+    SUBDIVISIONS = 4
+
+    def __init__(self, buffer_radius_km: float, temporal_window_days: int,
+                 min_fires_before: int, cooldown_days: Optional[float] = None):
+        self.buffer_radius_km = buffer_radius_km
+        self.cell_size_m = buffer_radius_km * 1000
+        self.subcell_size_m = self.cell_size_m / self.SUBDIVISIONS
+        self.window = float(temporal_window_days)
+        self.half_window = self.window / 2
+        self.min_fires_before = min_fires_before
+        self.cooldown = self.half_window if cooldown_days is None else float(cooldown_days)
+        self.cells: Dict[Tuple[int, int], _Cell] = {}
+        self._recent = deque()
+        self._older = deque()
+        self.alerts: List[Dict] = []
+        self.big_fires: List[Dict] = []
+        self.n_events = 0
+        self.n_big_fires = 0
+        self.n_big_fires_anticipated = 0
+
+    def _cell_of(self, x: float, y: float) -> Tuple[int, int]:
+        return int(x // self.cell_size_m), int(y // self.cell_size_m)
+
+    def _within(self, x0: float, y0: float, x: float, y: float) -> bool:
+        """Distance euclidienne (Lambert 93) inférieure ou égale au rayon, rayon inclus"""
+        return math.sqrt((x - x0) ** 2 + (y - y0) ** 2) / 1000 <= self.buffer_radius_km
+
+    def _add(self, state: _Cell, t: float, x: float, y: float, is_small: bool) -> None:
+        size = self.subcell_size_m
+        key = (int(x // size), int(y // size))
+        window = state.subcells.get(key)
+        if window is None:
+            window = state.subcells[key] = _CellWindow(state.subcells, key, size)
+        window.recent.append((t, x, y, is_small))
+        if is_small:
+            window.small_recent += 1
+        else:
+            window.medium += 1
+        self._recent.append((t, window))
+
+    def _advance(self, now: float) -> None:
+        """
+        Fait vieillir toutes les fenêtres : la file globale suit l'ordre du flux, donc l'événement
+        en tête d'une file globale est aussi en tête de la file de sa sous-cellule
+        """
+        while self._recent and self._recent[0][0] < now - self.half_window:
+            t, window = self._recent.popleft()
+            event = window.recent.popleft()
+            window.older.append(event)
+            if event[3]:
+                window.small_recent -= 1
+                window.small_older += 1
+            self._older.append((t, window))
+        while self._older and self._older[0][0] < now - self.window:
+            _, window = self._older.popleft()
+            if window.older.popleft()[3]:
+                window.small_older -= 1
+            else:
+                window.medium -= 1
+            if not window.recent and not window.older:
+                del window.owner[window.key]
+
+    def _neighbourhood(self, cell: Tuple[int, int], now: float) -> List[_Cell]:
+        """Cellules 3×3 autour de cell, alertes expirées retirées"""
+        cx, cy = cell
+        states = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                state = self.cells.get((cx + dx, cy + dy))
+                if state is not None:
+                    while state.alerts and state.alerts[0][0] < now - self.window:
+                        state.alerts.popleft()
+                    states.append(state)
+        return states
+
+    def _counts(self, neighbourhood: List[_Cell], x: float, y: float, now: float,
+                include_now: bool) -> Dict[str, int]:
+        """
+        Petits feux (moitiés récente / ancienne) et feux moyens à moins du rayon de (x, y)
+        include_now : compte aussi les feux datés de l'instant courant (sinon fenêtre [t - w, t))
+        """
+        size = self.subcell_size_m
+        radius_m = self.cell_size_m
+        radius_km = self.buffer_radius_km
+        # Marge relative pour les arrondis : une sous-cellule limite est filtrée feu par feu
+        inside_sq = (radius_m * (1 - 1e-9)) ** 2
+        radius_sq = radius_m * radius_m
+        small_recent = small_older = medium = 0
+        for state in neighbourhood:
+            for window in state.subcells.values():
+                # Écarts signés du point aux bords de la sous-cellule : distances minimale et maximale
+                left, right = window.x0 - x, x - window.x0 - size
+                bottom, top = window.y0 - y, y - window.y0 - size
+                near_x = left if left > 0 else (right if right > 0 else 0.0)
+                near_y = bottom if bottom > 0 else (top if top > 0 else 0.0)
+                if near_x * near_x + near_y * near_y > radius_sq:
+                    continue
+                far_x = -(left if left < right else right)
+                far_y = -(bottom if bottom < top else top)
+                if far_x * far_x + far_y * far_y <= inside_sq:
+                    small_recent += window.small_recent
+                    small_older += window.small_older
+                    medium += window.medium
+                    if not include_now:
+                        # Feux de l'instant courant : en fin de moitié récente (flux ordonné)
+                        for t, _, _, is_small in reversed(window.recent):
+                            if t < now:
+                                break
+                            if is_small:
+                                small_recent -= 1
+                            else:
+                                medium -= 1
+                    continue
+                for t, ex, ey, is_small in window.recent:
+                    if (t < now or include_now) and math.sqrt((ex - x) ** 2 + (ey - y) ** 2) / 1000 <= radius_km:
+                        if is_small:
+                            small_recent += 1
+                        else:
+                            medium += 1
+                for _, ex, ey, is_small in window.older:
+                    if math.sqrt((ex - x) ** 2 + (ey - y) ** 2) / 1000 <= radius_km:
+                        if is_small:
+                            small_older += 1
+                        else:
+                            medium += 1
+        return {'small_recent': small_recent, 'small_older': small_older, 'medium': medium}
+
+    def process(self, event: FireEvent) -> Optional[Dict]:
+        """Intègre un événement et retourne une alerte si les conditions sont réunies"""
+        self.n_events += 1
+        now = event.t_days
+        cell = self._cell_of(event.x, event.y)
+        self._advance(now)
+
+        if event.categorie == 'Grand feu':
+            # Comptes du grand feu et validation en ligne : une alerte récente à moins du rayon
+            # a-t-elle anticipé ce grand feu ?
+            self.n_big_fires += 1
+            neighbourhood = self._neighbourhood(cell, now)
+            counts = self._counts(neighbourhood, event.x, event.y, now, include_now=False)
+            small_count = counts['small_recent'] + counts['small_older']
+            self.big_fires.append({
+                'date_alerte': event.date_alerte,
+                'commune': event.commune,
+                'x': event.x,
+                'y': event.y,
+                'small_fires_count': small_count,
+                'medium_fires_count': counts['medium'],
+                'condition_met': small_count >= self.min_fires_before
+            })
+            anticipated = False
+            for state in neighbourhood:
+                for _, alert in state.alerts:
+                    if self._within(event.x, event.y, alert['x'], alert['y']):
+                        alert['grand_feu_suivant'] = True
+                        anticipated = True
+            if anticipated:
+                self.n_big_fires_anticipated += 1
+            return None
+
+        if event.categorie not in ('Petit feu', 'Feu moyen'):
+            return None
+
+        state = self.cells.get(cell)
+        if state is None:
+            state = self.cells[cell] = _Cell()
+        self._add(state, now, event.x, event.y, event.categorie == 'Petit feu')
+
+        neighbourhood = self._neighbourhood(cell, now)
+        counts = self._counts(neighbourhood, event.x, event.y, now, include_now=True)
+        small_recent, small_older = counts['small_recent'], counts['small_older']
+        small_count = small_recent + small_older
+
+        condition_met = small_count >= self.min_fires_before
+        rising = small_recent > small_older
+        if not (condition_met and rising) or now - state.last_alert < self.cooldown:
+            return None
+
+        alert = {
+            'date_alerte': event.date_alerte,
+            'commune': event.commune,
+            'x': event.x,
+            'y': event.y,
+            'small_fires_count': small_count,
+            'medium_fires_count': counts['medium'],
+            'small_recent': small_recent,
+            'small_older': small_older,
+            'grand_feu_suivant': False
+        }
+        state.last_alert = now
+        state.alerts.append((now, alert))
+        self.alerts.append(alert)
+        return alert
+
+    def run(self, events: Iterable[FireEvent]) -> Iterator[Dict]:
+        """Consomme un flux et produit les alertes au fil de l'eau"""
+        for event in events:
+            alert = self.process(event)
+            if alert is not None:
+                yield alert
+
+    def stats(self) -> Dict:
+        n_alerts = len(self.alerts)
+        confirmed = sum(1 for a in self.alerts if a['grand_feu_suivant'])
+        return {
+            'events': self.n_events,
+            'alerts': n_alerts,
+            'alerts_confirmed': confirmed,
+            'precision': confirmed / n_alerts if n_alerts else 0.0,
+            'big_fires': self.n_big_fires,
+            'big_fires_anticipated': self.n_big_fires_anticipated,
+            'recall': self.n_big_fires_anticipated / self.n_big_fires if self.n_big_fires else 0.0
+        }
+
+
+def replay_detector(df: pd.DataFrame, buffer_radius_km: float, temporal_window_days: int,
+                    min_fires_before: int, cooldown_days: Optional[float] = None) -> Tuple[pd.DataFrame, Dict]:
+    """
+    Rejoue l'historique à travers le détecteur et valide les alertes a posteriori
+    Retourne: (tableau des alertes, statistiques de validation et de débit)
+    """
+    detector = PrecursorDetector(buffer_radius_km, temporal_window_days, min_fires_before, cooldown_days)
+    start = time.perf_counter()
+    for _ in detector.run(replay_events(df)):
+        pass
+    elapsed = time.perf_counter() - start
+
+    stats = detector.stats()
+    stats['seconds'] = elapsed
+    stats['events_per_second'] = stats['events'] / elapsed if elapsed > 0 else float('inf')
+    return pd.DataFrame(detector.alerts), stats
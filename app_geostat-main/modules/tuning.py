@@ -0,0 +1,232 @@
+"""
+Module de réglage automatique des paramètres d'analyse (seuils, rayon, fenêtre, nombre minimal)
+Critère : séparer les vrais grands feux de pseudo événements appariés (saison, densité)
+"""
+
+import itertools
+import time
+from typing import Dict, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+from .core.indexes import SpatioTemporalIndex, dates_to_days
+from .null_model import density_strata, sample_pseudo_events
+
+# Espace de recherche par défaut (valeurs discrètes de chaque paramètre)
+DEFAULT_SPACE = {
+    'seuil_petit': (0.5, 1.0, 2.0, 5.0),
+    'seuil_grand': (5.0, 10.0, 20.0, 50.0, 100.0),
+    'rayon_km': (2, 5, 10, 15, 20, 30),
+    'fenetre_jours': (7, 15, 30, 45, 60, 90),
+    'min_petits_feux': (1, 2, 3, 5, 8, 12)
+}
+
+
+class TuningTable:
+    """
+    Table de paires précalculée une fois au rayon et à la fenêtre maximaux
+    Requêtes : chaque grand feu potentiel (surface ≥ plus petit seuil_grand) et ses pseudo événements
+    Sources : feux de surface < plus grand seuil_petit
+    Les comptes de toutes les combinaisons (rayon, fenêtre) d'un seuil_petit sont obtenus
+    par un histogramme cumulé : chaque candidat s'évalue ensuite par seuillage de tableaux
+    """
+
+    def __init__(self, df: pd.DataFrame, space: Dict[str, Sequence] = DEFAULT_SPACE, n_pseudo: int = 27,
+                 season_days: float = 15, n_strata: int = 10, seed: int = 0):
+        self.space = {k: tuple(sorted(v)) for k, v in space.items()}
+        self.radii_m = np.asarray(self.space['rayon_km'], dtype=float) * 1000
+        self.windows = np.asarray(self.space['fenetre_jours'], dtype=float)
+        self.n_pseudo = n_pseudo
+
+        df_valid = df[df['date_alerte'].notna()]
+        targets = df_valid[df_valid['surface_ha'] >= min(self.space['seuil_grand'])].drop_duplicates(
+            subset=['commune', 'date_alerte', 'x', 'y', 'surface_ha'], keep='first'
+        )
+        sources = df_valid[df_valid['surface_ha'] < max(self.space['seuil_petit'])]
+        self.index = SpatioTemporalIndex.from_frame(sources)
+        self.source_surface = sources['surface_ha'].to_numpy(dtype=float)[self.index.rows]
+
+        tx = targets['x'].to_numpy(dtype=float)
+        ty = targets['y'].to_numpy(dtype=float)
+        tt = dates_to_days(targets['date_alerte'])
+        t_doy = tt - dates_to_days(targets['date_alerte'].dt.to_period('Y').dt.start_time)
+
+        # Pseudo événements : n_pseudo par cible, même saison et même strate de densité
+        cand_x = df_valid['x'].to_numpy(dtype=float)
+        cand_y = df_valid['y'].to_numpy(dtype=float)
+        cand_strata, target_strata = density_strata(cand_x, cand_y, tx, ty, n_strata)
+        cand_by_stratum = [np.flatnonzero(cand_strata == s) for s in range(n_strata)]
+        cand_by_stratum = [m if len(m) else np.arange(len(cand_x)) for m in cand_by_stratum]
+
+        years = np.unique(df_valid['date_alerte'].dt.year)
+        years_start = dates_to_days(pd.Series(pd.to_datetime([f'{y}-01-01' for y in years])))
+        t_all = dates_to_days(df_valid['date_alerte'])
+        complete = ((years_start + t_doy.min() - season_days - self.windows[-1] >= t_all.min())
+                    & (years_start + t_doy.max() + season_days <= t_all.max()))
+        years_start = years_start[complete] if complete.any() else years_start
+
+        rng = np.random.default_rng(seed)
+        qx, qy, qt = [tx], [ty], [tt]
+        for _ in range(n_pseudo):
+            px, py, pt = sample_pseudo_events(rng, cand_x, cand_y, cand_by_stratum, target_strata, t_doy,
+                                              years_start, season_days)
+            qx.append(px)
+            qy.append(py)
+            qt.append(pt)
+
+        n_targets = len(targets)
+        # Requête k : cible k % n_targets, rang de pseudo k // n_targets (0 : vrai grand feu)
+        self.owner = np.tile(np.arange(n_targets), n_pseudo + 1)
+        self.pseudo_rank = np.repeat(np.arange(n_pseudo + 1), n_targets)
+        self.is_real = self.pseudo_rank == 0
+        self.target_surface = targets['surface_ha'].to_numpy(dtype=float)[self.owner]
+        self.target_year = targets['date_alerte'].dt.year.to_numpy()[self.owner]
+        self.n_targets = n_targets
+
+        q, src, dist, lag = [], [], [], []
+        for qi, pj, d, tau in self.index.iter_pairs_before(np.concatenate(qx), np.concatenate(qy),
+                                                           np.concatenate(qt), self.radii_m[-1],
+                                                           self.windows[-1]):
+            q.append(qi)
+            src.append(pj)
+            dist.append(d)
+            lag.append(tau)
+        empty = np.array([], dtype=np.int64)
+        self.pair_query = np.concatenate(q) if q else empty
+        self.pair_surface = self.source_surface[np.concatenate(src)] if src else np.array([])
+        # Classes fermées à droite : rayon et fenêtre inclus comme dans analyze_fires_before_big_fire
+        self.pair_ri = np.searchsorted(self.radii_m, np.concatenate(dist), side='left') if dist else empty
+        self.pair_ti = np.searchsorted(self.windows, np.concatenate(lag), side='left') if lag else empty
+        self._counts: Dict[float, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.pair_query)
+
+    def counts(self, seuil_petit: float) -> np.ndarray:
+        """Comptes (requête × rayon × fenêtre) des petits feux pour un seuil_petit (mémoïsés)"""
+        if seuil_petit not in self._counts:
+            nr, nt = len(self.radii_m), len(self.windows)
+            n_queries = len(self.owner)
+            keep = self.pair_surface < seuil_petit
+            flat = (self.pair_query[keep] * nr + self.pair_ri[keep]) * nt + self.pair_ti[keep]
+            hist = np.bincount(flat, minlength=n_queries * nr * nt).reshape(n_queries, nr, nt)
+            self._counts[seuil_petit] = hist.cumsum(axis=1).cumsum(axis=2).astype(np.int32)
+        return self._counts[seuil_petit]
+
+    def evaluate(self, params: Dict, years_mask: np.ndarray, budget: Optional[int] = None,
+                 min_targets: int = 5) -> Dict:
+        """
+        Score d'un jeu de paramètres : J de Youden de la règle « petits feux ≥ min »
+        (part des vrais grands feux qui la vérifient - part des pseudo événements)
+        budget : nombre de pseudo événements par cible utilisés (successive halving)
+        """
+        counts = self.counts(params['seuil_petit'])
+        ri = self.space['rayon_km'].index(params['rayon_km'])
+        ti = self.space['fenetre_jours'].index(params['fenetre_jours'])
+        condition = counts[:, ri, ti] >= params['min_petits_feux']
+
+        active = years_mask & (self.target_surface >= params['seuil_grand'])
+        real = active & self.is_real
+        pseudo = active & ~self.is_real & (self.pseudo_rank <= (budget or self.n_pseudo))
+        n_real, n_pseudo = int(real.sum()), int(pseudo.sum())
+        if n_real < min_targets or n_pseudo == 0:
+            return {'score': np.nan, 'tpr': np.nan, 'fpr': np.nan, 'n_grands_feux': n_real}
+        tpr = condition[real].mean()
+        fpr = condition[pseudo].mean()
+        return {'score': tpr - fpr, 'tpr': tpr, 'fpr': fpr, 'n_grands_feux': n_real}
+
+
+def _candidates(space: Dict[str, Sequence]) -> list:
+    """Toutes les combinaisons valides (seuil_petit < seuil_grand)"""
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))
+            if values[keys.index('seuil_petit')] < values[keys.index('seuil_grand')]]
+
+
+def tune_parameters(df: pd.DataFrame, strategy: str = 'halving', space: Dict[str, Sequence] = DEFAULT_SPACE,
+                    holdout_years: Optional[Sequence[int]] = None, n_iter: int = 500, patience: int = 150,
+                    eta: int = 3, n_pseudo: int = 27, top_k: int = 20, seed: int = 0,
+                    table: Optional[TuningTable] = None) -> Dict:
+    """
+    Recherche des paramètres qui séparent le mieux vrais grands feux et pseudo événements
+    - 'grid' : toutes les combinaisons
+    - 'random' : tirages sans remise, arrêt après `patience` évaluations sans amélioration
+    - 'halving' : successive halving, budget de pseudo événements multiplié par eta à chaque tour,
+      seul le meilleur tiers des candidats est conservé (les mauvaises régions sont élaguées tôt)
+    Les années de holdout_years (par défaut la dernière) ne servent qu'au score de test
+    """
+    start = time.perf_counter()
+    if table is None:
+        table = TuningTable(df, space, n_pseudo=n_pseudo, seed=seed)
+    years = np.unique(table.target_year)
+    if holdout_years is None:
+        holdout_years = years[-1:]
+    test_mask = np.isin(table.target_year, holdout_years)
+    train_mask = ~test_mask
+
+    candidates = _candidates(table.space)
+    rng = np.random.default_rng(seed)
+    n_evaluations = 0
+
+    if strategy == 'grid':
+        scored = [(c, table.evaluate(c, train_mask)) for c in candidates]
+        n_evaluations = len(scored)
+    elif strategy == 'random':
+        scored, best, since_best = [], -np.inf, 0
+        for k in rng.permutation(len(candidates))[:n_iter]:
+            result = table.evaluate(candidates[k], train_mask)
+            scored.append((candidates[k], result))
+            if result['score'] > best:
+                best, since_best = result['score'], 0
+            else:
+                since_best += 1
+            if since_best >= patience:
+                break
+        n_evaluations = len(scored)
+    elif strategy == 'halving':
+        budget = max(1, table.n_pseudo // eta ** 2)
+        survivors = candidates
+        while True:
+            scored = [(c, table.evaluate(c, train_mask, budget)) for c in survivors]
+            n_evaluations += len(scored)
+            if budget >= table.n_pseudo or len(survivors) <= top_k:
+                break
+            scored.sort(key=lambda item: -np.nan_to_num(item[1]['score'], nan=-np.inf))
+            survivors = [c for c, _ in scored[:max(top_k, len(scored) // eta)]]
+            budget = min(table.n_pseudo, budget * eta)
+        # Candidats restants évalués au budget complet
+        if budget < table.n_pseudo:
+            scored = [(c, table.evaluate(c, train_mask)) for c, _ in scored]
+    else:
+        raise ValueError(f"Stratégie inconnue : {strategy}")
+
+    scored = [item for item in scored if np.isfinite(item[1]['score'])]
+    scored.sort(key=lambda item: -item[1]['score'])
+
+    rows = []
+    for params, train in scored[:top_k]:
+        test = table.evaluate(params, test_mask, min_targets=1)
+        rows.append({
+            **params,
+            'score_apprentissage': train['score'],
+            'tpr_apprentissage': train['tpr'],
+            'fpr_apprentissage': train['fpr'],
+            'grands_feux_apprentissage': train['n_grands_feux'],
+            'score_test': test['score'],
+            'tpr_test': test['tpr'],
+            'fpr_test': test['fpr'],
+            'grands_feux_test': test['n_grands_feux']
+        })
+
+    ranking = pd.DataFrame(rows)
+    if len(ranking):
+        ranking.insert(0, 'rang', np.arange(1, len(ranking) + 1))
+    return {
+        'ranking': ranking,
+        'strategy': strategy,
+        'holdout_years': [int(y) for y in holdout_years],
+        'n_candidates': len(candidates),
+        'n_evaluations': n_evaluations,
+        'n_pairs': len(table),
+        'seconds': time.perf_counter() - start
+    }
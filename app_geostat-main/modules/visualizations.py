@@ -7,18 +7,16 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from typing import List, Dict, Tuple
-from .data_processing import lambert93_to_wgs84
-from scipy import signal, stats
-from sklearn.metrics import mutual_info_score
-from statsmodels.tsa.stattools import grangercausalitytests
+from importlib.util import find_spec
+from .core.ingest import lambert93_to_wgs84
+from .core.statistics import (
+    calculate_cross_correlation, calculate_granger_causality, calculate_mutual_information
+)
+from .autocorrelation import LISA_QUADRANTS, MORAN_VARIABLES
 import os
 
-# Import optionnel de geopandas
-try:
-    import geopandas as gpd
-    HAS_GEOPANDAS = True
-except ImportError:
-    HAS_GEOPANDAS = False
+# geopandas optionnel : détecté sans être importé (chargé seulement pour le contour Prométhée)
+HAS_GEOPANDAS = find_spec('geopandas') is not None
 
 
 def create_map(df: pd.DataFrame, big_fires: pd.DataFrame = None, 
@@ -35,6 +33,7 @@ def create_map(df: pd.DataFrame, big_fires: pd.DataFrame = None,
         try:
             parquet_path = 'data/promothee/contour_promothe.parquet'
             if os.path.exists(parquet_path):
+                import geopandas as gpd
                 gdf = gpd.read_parquet(parquet_path)
                 
                 # Convertir en WGS84 si nécessaire
@@ -169,9 +168,423 @@ def create_map(df: pd.DataFrame, big_fires: pd.DataFrame = None,
     return fig
 
 
+def create_animated_map(frames_data: Dict, frame_duration_ms: int = 800) -> go.Figure:
+    """Crée une carte animée à partir des images précalculées (lecture côté navigateur)"""
+    points, big, buffers = frames_data['points'], frames_data['big'], frames_data['buffers']
+    labels = frames_data['labels']
+
+    def frame_traces(i: int) -> List[go.Scattermapbox]:
+        p0, p1 = points['offsets'][i], points['offsets'][i + 1]
+        b0, b1 = big['offsets'][i], big['offsets'][i + 1]
+        return [
+            go.Scattermapbox(
+                lat=buffers['lat'][b0:b1].ravel(),
+                lon=buffers['lon'][b0:b1].ravel()
+            ),
+            go.Scattermapbox(
+                lat=points['lat'][p0:p1],
+                lon=points['lon'][p0:p1],
+                marker=dict(color=points['cat'][p0:p1])
+            ),
+            go.Scattermapbox(
+                lat=big['lat'][b0:b1],
+                lon=big['lon'][b0:b1],
+                text=big['commune'][b0:b1],
+                customdata=np.column_stack([big['date'][b0:b1], big['surface'][b0:b1]])
+            )
+        ]
+
+    fig = go.Figure()
+    fig.add_trace(go.Scattermapbox(
+        mode='lines',
+        line=dict(width=2, color='rgba(255, 100, 0, 0.8)'),
+        fill='toself',
+        fillcolor='rgba(255, 100, 0, 0.15)',
+        hoverinfo='skip',
+        showlegend=False
+    ))
+    fig.add_trace(go.Scattermapbox(
+        mode='markers',
+        marker=dict(
+            size=7,
+            cmin=0,
+            cmax=2,
+            colorscale=[
+                [0, '#FFD700'], [0.33, '#FFD700'],
+                [0.33, '#FF8C00'], [0.66, '#FF8C00'],
+                [0.66, '#8B0000'], [1, '#8B0000']
+            ],
+            opacity=0.8
+        ),
+        hoverinfo='skip',
+        showlegend=False
+    ))
+    fig.add_trace(go.Scattermapbox(
+        mode='markers',
+        marker=dict(size=20, color='#FF0000', symbol='star'),
+        hovertemplate='<b>GRAND FEU</b><br>%{text}<br>Date: %{customdata[0]}<br>Surface: %{customdata[1]:.2f} ha<extra></extra>',
+        showlegend=False
+    ))
+
+    if labels:
+        for trace, data in zip(fig.data, frame_traces(0)):
+            trace.update(data)
+        fig.frames = [
+            go.Frame(data=frame_traces(i), name=label, traces=[0, 1, 2])
+            for i, label in enumerate(labels)
+        ]
+
+    play_args = dict(frame=dict(duration=frame_duration_ms, redraw=True),
+                     transition=dict(duration=0), fromcurrent=True)
+    fig.update_layout(
+        mapbox_style="open-street-map",
+        mapbox=dict(center=dict(lat=43.7, lon=5.8), zoom=7.5),
+        height=700,
+        margin={"r": 0, "t": 10, "l": 0, "b": 0},
+        showlegend=False,
+        updatemenus=[dict(
+            type='buttons',
+            direction='left',
+            x=0.01, y=0.02,
+            xanchor='left', yanchor='bottom',
+            bgcolor='rgba(255, 255, 255, 0.9)',
+            buttons=[
+                dict(label='▶', method='animate', args=[None, play_args]),
+                dict(label='⏸', method='animate',
+                     args=[[None], dict(frame=dict(duration=0, redraw=False), mode='immediate')])
+            ]
+        )],
+        sliders=[dict(
+            active=0,
+            x=0.1, y=0.02,
+            len=0.88,
+            xanchor='left', yanchor='bottom',
+            bgcolor='rgba(255, 255, 255, 0.9)',
+            currentvalue=dict(prefix='Période : '),
+            steps=[
+                dict(label=label, method='animate',
+                     args=[[label], dict(frame=dict(duration=0, redraw=True), mode='immediate')])
+                for label in labels
+            ]
+        )]
+    )
+
+    return fig
+
+
+def create_density_map(raster: Dict, title: str = "Densité des incendies",
+                       min_ratio: float = 0.02) -> go.Figure:
+    """Crée une carte de chaleur à partir d'un raster de densité (une seule couche)"""
+    fig = go.Figure()
+    density = raster['density']
+    map_zoom = 8
+
+    if density.size > 0 and density.max() > 0:
+        # Seules les cellules significatives sont envoyées au navigateur
+        rows, cols = np.nonzero(density >= density.max() * min_ratio)
+        lat, lon = lambert93_to_wgs84(raster['x'][cols], raster['y'][rows])
+        z = density[rows, cols]
+
+        # Rayon en pixels équivalent à la taille de cellule au zoom affiché
+        center_lat = float(np.mean(lat))
+        m_per_px = 156543.03 * np.cos(np.radians(center_lat)) / 2 ** map_zoom
+        radius = max(2, int(round(1.5 * raster['cell_size_m'] / m_per_px)))
+
+        fig.add_trace(go.Densitymapbox(
+            lat=lat,
+            lon=lon,
+            z=z,
+            radius=radius,
+            colorscale=[
+                [0, 'rgba(241, 230, 201, 0)'],
+                [0.2, '#F1E6C9'],
+                [0.5, '#FA891A'],
+                [1.0, '#8B0000']
+            ],
+            opacity=0.8,
+            colorbar=dict(title="Feux / km²"),
+            hovertemplate='Densité: %{z:.3f} feux/km²<extra></extra>'
+        ))
+        map_center = dict(lat=center_lat, lon=float(np.mean(lon)))
+    else:
+        map_center = dict(lat=43.7, lon=5.8)
+        fig.add_annotation(
+            text="Aucun incendie pour cette sélection",
+            xref="paper", yref="paper",
+            x=0.5, y=0.5, showarrow=False
+        )
+
+    fig.update_layout(
+        title=dict(
+            text=f"{title}<br><sub>{raster['n_points']} feux | cellule {raster['cell_size_m'] / 1000:g} km | "
+                 f"largeur de bande {raster['bandwidth_m'] / 1000:g} km</sub>",
+            x=0.5,
+            xanchor='center',
+            font=dict(size=14, color='#333333')
+        ),
+        mapbox_style="open-street-map",
+        mapbox=dict(center=map_center, zoom=map_zoom),
+        height=650,
+        margin={"r": 0, "t": 60, "l": 0, "b": 0}
+    )
+
+    return fig
+
+
+def create_cluster_map(df: pd.DataFrame, labels: pd.Series, summary: pd.DataFrame) -> go.Figure:
+    """Crée une carte des clusters spatio-temporels (points colorés, précurseurs en étoiles)"""
+    fig = go.Figure()
+    
+    clustered = df[labels.to_numpy() >= 0]
+    cluster_ids = labels.to_numpy()[labels.to_numpy() >= 0]
+    
+    if len(clustered) > 0:
+        lats, lons, customdata = _fire_marker_arrays(clustered)
+        palette = np.array(px.colors.qualitative.Dark24)
+        fig.add_trace(go.Scattermapbox(
+            lat=lats,
+            lon=lons,
+            mode='markers',
+            marker=dict(size=8, color=palette[cluster_ids % len(palette)], opacity=0.8),
+            customdata=np.column_stack([customdata, cluster_ids, clustered['categorie'].to_numpy(dtype=object)]),
+            hovertemplate='<b>Cluster %{customdata[2]}</b><br>%{customdata[3]}<br>Date: %{customdata[0]}<br>Surface: %{customdata[1]:.2f} ha<extra></extra>',
+            showlegend=False
+        ))
+    
+    precurseurs = summary[summary['precurseur']]
+    if len(precurseurs) > 0:
+        lat_c, lon_c = lambert93_to_wgs84(precurseurs['x'].to_numpy(), precurseurs['y'].to_numpy())
+        fig.add_trace(go.Scattermapbox(
+            lat=lat_c,
+            lon=lon_c,
+            mode='markers',
+            marker=dict(size=20, color='#FF0000', symbol='star'),
+            customdata=np.column_stack([
+                precurseurs['cluster'].to_numpy(),
+                precurseurs['commune'].to_numpy(dtype=object),
+                precurseurs['nb_feux'].to_numpy(),
+                precurseurs['petits_feux_avant_grand'].to_numpy()
+            ]),
+            hovertemplate='<b>Cluster précurseur %{customdata[0]}</b><br>%{customdata[1]}<br>'
+                          'Feux: %{customdata[2]}<br>Petits feux avant le grand feu: %{customdata[3]}<extra></extra>',
+            showlegend=False
+        ))
+    
+    fig.update_layout(
+        mapbox_style="open-street-map",
+        mapbox=dict(center=dict(lat=43.7, lon=5.8), zoom=7.5),
+        height=650,
+        margin={"r": 0, "t": 10, "l": 0, "b": 0},
+        showlegend=False
+    )
+    
+    return fig
+
+
+# Couleurs des classes de points chauds émergents (rouges : chauds, bleus : froids)
+HOTSPOT_COLORS = {
+    'Nouveau point chaud': '#8B0000', 'Point chaud consécutif': '#C62828',
+    'Point chaud en intensification': '#E53935', 'Point chaud persistant': '#EF6C00',
+    'Point chaud en diminution': '#FB8C00', 'Point chaud sporadique': '#FFB74D',
+    'Point chaud oscillant': '#FFD180', 'Point chaud historique': '#BCAAA4',
+    'Nouveau point froid': '#0D47A1', 'Point froid consécutif': '#1565C0',
+    'Point froid en intensification': '#1E88E5', 'Point froid persistant': '#42A5F5',
+    'Point froid en diminution': '#64B5F6', 'Point froid sporadique': '#90CAF9',
+    'Point froid oscillant': '#BBDEFB', 'Point froid historique': '#B0BEC5',
+    'Aucune tendance': '#9E9E9E'
+}
+
+
+def create_hotspot_map(hotspots: Dict) -> go.Figure:
+    """Crée une carte des classes de points chauds émergents (une couche par classe)"""
+    fig = go.Figure()
+    cells = hotspots['cells']
+    
+    if len(cells) > 0:
+        lat, lon = lambert93_to_wgs84(cells['x'].to_numpy(), cells['y'].to_numpy())
+        customdata = np.column_stack([
+            cells['nb_feux'].to_numpy(),
+            cells['z_dernier'].to_numpy(),
+            cells['tendance_z'].to_numpy(),
+            cells['part_chaud'].to_numpy() * 100
+        ])
+        codes = cells['classe'].cat.codes.to_numpy()
+        for code, classe in enumerate(cells['classe'].cat.categories):
+            rows = np.flatnonzero(codes == code)
+            if len(rows) == 0:
+                continue
+            fig.add_trace(go.Scattermapbox(
+                lat=lat[rows],
+                lon=lon[rows],
+                mode='markers',
+                marker=dict(size=9, color=HOTSPOT_COLORS.get(classe, '#9E9E9E'), opacity=0.8),
+                customdata=customdata[rows],
+                name=f"{classe} ({len(rows)})",
+                visible='legendonly' if classe == 'Aucune tendance' else True,
+                hovertemplate=(f"<b>{classe}</b><br>Feux: %{{customdata[0]:.0f}}<br>"
+                               "Gi* dernier pas: %{customdata[1]:.2f}<br>"
+                               "Tendance (z MK): %{customdata[2]:.2f}<br>"
+                               "Pas chauds: %{customdata[3]:.0f}%<extra></extra>")
+            ))
+    
+    n_periods = len(hotspots['periods'])
+    fig.update_layout(
+        title=dict(
+            text=f"Points chauds émergents (Gi*)<br><sub>cellule {hotspots['cell_size_m'] / 1000:g} km | "
+                 f"voisinage {hotspots['distance_m'] / 1000:g} km | {n_periods} pas de temps</sub>",
+            x=0.5,
+            xanchor='center',
+            font=dict(size=14, color='#333333')
+        ),
+        mapbox_style="open-street-map",
+        mapbox=dict(center=dict(lat=43.7, lon=5.8), zoom=7.5),
+        height=650,
+        margin={"r": 0, "t": 60, "l": 0, "b": 0},
+        legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01, bgcolor="rgba(255, 255, 255, 0.8)")
+    )
+    
+    return fig
+
+
+# Couleurs des quadrants LISA (dans l'ordre de LISA_QUADRANTS)
+LISA_COLORS = ['#D3D3D3', '#D7191C', '#ABD9E9', '#2C7BB6', '#FDAE61']
+
+
+def create_lisa_map(moran: Dict, variable: str, annee: int) -> go.Figure:
+    """Crée une carte des quadrants LISA significatifs pour une variable et une année"""
+    fig = go.Figure()
+    
+    if len(moran['x']) > 0 and annee in moran['years']:
+        k = int(np.searchsorted(moran['years'], annee))
+        local = moran['local'][variable]
+        quadrant = local['quadrant'][:, k]
+        lat, lon = lambert93_to_wgs84(moran['x'], moran['y'])
+        customdata = np.column_stack([moran['values'][variable][:, k], local['I'][:, k], local['p_value'][:, k]])
+        for code, label in enumerate(LISA_QUADRANTS):
+            rows = np.flatnonzero(quadrant == code)
+            if len(rows) == 0:
+                continue
+            fig.add_trace(go.Scattermapbox(
+                lat=lat[rows],
+                lon=lon[rows],
+                mode='markers',
+                marker=dict(size=10 if code else 6, color=LISA_COLORS[code], opacity=0.85 if code else 0.5),
+                customdata=customdata[rows],
+                name=f"{label} ({len(rows)})",
+                hovertemplate=(f"<b>{label}</b><br>{MORAN_VARIABLES[variable]}: %{{customdata[0]:.2f}}<br>"
+                               "I local: %{customdata[1]:.3f}<br>p-value: %{customdata[2]:.3f}<extra></extra>")
+            ))
+    
+    fig.update_layout(
+        title=dict(
+            text=f"LISA - {MORAN_VARIABLES[variable]} ({annee})<br><sub>cellule {moran['cell_size_m'] / 1000:g} km | "
+                 f"bande de distance {moran['distance_m'] / 1000:g} km | α = {moran['alpha']}</sub>",
+            x=0.5,
+            xanchor='center',
+            font=dict(size=14, color='#333333')
+        ),
+        mapbox_style="open-street-map",
+        mapbox=dict(center=dict(lat=43.7, lon=5.8), zoom=7.5),
+        height=600,
+        margin={"r": 0, "t": 60, "l": 0, "b": 0},
+        legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01, bgcolor="rgba(255, 255, 255, 0.8)")
+    )
+    
+    return fig
+
+
+def create_moran_trend(moran: Dict) -> go.Figure:
+    """Crée le graphique de l'évolution annuelle du I de Moran global (marqueurs pleins si significatif)"""
+    fig = go.Figure()
+    global_stats = moran['global']
+    colors = {'nb_feux': '#FA891A', 'surface_ha': '#8B0000'}
+    
+    for variable, label in MORAN_VARIABLES.items():
+        stats = global_stats[global_stats['variable'] == variable]
+        if len(stats) == 0:
+            continue
+        significant = (stats['p_value'] <= moran['alpha']).to_numpy()
+        fig.add_trace(go.Scatter(
+            x=stats['annee'],
+            y=stats['I'],
+            mode='lines+markers',
+            name=label,
+            line=dict(color=colors[variable], width=2),
+            marker=dict(size=10, color=np.where(significant, colors[variable], 'white'),
+                        line=dict(color=colors[variable], width=2)),
+            customdata=stats['p_value'],
+            hovertemplate=f"<b>{label}</b><br>Année: %{{x}}<br>I: %{{y:.3f}}<br>"
+                          "p-value: %{customdata:.3f}<extra></extra>"
+        ))
+    
+    if len(global_stats) > 0:
+        fig.add_hline(y=global_stats['esperance'].iloc[0], line_dash="dash", line_color="gray",
+                      annotation_text="E[I]")
+    
+    fig.update_layout(
+        title="Autocorrélation spatiale globale (I de Moran)",
+        xaxis_title="Année",
+        yaxis_title="I de Moran",
+        hovermode='x unified',
+        height=400,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    
+    return fig
+
+
+def create_scan_map(clusters: pd.DataFrame, alpha: float = 0.05) -> go.Figure:
+    """Crée une carte des clusters détectés par balayage (cercles, significatifs en rouge)"""
+    fig = go.Figure()
+    
+    angles = 2 * np.pi * np.arange(51) / 50
+    for _, cluster in clusters.iloc[::-1].iterrows():
+        lat_c, lon_c = lambert93_to_wgs84(cluster['x'], cluster['y'])
+        radius_deg = cluster['rayon_km'] * 0.009
+        significatif = cluster['p_value'] <= alpha
+        color = '255, 0, 0' if significatif else '120, 120, 120'
+        hover = (f"<b>Cluster #{cluster['rang']}</b> - {cluster['commune']}<br>"
+                 f"{cluster['date_debut'].strftime('%d/%m/%Y')} → {cluster['date_fin'].strftime('%d/%m/%Y')}<br>"
+                 f"Observé: {cluster['observe']} | Attendu: {cluster['attendu']:.2f}<br>"
+                 f"p-value: {cluster['p_value']:.3f}<extra></extra>")
+        fig.add_trace(go.Scattermapbox(
+            lat=lat_c + radius_deg * np.cos(angles),
+            lon=lon_c + radius_deg * np.sin(angles) / 0.72,
+            mode='lines',
+            line=dict(width=3, color=f'rgba({color}, 0.8)'),
+            fill='toself',
+            fillcolor=f'rgba({color}, 0.2)',
+            hovertemplate=hover,
+            showlegend=False
+        ))
+        fig.add_trace(go.Scattermapbox(
+            lat=[lat_c],
+            lon=[lon_c],
+            mode='markers+text',
+            marker=dict(size=10, color=f'rgb({color})'),
+            text=[f"#{cluster['rang']}"],
+            textposition='top right',
+            hovertemplate=hover,
+            showlegend=False
+        ))
+    
+    fig.update_layout(
+        mapbox_style="open-street-map",
+        mapbox=dict(center=dict(lat=43.7, lon=5.8), zoom=7.5),
+        height=650,
+        margin={"r": 0, "t": 10, "l": 0, "b": 0},
+        showlegend=False
+    )
+    
+    return fig
+
+
 def create_pie_chart(df: pd.DataFrame, title: str = "Répartition par catégorie") -> go.Figure:
     """Crée un graphique circulaire amélioré"""
     cat_counts = df['categorie'].value_counts()
+    # Catégories absentes exclues (colonne catégorielle)
+    cat_counts = cat_counts[cat_counts > 0]
+    cat_counts.index = cat_counts.index.astype(str)
     colors = {'Petit feu': '#F1E6C9', 'Feu moyen': '#ABDADC', 'Grand feu': '#8B0000'}
     
     fig = px.pie(
@@ -188,7 +601,8 @@ def create_pie_chart(df: pd.DataFrame, title: str = "Répartition par catégorie
 
 def create_line_chart(df: pd.DataFrame, title: str = "Évolution annuelle") -> go.Figure:
     """Crée un graphique linéaire amélioré"""
-    yearly = df.groupby(['annee', 'categorie']).size().reset_index(name='count')
+    yearly = df.groupby(['annee', 'categorie'], observed=True).size().reset_index(name='count')
+    yearly['categorie'] = yearly['categorie'].astype(str)
     colors = {'Petit feu': '#F1E6C9', 'Feu moyen': '#ABDADC', 'Grand feu': '#8B0000'}
     
     fig = px.line(
@@ -688,7 +1102,7 @@ def create_commune_evolution(df: pd.DataFrame, commune: str) -> go.Figure:
         return fig
     
     # Comptage par année et catégorie
-    yearly = df_commune.groupby(['annee', 'categorie']).size().reset_index(name='count')
+    yearly = df_commune.groupby(['annee', 'categorie'], observed=True).size().reset_index(name='count')
     
     colors = {'Petit feu': '#F1E6C9', 'Feu moyen': '#ABDADC', 'Grand feu': '#8B0000'}
     
@@ -1106,6 +1520,19 @@ def create_multi_fire_comparison(analysis_results: list, big_fires: pd.DataFrame
     return fig
 
 
+def _fire_marker_arrays(fires: pd.DataFrame, date_format: str = '%d/%m/%Y') -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Prépare les marqueurs d'un ensemble de feux en une passe vectorisée
+    Retourne: (lats, lons, customdata [date, surface]) pour un hovertemplate
+    """
+    lats, lons = lambert93_to_wgs84(fires['x'].to_numpy(dtype=float), fires['y'].to_numpy(dtype=float))
+    customdata = np.column_stack([
+        fires['date_alerte'].dt.strftime(date_format).to_numpy(dtype=object),
+        fires['surface_ha'].to_numpy(dtype=float)
+    ])
+    return lats, lons, customdata
+
+
 def create_detail_fire_map(big_fire: pd.Series, small_medium_fires: pd.DataFrame, buffer_radius_km: float) -> go.Figure:
     """Crée une carte centrée sur un grand feu avec son buffer et les petits/moyens feux"""
     fig = go.Figure()
@@ -1145,13 +1572,7 @@ def create_detail_fire_map(big_fire: pd.Series, small_medium_fires: pd.DataFrame
         
         # Petits feux (triangles verts)
         if len(petits_feux) > 0:
-            lats_p, lons_p, dates_p, surfaces_p = [], [], [], []
-            for _, fire in petits_feux.iterrows():
-                lat, lon = lambert93_to_wgs84(fire['x'], fire['y'])
-                lats_p.append(lat)
-                lons_p.append(lon)
-                dates_p.append(fire['date_alerte'].strftime('%d/%m/%Y'))
-                surfaces_p.append(fire['surface_ha'])
+            lats_p, lons_p, customdata_p = _fire_marker_arrays(petits_feux)
             
             fig.add_trace(go.Scattermapbox(
                 lat=lats_p,
@@ -1165,18 +1586,12 @@ def create_detail_fire_map(big_fire: pd.Series, small_medium_fires: pd.DataFrame
                 ),
                 name='Petits feux',
                 hovertemplate='<b>Petit feu</b><br>Date: %{customdata[0]}<br>Surface: %{customdata[1]:.2f} ha<extra></extra>',
-                customdata=list(zip(dates_p, surfaces_p))
+                customdata=customdata_p
             ))
         
         # Feux moyens (cercles bleus)
         if len(moyens_feux) > 0:
-            lats_m, lons_m, dates_m, surfaces_m = [], [], [], []
-            for _, fire in moyens_feux.iterrows():
-                lat, lon = lambert93_to_wgs84(fire['x'], fire['y'])
-                lats_m.append(lat)
-                lons_m.append(lon)
-                dates_m.append(fire['date_alerte'].strftime('%d/%m/%Y'))
-                surfaces_m.append(fire['surface_ha'])
+            lats_m, lons_m, customdata_m = _fire_marker_arrays(moyens_feux)
             
             fig.add_trace(go.Scattermapbox(
                 lat=lats_m,
@@ -1190,7 +1605,7 @@ def create_detail_fire_map(big_fire: pd.Series, small_medium_fires: pd.DataFrame
                 ),
                 name='Feux moyens',
                 hovertemplate='<b>Feu moyen</b><br>Date: %{customdata[0]}<br>Surface: %{customdata[1]:.2f} ha<extra></extra>',
-                customdata=list(zip(dates_m, surfaces_m))
+                customdata=customdata_m
             ))
     
     # Grand feu (étoile rouge)
@@ -1250,124 +1665,6 @@ def create_detail_fire_map(big_fire: pd.Series, small_medium_fires: pd.DataFrame
     return fig
 
 
-def prepare_time_series_for_correlation(df: pd.DataFrame) -> Tuple[pd.Series, pd.Series]:
-    """Prépare les séries temporelles pour l'analyse de corrélation entre petits et grands feux"""
-    # Filtrer les dates valides
-    df_valid = df[df['date_alerte'].notna()].copy()
-    
-    # Créer une série temporelle journalière
-    df_valid['date_only'] = df_valid['date_alerte'].dt.date
-    
-    # Compter petits feux et grands feux par jour
-    petits_feux = df_valid[df_valid['categorie'] == 'Petit feu'].groupby('date_only').size()
-    grands_feux = df_valid[df_valid['categorie'] == 'Grand feu'].groupby('date_only').size()
-    
-    # Créer une plage de dates complète
-    date_min = df_valid['date_only'].min()
-    date_max = df_valid['date_only'].max()
-    date_range = pd.date_range(start=date_min, end=date_max, freq='D')
-    
-    # Réindexer pour avoir toutes les dates (remplir avec 0)
-    petits_series = petits_feux.reindex(date_range.date, fill_value=0)
-    grands_series = grands_feux.reindex(date_range.date, fill_value=0)
-    
-    return petits_series, grands_series
-
-
-def calculate_cross_correlation(df: pd.DataFrame, max_lag: int = 30) -> Tuple[np.ndarray, np.ndarray, int, float]:
-    """
-    Calcule la corrélation croisée entre petits et grands feux
-    Retourne: (lags, correlations, best_lag, best_corr)
-    """
-    petits_series, grands_series = prepare_time_series_for_correlation(df)
-    
-    # Normaliser les séries
-    petits_norm = (petits_series - petits_series.mean()) / (petits_series.std() + 1e-10)
-    grands_norm = (grands_series - grands_series.mean()) / (grands_series.std() + 1e-10)
-    
-    # Calculer la corrélation croisée
-    correlation = signal.correlate(petits_norm, grands_norm, mode='full', method='auto')
-    lags = signal.correlation_lags(len(petits_norm), len(grands_norm), mode='full')
-    
-    # Normaliser la corrélation
-    correlation = correlation / len(petits_norm)
-    
-    # Filtrer les lags pertinents
-    mask = (lags >= -max_lag) & (lags <= max_lag)
-    lags_filtered = lags[mask]
-    correlation_filtered = correlation[mask]
-    
-    # Trouver le meilleur lag
-    best_idx = np.argmax(np.abs(correlation_filtered))
-    best_lag = lags_filtered[best_idx]
-    best_corr = correlation_filtered[best_idx]
-    
-    return lags_filtered, correlation_filtered, best_lag, best_corr
-
-
-def calculate_granger_causality(df: pd.DataFrame, max_lag: int = 15) -> Tuple[Dict, float, int]:
-    """
-    Teste la causalité de Granger entre petits et grands feux
-    Retourne: (résultats, p-value minimale, meilleur lag)
-    """
-    petits_series, grands_series = prepare_time_series_for_correlation(df)
-    
-    # Créer un DataFrame pour le test
-    data = pd.DataFrame({
-        'grands_feux': grands_series.values,
-        'petits_feux': petits_series.values
-    })
-    
-    try:
-        # Test de causalité: est-ce que petits_feux cause grands_feux?
-        gc_results = grangercausalitytests(data[['grands_feux', 'petits_feux']], maxlag=max_lag, verbose=False)
-        
-        # Extraire les p-values pour chaque lag
-        p_values = {}
-        for lag in range(1, max_lag + 1):
-            # Utiliser le test F
-            p_value = gc_results[lag][0]['ssr_ftest'][1]
-            p_values[lag] = p_value
-        
-        # Trouver le meilleur lag (p-value la plus faible)
-        best_lag = min(p_values, key=p_values.get)
-        min_p_value = p_values[best_lag]
-        
-        return p_values, min_p_value, best_lag
-    except Exception as e:
-        # En cas d'erreur, retourner des valeurs par défaut
-        return {}, 1.0, 0
-
-
-def calculate_mutual_information(df: pd.DataFrame) -> Tuple[float, List[float], List[int]]:
-    """
-    Calcule l'information mutuelle entre petits et grands feux avec différents décalages
-    Retourne: (meilleure MI, liste des MI, liste des lags)
-    """
-    petits_series, grands_series = prepare_time_series_for_correlation(df)
-    
-    lags_to_test = list(range(0, 31, 1))
-    mi_scores = []
-    
-    for lag in lags_to_test:
-        if lag == 0:
-            # Pas de décalage
-            mi = mutual_info_score(petits_series, grands_series)
-        elif lag > 0:
-            # Décaler les petits feux vers l'avant (petits feux arrivent avant grands feux)
-            petits_shifted = petits_series[:-lag]
-            grands_shifted = grands_series[lag:]
-            mi = mutual_info_score(petits_shifted, grands_shifted)
-        
-        mi_scores.append(mi)
-    
-    best_idx = np.argmax(mi_scores)
-    best_mi = mi_scores[best_idx]
-    best_lag = lags_to_test[best_idx]
-    
-    return best_mi, mi_scores, lags_to_test
-
-
 def create_correlation_analysis_figure(df: pd.DataFrame) -> go.Figure:
     """
     Crée une figure avec 3 graphiques de corrélation en colonnes:
@@ -1515,6 +1812,214 @@ def create_correlation_analysis_figure(df: pd.DataFrame) -> go.Figure:
     return fig
 
 
+def create_knox_figure(knox: Dict) -> go.Figure:
+    """Crée deux cartes de chaleur : ratio de Knox (avec p-values) et interaction D(d, τ)"""
+    from plotly.subplots import make_subplots
+    
+    x_labels = [f"{lag:g} j" for lag in knox['lags_days']]
+    y_labels = [f"{d:g} km" for d in knox['distances_km']]
+    
+    fig = make_subplots(
+        rows=1, cols=2,
+        subplot_titles=('Ratio de Knox (observé / attendu)', 'Interaction D(d, τ) = K_st - K_s·K_t'),
+        horizontal_spacing=0.12
+    )
+    
+    fig.add_trace(go.Heatmap(
+        z=knox['knox_ratio'],
+        x=x_labels,
+        y=y_labels,
+        customdata=np.dstack([knox['observed'], knox['expected'], knox['p_values']]),
+        colorscale=[[0, '#ABDADC'], [0.5, '#F1E6C9'], [1, '#8B0000']],
+        zmid=1,
+        text=np.vectorize(lambda r, p: f"{r:.2f}{'*' if p < 0.05 else ''}")(knox['knox_ratio'], knox['p_values']),
+        texttemplate='%{text}',
+        colorbar=dict(title='Ratio', x=0.44),
+        hovertemplate='Distance ≤ %{y}<br>Décalage ≤ %{x}<br>Observé: %{customdata[0]}<br>'
+                      'Attendu: %{customdata[1]:.1f}<br>p-value: %{customdata[2]:.3f}<extra></extra>'
+    ), row=1, col=1)
+    
+    fig.add_trace(go.Heatmap(
+        z=knox['D'],
+        x=x_labels,
+        y=y_labels,
+        colorscale=[[0, '#ABDADC'], [0.5, '#FFFFFF'], [1, '#FA891A']],
+        zmid=0,
+        colorbar=dict(title='D'),
+        hovertemplate='Distance ≤ %{y}<br>Décalage ≤ %{x}<br>D: %{z:.3g}<extra></extra>'
+    ), row=1, col=2)
+    
+    fig.update_xaxes(title_text='Décalage temporel')
+    fig.update_yaxes(title_text='Distance')
+    fig.update_layout(
+        title=dict(
+            text=f"<b>Interaction Espace-Temps</b><br><sub>{knox['n_fires']} feux | "
+                 f"{knox['n_permutations']} permutations | * : p < 0.05</sub>",
+            x=0.5
+        ),
+        height=450,
+        paper_bgcolor='white',
+        font=dict(family='Arial', size=11),
+        margin=dict(t=100, b=60, l=60, r=60)
+    )
+    
+    return fig
+
+
+def create_hawkes_figure(hawkes: Dict) -> go.Figure:
+    """Crée la matrice de branchement du processus de Hawkes et l'origine moyenne des feux par catégorie"""
+    from plotly.subplots import make_subplots
+    
+    types = hawkes['types']
+    alpha = hawkes['alpha'].to_numpy()
+    origin = hawkes['origin']
+    
+    fig = make_subplots(
+        rows=1, cols=2,
+        subplot_titles=('Feux déclenchés par feu source (α)', 'Origine des feux (probabilité moyenne)'),
+        horizontal_spacing=0.15
+    )
+    
+    fig.add_trace(go.Heatmap(
+        z=alpha,
+        x=types,
+        y=types,
+        colorscale=[[0, '#F1E6C9'], [0.5, '#FA891A'], [1, '#8B0000']],
+        text=np.vectorize(lambda a: f"{a:.3f}")(alpha),
+        texttemplate='%{text}',
+        colorbar=dict(title='α', x=0.42),
+        hovertemplate='Source: %{y}<br>Cible: %{x}<br>α: %{z:.4f}<extra></extra>'
+    ), row=1, col=1)
+    
+    colors = ['#D3D3D3', '#FFD700', '#FFA500', '#8B0000']
+    labels = ['Fond'] + types
+    for column, label, color in zip(origin.columns, labels, colors):
+        fig.add_trace(go.Bar(
+            x=origin.index,
+            y=origin[column],
+            name=label,
+            marker_color=color,
+            hovertemplate=f'{label}: %{{y:.1%}}<extra></extra>'
+        ), row=1, col=2)
+    
+    fig.update_xaxes(title_text='Catégorie cible', row=1, col=1)
+    fig.update_yaxes(title_text='Catégorie source', autorange='reversed', row=1, col=1)
+    fig.update_yaxes(title_text='Probabilité', tickformat='.0%', row=1, col=2)
+    fig.update_layout(
+        title=dict(
+            text=f"<b>Processus de Hawkes marqué</b><br><sub>{hawkes['n_events']} feux | "
+                 f"demi-vie {hawkes['half_life_days']:.1f} j | σ {hawkes['sigma_km']:.2f} km | "
+                 f"rapport de branchement {hawkes['branching_ratio']:.2f}</sub>",
+            x=0.5
+        ),
+        barmode='stack',
+        height=450,
+        paper_bgcolor='white',
+        font=dict(family='Arial', size=11),
+        margin=dict(t=100, b=60, l=60, r=60),
+        legend=dict(x=1.02, y=0.5)
+    )
+    
+    return fig
+
+
+def create_null_model_figure(null_model: Dict) -> go.Figure:
+    """Crée le graphique des petits feux observés avant chaque grand feu face à l'intervalle 5-95 % du modèle nul"""
+    per_fire = null_model['per_fire'].sort_values('z_score').reset_index(drop=True)
+    labels = [f"{c} ({d:%d/%m/%Y})" for c, d in zip(per_fire['commune'], per_fire['date_alerte'])]
+    significant = per_fire['p_value'] <= 0.05
+    
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        y=labels,
+        x=per_fire['p95'] - per_fire['p5'],
+        base=per_fire['p5'],
+        orientation='h',
+        marker_color='rgba(171, 218, 220, 0.7)',
+        name='Modèle nul (5-95 %)',
+        hovertemplate='Intervalle nul: %{base:.0f} - %{x:.0f}<extra></extra>'
+    ))
+    fig.add_trace(go.Scatter(
+        y=labels,
+        x=per_fire['attendu'],
+        mode='markers',
+        marker=dict(symbol='line-ns-open', size=14, color='#4682B4'),
+        name='Attendu'
+    ))
+    fig.add_trace(go.Scatter(
+        y=labels,
+        x=per_fire['petits_feux'],
+        mode='markers',
+        marker=dict(size=10, color=np.where(significant, '#8B0000', '#FA891A'), line=dict(color='white', width=1)),
+        customdata=np.column_stack([per_fire['percentile'], per_fire['z_score'], per_fire['p_value']]),
+        name='Observé',
+        hovertemplate='Observé: %{x}<br>Percentile: %{customdata[0]:.0f}<br>z: %{customdata[1]:.2f}<br>'
+                      'p-value: %{customdata[2]:.3f}<extra></extra>'
+    ))
+    
+    fig.update_layout(
+        title=dict(
+            text=f"<b>Petits feux précurseurs face au modèle nul</b><br><sub>{null_model['n_replicates']} réplicats | "
+                 f"enrichissement {null_model['enrichment_ratio']:.2f} (p = {null_model['p_value']:.3f})</sub>",
+            x=0.5
+        ),
+        xaxis_title='Petits feux dans la fenêtre et le buffer',
+        height=max(400, 22 * len(per_fire) + 150),
+        barmode='overlay',
+        paper_bgcolor='white',
+        font=dict(family='Arial', size=11),
+        legend=dict(orientation="h", yanchor="bottom", y=1.01, xanchor="right", x=1)
+    )
+    
+    return fig
+
+
+def create_forecast_figure(metrics: pd.DataFrame) -> go.Figure:
+    """Crée les courbes ROC-AUC et PR-AUC par pli (année de test) et par saison"""
+    from plotly.subplots import make_subplots
+    
+    fig = make_subplots(rows=1, cols=2, subplot_titles=('ROC-AUC', 'PR-AUC (précision moyenne)'),
+                        horizontal_spacing=0.1)
+    colors = {'Toutes': '#333333', 'Hiver': '#4682B4', 'Printemps': '#2E8B57',
+              'Été': '#FA891A', 'Automne': '#8B4513'}
+    
+    for saison, color in colors.items():
+        rows = metrics[metrics['saison'] == saison]
+        if len(rows) == 0:
+            continue
+        for col, metric in enumerate(['roc_auc', 'pr_auc'], start=1):
+            fig.add_trace(go.Scatter(
+                x=rows['pli'],
+                y=rows[metric],
+                mode='lines+markers',
+                name=saison,
+                legendgroup=saison,
+                showlegend=col == 1,
+                line=dict(color=color, width=3 if saison == 'Toutes' else 1.5),
+                customdata=np.column_stack([rows['positifs'], rows['taux_base']]),
+                hovertemplate=f'{saison} %{{x}}<br>{metric}: %{{y:.3f}}<br>Positifs: %{{customdata[0]}}<br>'
+                              'Taux de base: %{customdata[1]:.4f}<extra></extra>'
+            ), row=1, col=col)
+    
+    # Référence : modèle aléatoire (0.5 en ROC, taux de base en PR)
+    fig.add_hline(y=0.5, line_dash="dash", line_color="gray", row=1, col=1)
+    overall = metrics[metrics['saison'] == 'Toutes']
+    fig.add_trace(go.Scatter(
+        x=overall['pli'], y=overall['taux_base'], mode='lines', name='Aléatoire',
+        line=dict(color='gray', dash='dash'), hovertemplate='Taux de base: %{y:.4f}<extra></extra>'
+    ), row=1, col=2)
+    
+    fig.update_xaxes(title_text='Année de test', dtick=1)
+    fig.update_layout(
+        height=420,
+        paper_bgcolor='white',
+        font=dict(family='Arial', size=11),
+        legend=dict(orientation="h", yanchor="bottom", y=1.08, xanchor="right", x=1)
+    )
+    
+    return fig
+
+
 def create_correlation_summary_table(df: pd.DataFrame) -> pd.DataFrame:
     """
     Crée un tableau récapitulatif des résultats de corrélation
@@ -1584,6 +2089,17 @@ def create_correlation_summary_table(df: pd.DataFrame) -> pd.DataFrame:
     return pd.DataFrame(summary_data)
 
 
+def create_correlation_results(df: pd.DataFrame) -> Dict:
+    """
+    Figure et tableau récapitulatif des corrélations en un seul appel
+    (tâche exécutée en arrière-plan par la page d'analyse)
+    """
+    return {
+        'figure': create_correlation_analysis_figure(df),
+        'summary': create_correlation_summary_table(df)
+    }
+
+
 def create_communes_croissance_map(big_fires: pd.DataFrame, analysis_results: List[Dict]) -> go.Figure:
     """
     Crée une carte montrant les communes avec tendance croissante
@@ -1597,38 +2113,24 @@ def create_communes_croissance_map(big_fires: pd.DataFrame, analysis_results: Li
     """
     fig = go.Figure()
     
-    # Collecter les données des feux à tendance croissante
-    lats = []
-    lons = []
-    communes = []
-    dates = []
-    surfaces = []
-    petits_feux = []
-    moyens_feux = []
-    totaux = []
-    
-    for idx, result in enumerate(analysis_results):
-        if result['condition_met'] and result['trend'] == 'Croissance':
-            bf = big_fires.iloc[idx]
-            lat, lon = lambert93_to_wgs84(bf['x'], bf['y'])
-            
-            lats.append(lat)
-            lons.append(lon)
-            communes.append(bf['commune'])
-            dates.append(bf['date_alerte'].strftime('%d/%m/%Y'))
-            surfaces.append(bf['surface_ha'])
-            petits_feux.append(result['small_fires_count'])
-            moyens_feux.append(result['medium_fires_count'])
-            totaux.append(result['small_fires_count'] + result['medium_fires_count'])
-    
-    if lats:
+    # Sélection vectorisée des feux à tendance croissante
+    croissance_idx = np.flatnonzero([
+        r['condition_met'] and r['trend'] == 'Croissance' for r in analysis_results
+    ])
+    
+    if len(croissance_idx) > 0:
+        bf = big_fires.iloc[croissance_idx]
+        lats, lons = lambert93_to_wgs84(bf['x'].to_numpy(dtype=float), bf['y'].to_numpy(dtype=float))
+        surfaces = bf['surface_ha'].to_numpy(dtype=float)
+        petits_feux = np.array([analysis_results[i]['small_fires_count'] for i in croissance_idx])
+        moyens_feux = np.array([analysis_results[i]['medium_fires_count'] for i in croissance_idx])
+        totaux = petits_feux + moyens_feux
+        
         # Calculer le centre et le zoom
-        center_lat = sum(lats) / len(lats)
-        center_lon = sum(lons) / len(lons)
+        center_lat = float(lats.mean())
+        center_lon = float(lons.mean())
         
-        lat_range = max(lats) - min(lats)
-        lon_range = max(lons) - min(lons)
-        max_range = max(lat_range, lon_range)
+        max_range = max(np.ptp(lats), np.ptp(lons))
         
         if max_range > 3:
             zoom = 7
@@ -1639,25 +2141,19 @@ def create_communes_croissance_map(big_fires: pd.DataFrame, analysis_results: Li
         else:
             zoom = 10
         
-        # Créer des marqueurs colorés par nombre total de feux
-        max_total = max(totaux) if totaux else 1
-        
         # Tailles proportionnelles à la surface
-        max_surface = max(surfaces) if surfaces else 1
-        sizes = [15 + (s / max_surface) * 25 for s in surfaces]
+        max_surface = surfaces.max() if surfaces.max() > 0 else 1
+        sizes = 15 + (surfaces / max_surface) * 25
         
-        # Texte hover personnalisé
-        hover_texts = []
-        for i in range(len(communes)):
-            hover_text = (
-                f"<b>{communes[i]}</b><br>"
-                f"{dates[i]}<br>"
-                f"Surface: {surfaces[i]:.1f} ha<br>"
-                f"Petits feux: {petits_feux[i]}<br>"
-                f"Moyens feux: {moyens_feux[i]}<br>"
-                f"Total: {totaux[i]}"
-            )
-            hover_texts.append(hover_text)
+        # Données de survol en colonnes (formatées par le hovertemplate côté navigateur)
+        customdata = np.column_stack([
+            bf['commune'].to_numpy(dtype=object),
+            bf['date_alerte'].dt.strftime('%d/%m/%Y').to_numpy(dtype=object),
+            surfaces,
+            petits_feux,
+            moyens_feux,
+            totaux
+        ])
         
         # Ajouter les marqueurs
         fig.add_trace(go.Scattermapbox(
@@ -1668,8 +2164,8 @@ def create_communes_croissance_map(big_fires: pd.DataFrame, analysis_results: Li
                 size=sizes,
                 color=totaux,
                 colorscale=[[0, '#FF6B00'], [0.5, '#FF0000'], [1, '#8B0000']],
-                cmin=min(totaux),
-                cmax=max(totaux),
+                cmin=int(totaux.min()),
+                cmax=int(totaux.max()),
                 colorbar=dict(
                     title="Total<br>feux",
                     thickness=15,
@@ -1683,9 +2179,15 @@ def create_communes_croissance_map(big_fires: pd.DataFrame, analysis_results: Li
                 ),
                 opacity=0.9
             ),
-            text=communes,
-            hovertext=hover_texts,
-            hoverinfo='text',
+            customdata=customdata,
+            hovertemplate=(
+                '<b>%{customdata[0]}</b><br>'
+                '%{customdata[1]}<br>'
+                'Surface: %{customdata[2]:.1f} ha<br>'
+                'Petits feux: %{customdata[3]}<br>'
+                'Moyens feux: %{customdata[4]}<br>'
+                'Total: %{customdata[5]}<extra></extra>'
+            ),
             showlegend=False
         ))
         
@@ -13,19 +13,50 @@ Analyse spatiale et temporelle avec visualisations améliorées
 """
 
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-from modules.data_processing import (
-    load_data, classify_fires, analyze_fires_before_big_fire
-)
+from modules.core.ingest import category_counts
 from modules.visualizations import (
     create_map, create_pie_chart, create_line_chart,
     create_trend_bar, create_scatter_plot, create_temporal_series,
     create_multi_fire_comparison, create_detail_fire_map,
-    create_correlation_analysis_figure, create_correlation_summary_table,
-    create_communes_croissance_map
+    create_correlation_results,
+    create_communes_croissance_map, create_density_map, create_animated_map,
+    create_cluster_map, create_knox_figure, create_scan_map, create_hotspot_map,
+    create_lisa_map, create_moran_trend, create_hawkes_figure,
+    create_null_model_figure, create_forecast_figure
+)
+from modules.figure_cache import cached_figure
+from modules.dataset import open_dataset, classified_fires, sorted_surfaces
+from modules.pipeline import (
+    big_fire_events, precursor_results, results_table, density_raster, hotspot_job,
+    moran_job, animation_frames
+)
+from modules.download_cache import deferred_download, bytes_builder
+from modules.background import submit_section, render_when_done, reset_pending, render_pending
+from modules.streaming import replay_detector
+from modules.clustering import cluster_fires, summarize_clusters
+from modules.spacetime_stats import knox_test
+from modules.scan import spacetime_permutation_scan
+from modules.autocorrelation import MORAN_VARIABLES
+from modules.hawkes import fit_hawkes
+from modules.null_model import precursor_null_model
+from modules.features import load_or_build_features
+from modules.forecasting import build_forecast_matrix, rolling_origin_backtest, FORECAST_MODELS, MatrixTooLargeError
+from modules.tuning import tune_parameters
+from modules.export import (
+    export_results, export_results_to_file, write_csv, export_parquet, export_arrow,
+    export_geoparquet, export_geopackage, big_fire_table, HAS_GEOPANDAS
 )
-from modules.export import export_results, export_csv
+
+DATA_PATH = 'data/incendies_paca_2015_2022.csv'
+
+# Réglages par défaut des sections lentes (partagés par les widgets et le lancement anticipé)
+CATEGORIES = ['Tous', 'Petit feu', 'Feu moyen', 'Grand feu']
+HOTSPOT_DEFAULTS = {'hotspot_categorie': 'Tous', 'hotspot_cell': 2, 'hotspot_distance': 5, 'hotspot_period': 'Mois'}
+MORAN_DEFAULTS = {'moran_categorie': 'Tous', 'moran_cell': 5, 'moran_distance': 10, 'moran_permutations': 499}
+HOTSPOT_FREQ = {'Mois': 'M', 'Trimestre': 'Q', 'Année': 'Y'}
 
 # Configuration de la page
 st.set_page_config(
@@ -36,7 +67,250 @@ st.set_page_config(
 )
 
 
+@st.fragment
+def map_section(dataset, df_filtered, big_fires, analysis_results, analysis_params, fig_params):
+    """Carte statique ou animée (le changement de mode ne redessine que la carte)"""
+    seuil_petit, seuil_grand, temporal_window, buffer_radius, min_fires_before = analysis_params
+    data_version = dataset.fingerprint
+    
+    # ========== CARTE INTERACTIVE ==========
+    st.header("Carte Interactive")
+    st.caption(f"**Rouge** : Grands feux | **Zone** : Buffer **{buffer_radius}** km")
+    map_mode = st.radio(
+        "Mode d'affichage",
+        ['Statique', 'Animation annuelle', 'Animation mensuelle'],
+        horizontal=True,
+        key='map_mode'
+    )
+    if map_mode == 'Statique':
+        map_fig = cached_figure('map', data_version, fig_params,
+                                lambda: create_map(df_filtered, big_fires, analysis_results, buffer_radius))
+    else:
+        period = 'Y' if map_mode == 'Animation annuelle' else 'M'
+        map_fig = cached_figure(
+            'animated_map', data_version, fig_params + (period,),
+            lambda: create_animated_map(animation_frames(
+                big_fires, analysis_results, dataset, seuil_petit, seuil_grand,
+                buffer_radius, temporal_window, min_fires_before, period
+            ))
+        )
+    st.plotly_chart(map_fig, width='stretch')
+
+
+@st.fragment
+def density_section(dataset, class_params):
+    """Densité par noyau (ses réglages ne relancent que cette section)"""
+    seuil_petit, seuil_grand = class_params
+    data_version = dataset.fingerprint
+    
+    # ========== DENSITÉ DES INCENDIES ==========
+    st.header("Densité des Incendies")
+    st.caption("Estimation par noyau gaussien sur une grille Lambert 93")
+    
+    dens_col1, dens_col2, dens_col3 = st.columns(3)
+    with dens_col1:
+        density_categorie = st.selectbox(
+            "Catégorie", ['Tous', 'Petit feu', 'Feu moyen', 'Grand feu'], key='density_categorie'
+        )
+    with dens_col2:
+        density_cell_km = st.slider("Taille de cellule (km)", min_value=0.5, max_value=5.0,
+                                    value=1.0, step=0.5, key='density_cell')
+    with dens_col3:
+        density_bandwidth_km = st.slider("Largeur de bande (km)", min_value=1, max_value=20,
+                                         value=5, key='density_bandwidth')
+    
+    density_title = "Densité des incendies" if density_categorie == 'Tous' else f"Densité - {density_categorie}"
+    fig_density = cached_figure(
+        'density', data_version, class_params + (density_categorie, density_cell_km, density_bandwidth_km),
+        lambda: create_density_map(density_raster(
+            dataset, seuil_petit, seuil_grand, density_categorie,
+            density_cell_km * 1000, density_bandwidth_km * 1000
+        ), density_title)
+    )
+    st.plotly_chart(fig_density, width='stretch')
+
+
+def _setting(defaults, key):
+    """Valeur courante d'un réglage (état du widget, ou défaut avant son premier affichage)"""
+    return st.session_state.get(key, defaults[key])
+
+
+def start_hotspots(dataset, df_filtered, class_params):
+    """Lance (ou retrouve) les points chauds pour les réglages courants de la section"""
+    return hotspot_job(
+        dataset, df_filtered, class_params, _setting(HOTSPOT_DEFAULTS, 'hotspot_categorie'),
+        _setting(HOTSPOT_DEFAULTS, 'hotspot_cell') * 1000, _setting(HOTSPOT_DEFAULTS, 'hotspot_distance') * 1000,
+        HOTSPOT_FREQ[_setting(HOTSPOT_DEFAULTS, 'hotspot_period')]
+    )
+
+
+def start_moran(dataset, df_filtered, class_params):
+    """Lance (ou retrouve) les indices de Moran pour les réglages courants de la section"""
+    return moran_job(
+        dataset, df_filtered, class_params, _setting(MORAN_DEFAULTS, 'moran_categorie'),
+        _setting(MORAN_DEFAULTS, 'moran_cell') * 1000, _setting(MORAN_DEFAULTS, 'moran_distance') * 1000,
+        _setting(MORAN_DEFAULTS, 'moran_permutations')
+    )
+
+
+@st.fragment
+def hotspot_section(dataset, df_filtered, class_params):
+    """Points chauds émergents (ses réglages ne relancent que cette section)"""
+    data_version = dataset.fingerprint
+    
+    # ========== POINTS CHAUDS ÉMERGENTS ==========
+    st.header("Points Chauds Émergents")
+    st.caption("Getis-Ord Gi* sur un cube grille × pas de temps, tendance de Mann-Kendall par cellule")
+    
+    hs_col1, hs_col2, hs_col3, hs_col4 = st.columns(4)
+    with hs_col1:
+        hotspot_categorie = st.selectbox(
+            "Catégorie", CATEGORIES, index=CATEGORIES.index(HOTSPOT_DEFAULTS['hotspot_categorie']),
+            key='hotspot_categorie'
+        )
+    with hs_col2:
+        hotspot_cell_km = st.slider("Taille de cellule (km)", min_value=1, max_value=10,
+                                    value=HOTSPOT_DEFAULTS['hotspot_cell'], key='hotspot_cell')
+    with hs_col3:
+        hotspot_distance_km = st.slider("Voisinage (km)", min_value=2, max_value=30,
+                                        value=HOTSPOT_DEFAULTS['hotspot_distance'], key='hotspot_distance')
+    with hs_col4:
+        hotspot_period = st.radio("Pas de temps", list(HOTSPOT_FREQ), horizontal=True,
+                                  index=list(HOTSPOT_FREQ).index(HOTSPOT_DEFAULTS['hotspot_period']),
+                                  key='hotspot_period')
+    
+    hotspot_params = class_params + (hotspot_categorie, hotspot_cell_km, hotspot_distance_km, hotspot_period)
+    
+    def show_hotspots(hotspots):
+        fig_hotspots = cached_figure('hotspots', data_version, hotspot_params,
+                                     lambda: create_hotspot_map(hotspots))
+        st.plotly_chart(fig_hotspots, width='stretch')
+        
+        with st.expander("Cellules en tendance"):
+            hotspot_cells = hotspots['cells']
+            st.dataframe(
+                hotspot_cells[hotspot_cells['classe'] != 'Aucune tendance'].sort_values('z_dernier', ascending=False),
+                width='stretch', hide_index=True, height=300
+            )
+    
+    # Même futur que celui lancé en début de page si les réglages n'ont pas changé ;
+    # en cours de calcul, la section est remplie en fin de page sans bloquer les suivantes
+    render_when_done(start_hotspots(dataset, df_filtered, class_params), show_hotspots,
+                     'Calcul des points chauds...')
+
+
+@st.fragment
+def moran_section(dataset, df_filtered, class_params):
+    """Moran global et LISA (ses réglages ne relancent que cette section)"""
+    data_version = dataset.fingerprint
+    
+    # ========== AUTOCORRÉLATION SPATIALE ==========
+    st.header("Autocorrélation Spatiale (I de Moran)")
+    st.caption("Moran global et local (LISA) par année sur une grille Lambert 93, "
+               "poids de bande de distance construits une fois et réutilisés pour toutes les années")
+    
+    moran_col1, moran_col2, moran_col3, moran_col4 = st.columns(4)
+    with moran_col1:
+        moran_categorie = st.selectbox(
+            "Catégorie", CATEGORIES, index=CATEGORIES.index(MORAN_DEFAULTS['moran_categorie']),
+            key='moran_categorie'
+        )
+    with moran_col2:
+        moran_cell_km = st.slider("Taille de cellule (km)", min_value=2, max_value=10,
+                                  value=MORAN_DEFAULTS['moran_cell'], key='moran_cell')
+    with moran_col3:
+        moran_distance_km = st.slider("Bande de distance (km)", min_value=5, max_value=30,
+                                      value=MORAN_DEFAULTS['moran_distance'], key='moran_distance')
+    with moran_col4:
+        moran_permutations = st.select_slider("Permutations", options=[99, 199, 499, 999],
+                                              value=MORAN_DEFAULTS['moran_permutations'],
+                                              key='moran_permutations')
+    
+    moran_params = class_params + (moran_categorie, moran_cell_km, moran_distance_km, moran_permutations)
+    
+    def show_moran(moran):
+        if len(moran['years']) == 0:
+            st.info("Aucun incendie pour cette sélection")
+            return
+        st.plotly_chart(
+            cached_figure('moran_trend', data_version, moran_params, lambda: create_moran_trend(moran)),
+            width='stretch'
+        )
+        
+        lisa_col1, lisa_col2 = st.columns(2)
+        with lisa_col1:
+            lisa_variable = st.radio("Variable", list(MORAN_VARIABLES), horizontal=True,
+                                     format_func=MORAN_VARIABLES.get, key='lisa_variable')
+        with lisa_col2:
+            lisa_annee = st.selectbox("Année", [int(a) for a in moran['years']],
+                                      index=len(moran['years']) - 1, key='lisa_annee')
+        st.plotly_chart(
+            cached_figure('lisa_map', data_version, moran_params + (lisa_variable, lisa_annee),
+                          lambda: create_lisa_map(moran, lisa_variable, lisa_annee)),
+            width='stretch'
+        )
+    
+    render_when_done(start_moran(dataset, df_filtered, class_params), show_moran,
+                     'Calcul des indices de Moran...')
+
+
+@st.fragment
+def fire_detail_section(dataset, big_fires, analysis_results, results_df, valid_indices, fig_params):
+    """
+    Détail d'un grand feu : le choix d'un autre feu ne redessine que cette section
+    (les étapes amont ne sont pas recalculées)
+    """
+    data_version = dataset.fingerprint
+    
+    st.subheader("Évolution Temporelle des Petits Feux")
+    st.caption("Visualisez l'accumulation progressive des petits feux avant la survenue d'un grand feu")
+    
+    selected_fire_idx = st.selectbox(
+        "Choisir un grand feu à analyser",
+        range(len(results_df)),
+        format_func=lambda x: f"{results_df['Commune'].iat[x]} - {results_df['DateTime'].iat[x]} - {results_df['Surface (ha)'].iat[x]:.1f} ha ({results_df['Petits feux'].iat[x]} petits feux avant)",
+        key='select_fire_temporal'
+    )
+    
+    actual_idx = valid_indices[selected_fire_idx]
+    selected_result = analysis_results[actual_idx]
+    selected_fire = big_fires.iloc[actual_idx]
+    
+    if 'small_fires' in selected_result and len(selected_result['small_fires']) > 0:
+        def build_temporal_series():
+            small_fires_temp = selected_result['small_fires'].copy()
+            small_fires_temp['date_only'] = small_fires_temp['date_alerte'].dt.date
+            daily_counts = small_fires_temp.groupby('date_only').size().reset_index(name='Nombre')
+            daily_counts['date_only'] = pd.to_datetime(daily_counts['date_only'])
+            return create_temporal_series(daily_counts, selected_fire['date_alerte'],
+                                          selected_fire['commune'])
+        
+        fig_time = cached_figure('temporal_series', data_version, fig_params + (actual_idx,),
+                                 build_temporal_series)
+        st.plotly_chart(fig_time, width='stretch')
+        
+        # Métriques clés avec delta pour la tendance
+        st.markdown("##### Statistiques du Grand Feu")
+        metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
+        with metric_col1:
+            st.metric("Petits feux", selected_result['small_fires_count'])
+        with metric_col2:
+            st.metric("Moyens feux", selected_result['medium_fires_count'])
+        with metric_col3:
+            total = selected_result['small_fires_count'] + selected_result['medium_fires_count']
+            st.metric("Total feux avant", total)
+        with metric_col4:
+            st.metric("Surface grand feu", f"{selected_fire['surface_ha']:.1f} ha")
+        
+        # Tendance
+        tendance = selected_result['trend']
+        st.info(f"**Tendance avant le grand feu** : {tendance}")
+    else:
+        st.info("Aucun petit feu dans la fenêtre temporelle")
+
+
 def main():
+    reset_pending()
     st.title("Analyse des Incendies en PACA")
     
     # Styles globaux déjà injectés via inject_css();
@@ -44,9 +318,9 @@ def main():
     
     # Chargement des données
     try:
-        df = load_data('data/incendies_paca_2015_2022.csv')
+        source = open_dataset(DATA_PATH)
         
-        if len(df) == 0:
+        if source.n_fires == 0:
             st.error("Aucune donnée valide trouvée dans le fichier CSV")
             return
     except Exception as e:
@@ -79,8 +353,8 @@ def main():
     
     with col1:
         st.subheader("Période")
-        annee_min = int(df['annee'].min())
-        annee_max = int(df['annee'].max())
+        annee_min = source.annee_debut
+        annee_max = source.annee_fin
         annee_debut = st.number_input("Année de début", min_value=annee_min, 
                                        max_value=annee_max, value=annee_min)
         annee_fin = st.number_input("Année de fin", min_value=annee_min, 
@@ -99,25 +373,39 @@ def main():
     min_fires_before = st.slider("Nombre min. de petits feux", min_value=0, max_value=20, value=3)
     
     # Filtrage et classification
-    df_filtered = df[(df['annee'] >= annee_debut) & (df['annee'] <= annee_fin)].copy()
-    df_filtered = classify_fires(df_filtered, seuil_petit, seuil_grand)
+    # Poignée de la période : seule clé hachée des étapes en cache (jamais le DataFrame)
+    dataset = source.select_years(annee_debut, annee_fin)
+    data_version = dataset.fingerprint
     
     st.markdown("---")
     
     # ========== STATISTIQUES ==========
     col1, col2, col3, col4 = st.columns(4)
     
+    # Comptes par recherche dichotomique dans les surfaces triées, affichés avant toute classification
+    surfaces = sorted_surfaces(dataset)
+    counts = category_counts(surfaces, seuil_petit, seuil_grand)
     with col1:
-        st.metric("Total incendies", len(df_filtered))
+        st.metric("Total incendies", len(surfaces))
     with col2:
-        petits = len(df_filtered[df_filtered['categorie'] == 'Petit feu'])
-        st.metric("Petits feux", petits)
+        st.metric("Petits feux", counts['Petit feu'])
     with col3:
-        moyens = len(df_filtered[df_filtered['categorie'] == 'Feu moyen'])
-        st.metric("Feux moyens", moyens)
+        st.metric("Feux moyens", counts['Feu moyen'])
     with col4:
-        grands = len(df_filtered[df_filtered['categorie'] == 'Grand feu'])
-        st.metric("Grands feux", grands)
+        st.metric("Grands feux", counts['Grand feu'])
+    
+    df_filtered = classified_fires(dataset, seuil_petit, seuil_grand)
+    
+    # Clés compactes du cache de figures (la période est portée par l'empreinte de la poignée)
+    class_params = (seuil_petit, seuil_grand)
+    fig_params = class_params + (buffer_radius, temporal_window, min_fires_before)
+    
+    # Sections lentes (corrélations, points chauds, Moran) lancées en arrière-plan dès la classification
+    # connue ; les sections rapides s'affichent sans attendre, chaque résultat est repris à sa place
+    correlation_job = submit_section('correlation', data_version, class_params,
+                                     create_correlation_results, df_filtered)
+    start_hotspots(dataset, df_filtered, class_params)
+    start_moran(dataset, df_filtered, class_params)
     
     st.markdown("---")
     
@@ -130,33 +418,20 @@ def main():
     st.markdown("---")
     
     # ========== PRÉPARATION DES DONNÉES ==========
-    big_fires = df_filtered[
-        (df_filtered['categorie'] == 'Grand feu') & 
-        (df_filtered['date_alerte'].notna())
-    ].copy()
-    
-    # Dédupliquer les grands feux (même commune, date, coordonnées, surface)
-    big_fires = big_fires.drop_duplicates(
-        subset=['commune', 'date_alerte', 'x', 'y', 'surface_ha'],
-        keep='first'
-    ).reset_index(drop=True)
-    
-    analysis_results = []
-    if len(big_fires) > 0:
-        with st.spinner('Analyse en cours...'):
-            for _, big_fire in big_fires.iterrows():
-                result = analyze_fires_before_big_fire(
-                    df_filtered, big_fire, temporal_window, 
-                    buffer_radius, min_fires_before
-                )
-                analysis_results.append(result)
-    
-    valid_count = sum(1 for r in analysis_results if r['condition_met'])
+    # Étapes en cache : grands feux, puis résultats précurseurs, puis tableau des résultats
+    analysis_params = class_params + (temporal_window, buffer_radius, min_fires_before)
+    big_fires = big_fire_events(dataset, seuil_petit, seuil_grand)
     
     if len(big_fires) == 0:
         st.warning("Aucun grand feu trouvé dans la période sélectionnée")
         return
     
+    analysis_results = precursor_results(dataset, *analysis_params)
+    results = results_table(dataset, *analysis_params)
+    results_df = results['table']
+    valid_indices = results['valid_indices']
+    valid_count = len(valid_indices)
+    
     if valid_count == 0:
         st.warning("Aucun grand feu ne répond aux critères. Ajustez les paramètres.")
         return
@@ -164,8 +439,8 @@ def main():
     # ========== STATISTIQUES CARTOGRAPHIQUES ==========
     st.subheader("Statistiques Cartographiques")
     
-    total_small = sum(r['small_fires_count'] for r in analysis_results if r['condition_met'])
-    total_medium = sum(r['medium_fires_count'] for r in analysis_results if r['condition_met'])
+    total_small = results['total_small']
+    total_medium = results['total_medium']
     
     col_stat1, col_stat2, col_stat3, col_stat4 = st.columns(4)
     with col_stat1:
@@ -179,91 +454,41 @@ def main():
     
     st.markdown("---")
     
-    # Préparer les données de résultats
-    results_data = []
-    for idx, result in enumerate(analysis_results):
-        if result['condition_met']:
-            bf = big_fires.iloc[idx]
-            results_data.append({
-                'Date': bf['date_alerte'].strftime('%d/%m/%Y'),
-                'DateTime': bf['date_alerte'].strftime('%d/%m/%Y %H:%M'),
-                'Commune': bf['commune'],
-                'Surface (ha)': bf['surface_ha'],
-                'Petits feux': result['small_fires_count'],
-                'Moyens feux': result['medium_fires_count'],
-                'Total buffer': len(result['fires_in_buffer']),
-                'Tendance': result['trend']
-            })
-    
-    results_df = pd.DataFrame(results_data)
-    valid_indices = [i for i, r in enumerate(analysis_results) if r['condition_met']]
-    
     # ========== DISTRIBUTION DES INCENDIES ==========
     st.header("Distribution des Incendies")
     dist_col1, dist_col2 = st.columns(2)
     with dist_col1:
         st.subheader("Répartition (camembert)")
-        fig_pie = create_pie_chart(df_filtered)
-        st.plotly_chart(fig_pie, use_container_width=True)
+        fig_pie = cached_figure('pie', data_version, class_params,
+                                lambda: create_pie_chart(df_filtered))
+        st.plotly_chart(fig_pie, width='stretch')
     with dist_col2:
         st.subheader("Série temporelle")
-        fig_line = create_line_chart(df_filtered)
-        st.plotly_chart(fig_line, use_container_width=True)
+        fig_line = cached_figure('line', data_version, class_params,
+                                 lambda: create_line_chart(df_filtered))
+        st.plotly_chart(fig_line, width='stretch')
 
     st.markdown("---")
-    # ========== CARTE INTERACTIVE ==========
-    st.header("Carte Interactive")
-    st.caption(f"**Rouge** : Grands feux | **Zone** : Buffer **{buffer_radius}** km")
-    map_fig = create_map(df_filtered, big_fires, analysis_results, buffer_radius)
-    st.plotly_chart(map_fig, use_container_width=True)
+    map_section(dataset, df_filtered, big_fires, analysis_results, analysis_params, fig_params)
     
     st.markdown("---")
     
-    # ========== LIGNE 2 : ÉVOLUTION TEMPORELLE ==========
-    st.header("Évolution et Détails")
+    density_section(dataset, class_params)
     
-    st.subheader("Évolution Temporelle des Petits Feux")
-    st.caption("Visualisez l'accumulation progressive des petits feux avant la survenue d'un grand feu")
+    st.markdown("---")
     
-    selected_fire_idx = st.selectbox(
-        "Choisir un grand feu à analyser",
-        range(len(results_data)),
-        format_func=lambda x: f"{results_data[x]['Commune']} - {results_data[x]['DateTime']} - {results_data[x]['Surface (ha)']:.1f} ha ({results_data[x]['Petits feux']} petits feux avant)",
-        key='select_fire_temporal'
-    )
+    hotspot_section(dataset, df_filtered, class_params)
     
-    actual_idx = valid_indices[selected_fire_idx]
-    selected_result = analysis_results[actual_idx]
-    selected_fire = big_fires.iloc[actual_idx]
+    st.markdown("---")
     
-    if 'small_fires' in selected_result and len(selected_result['small_fires']) > 0:
-        small_fires_temp = selected_result['small_fires'].copy()
-        small_fires_temp['date_only'] = small_fires_temp['date_alerte'].dt.date
-        daily_counts = small_fires_temp.groupby('date_only').size().reset_index(name='Nombre')
-        daily_counts['date_only'] = pd.to_datetime(daily_counts['date_only'])
-        
-        fig_time = create_temporal_series(daily_counts, selected_fire['date_alerte'], 
-                                          selected_fire['commune'])
-        st.plotly_chart(fig_time, width='stretch')
-        
-        # Métriques clés avec delta pour la tendance
-        st.markdown("##### Statistiques du Grand Feu")
-        metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
-        with metric_col1:
-            st.metric("Petits feux", selected_result['small_fires_count'])
-        with metric_col2:
-            st.metric("Moyens feux", selected_result['medium_fires_count'])
-        with metric_col3:
-            total = selected_result['small_fires_count'] + selected_result['medium_fires_count']
-            st.metric("Total feux avant", total)
-        with metric_col4:
-            st.metric("Surface grand feu", f"{selected_fire['surface_ha']:.1f} ha")
-        
-        # Tendance
-        tendance = selected_result['trend']
-        st.info(f"**Tendance avant le grand feu** : {tendance}")
-    else:
-        st.info("Aucun petit feu dans la fenêtre temporelle")
+    moran_section(dataset, df_filtered, class_params)
+    
+    st.markdown("---")
+    
+    # ========== LIGNE 2 : ÉVOLUTION TEMPORELLE ==========
+    st.header("Évolution et Détails")
+    
+    fire_detail_section(dataset, big_fires, analysis_results, results_df, valid_indices, fig_params)
     
     # ========== ANALYSE TENDANCES CROISSANTES ==========
     st.markdown("---")
@@ -350,7 +575,7 @@ def main():
                     margin=dict(l=10, r=10, t=80, b=40)
                 )
                 
-                st.plotly_chart(fig_croissance, use_container_width=True)
+                st.plotly_chart(fig_croissance, width='stretch')
             
             # ========== COLONNE 2: Graphique circulaire ==========
             with col2:
@@ -389,12 +614,13 @@ def main():
                     )
                 )
                 
-                st.plotly_chart(fig_pie, use_container_width=True)
+                st.plotly_chart(fig_pie, width='stretch')
             
             # ========== COLONNE 3: Carte des communes ==========
             with col3:
-                fig_map = create_communes_croissance_map(big_fires, analysis_results)
-                st.plotly_chart(fig_map, use_container_width=True)
+                fig_map = cached_figure('communes_croissance', data_version, fig_params,
+                                        lambda: create_communes_croissance_map(big_fires, analysis_results))
+                st.plotly_chart(fig_map, width='stretch')
             
             # Métriques récapitulatives en bas (ligne complète)
             st.markdown("---")
@@ -416,14 +642,262 @@ def main():
     st.header("Analyse Comparative")
     st.subheader("Patterns d'Accumulation")
     
-    fig_comparison = create_multi_fire_comparison(
-        analysis_results, big_fires, temporal_window, 
-        nb_feux=10, show_moyenne=False, show_variance=False
+    fig_comparison = cached_figure(
+        'multi_fire_comparison', data_version, fig_params,
+        lambda: create_multi_fire_comparison(
+            analysis_results, big_fires, temporal_window,
+            nb_feux=10, show_moyenne=False, show_variance=False
+        )
     )
     st.plotly_chart(fig_comparison, width='stretch')
     
     st.markdown("---")
     
+    # ========== CLUSTERS SPATIO-TEMPORELS ==========
+    st.header("Clusters Spatio-Temporels (ST-DBSCAN)")
+    st.caption("Regroupement des feux proches à la fois dans l'espace et dans le temps")
+    
+    cluster_col1, cluster_col2, cluster_col3 = st.columns(3)
+    with cluster_col1:
+        eps_km = st.slider("Distance max. (km)", min_value=1, max_value=30, value=5, key='stdbscan_eps_km')
+    with cluster_col2:
+        eps_days = st.slider("Écart temporel max. (jours)", min_value=1, max_value=60, value=7, key='stdbscan_eps_days')
+    with cluster_col3:
+        min_samples = st.slider("Points min. par cluster", min_value=2, max_value=30, value=5, key='stdbscan_min_samples')
+    
+    if st.button("Calculer les clusters", width='stretch', key="btn_stdbscan"):
+        with st.spinner('Regroupement en cours...'):
+            cluster_labels = cluster_fires(df_filtered, eps_km, eps_days, min_samples)
+            cluster_summary = summarize_clusters(df_filtered, cluster_labels)
+        
+        cl_col1, cl_col2, cl_col3 = st.columns(3)
+        with cl_col1:
+            st.metric("Clusters", len(cluster_summary))
+        with cl_col2:
+            st.metric("Clusters précurseurs", int(cluster_summary['precurseur'].sum()))
+        with cl_col3:
+            st.metric("Feux regroupés", int((cluster_labels >= 0).sum()))
+        
+        st.plotly_chart(create_cluster_map(df_filtered, cluster_labels, cluster_summary), width='stretch')
+        st.dataframe(cluster_summary, width='stretch', hide_index=True, height=300)
+    
+    st.markdown("---")
+    
+    # ========== INTERACTION ESPACE-TEMPS ==========
+    st.header("Interaction Espace-Temps (Knox / K-fonction)")
+    st.caption("Les petits feux proches dans l'espace sont-ils aussi plus proches dans le temps qu'attendu par hasard ?")
+    
+    knox_col1, knox_col2, knox_col3 = st.columns(3)
+    with knox_col1:
+        knox_categories = st.multiselect("Catégories", ['Petit feu', 'Feu moyen', 'Grand feu'],
+                                         default=['Petit feu'], key='knox_categories')
+    with knox_col2:
+        knox_max_km = st.slider("Distance max. (km)", min_value=2, max_value=30, value=10, key='knox_max_km')
+    with knox_col3:
+        knox_permutations = st.select_slider("Permutations", options=[19, 49, 99, 199, 499], value=99,
+                                             key='knox_permutations')
+    
+    if st.button("Lancer le test de Knox", width='stretch', key="btn_knox"):
+        knox_distances = np.unique(np.linspace(1, knox_max_km, 6).round())
+        knox_lags = [1, 3, 7, 14, 30, temporal_window]
+        with st.spinner('Comptage des paires et permutations en cours...'):
+            knox_result = knox_test(
+                df_filtered[df_filtered['categorie'].isin(knox_categories)],
+                knox_distances, sorted(set(knox_lags)), n_permutations=knox_permutations
+            )
+        st.plotly_chart(create_knox_figure(knox_result), width='stretch')
+    
+    st.markdown("---")
+    
+    # ========== BALAYAGE SPATIO-TEMPOREL ==========
+    st.header("Détection de Foyers Anormaux (Balayage Espace-Temps)")
+    st.caption("Statistique de balayage par permutation : cylindres (cercle × fenêtre temporelle) "
+               "où les petits feux sont plus nombreux qu'attendu")
+    
+    scan_col1, scan_col2, scan_col3, scan_col4 = st.columns(4)
+    with scan_col1:
+        scan_cell_km = st.slider("Maille (km)", min_value=1, max_value=10, value=5, key='scan_cell_km')
+    with scan_col2:
+        scan_radius_km = st.slider("Rayon max. (km)", min_value=5, max_value=50, value=15, key='scan_radius_km')
+    with scan_col3:
+        scan_max_weeks = st.slider("Durée max. (semaines)", min_value=1, max_value=12, value=4, key='scan_max_weeks')
+    with scan_col4:
+        scan_replicates = st.select_slider("Réplicats", options=[19, 49, 99, 199, 999], value=99,
+                                           key='scan_replicates')
+    
+    if st.button("Lancer le balayage", width='stretch', key="btn_scan"):
+        with st.spinner('Balayage et réplicats Monte Carlo en cours...'):
+            scan_clusters = spacetime_permutation_scan(
+                df_filtered[df_filtered['categorie'] == 'Petit feu'],
+                cell_size_km=scan_cell_km, time_bin_days=7, max_radius_km=scan_radius_km,
+                max_duration_bins=scan_max_weeks, n_replicates=scan_replicates
+            )
+        
+        if len(scan_clusters) > 0:
+            n_significatifs = int((scan_clusters['p_value'] <= 0.05).sum())
+            st.success(f"{n_significatifs} foyer(s) significatif(s) (p ≤ 0.05) sur {len(scan_clusters)} candidats")
+            st.plotly_chart(create_scan_map(scan_clusters), width='stretch')
+            st.dataframe(scan_clusters, width='stretch', hide_index=True, height=300)
+        else:
+            st.info("Aucun foyer détecté")
+    
+    st.markdown("---")
+    
+    # ========== DÉTECTION EN LIGNE ==========
+    st.header("Détection en Ligne des Précurseurs")
+    st.caption("Rejeu chronologique des alertes : une alerte est levée dès que le seuil de petits feux "
+               "est atteint dans le voisinage avec une tendance croissante")
+    
+    if st.button("Rejouer la période sélectionnée", width='stretch', key="btn_replay"):
+        with st.spinner('Rejeu du flux en cours...'):
+            alerts_df, replay_stats = replay_detector(
+                df_filtered, buffer_radius, temporal_window, min_fires_before
+            )
+        
+        replay_col1, replay_col2, replay_col3, replay_col4 = st.columns(4)
+        with replay_col1:
+            st.metric("Événements / s", f"{replay_stats['events_per_second']:,.0f}".replace(',', ' '))
+        with replay_col2:
+            st.metric("Alertes levées", replay_stats['alerts'])
+        with replay_col3:
+            st.metric("Alertes suivies d'un grand feu", f"{replay_stats['precision']:.0%}")
+        with replay_col4:
+            st.metric("Grands feux anticipés", f"{replay_stats['big_fires_anticipated']} / {replay_stats['big_fires']}")
+        
+        if len(alerts_df) > 0:
+            st.dataframe(
+                alerts_df[['date_alerte', 'commune', 'small_fires_count', 'medium_fires_count', 'grand_feu_suivant']],
+                width='stretch',
+                hide_index=True,
+                height=300
+            )
+    
+    st.markdown("---")
+    
+    # ========== MODÈLE NUL ==========
+    st.header("Modèle Nul des Précurseurs (Monte Carlo)")
+    st.caption("Le nombre de petits feux avant un grand feu est-il inhabituel ? Comparaison avec des "
+               "pseudo grands feux tirés à la même saison et dans des zones de même densité de feux")
+    
+    null_col1, null_col2 = st.columns(2)
+    with null_col1:
+        null_replicates = st.select_slider("Réplicats", options=[99, 499, 999, 1999, 4999], value=999,
+                                           key='null_replicates')
+    with null_col2:
+        null_season_days = st.slider("Tolérance saisonnière (± jours)", min_value=0, max_value=45, value=15,
+                                     key='null_season_days')
+    
+    if st.button("Lancer le modèle nul", width='stretch', key="btn_null"):
+        with st.spinner('Tirage et comptage des pseudo grands feux...'):
+            null_model = precursor_null_model(
+                df_filtered, big_fires, buffer_radius, temporal_window, min_fires_before,
+                n_replicates=null_replicates, season_days=null_season_days
+            )
+        
+        if null_model['n_big_fires'] == 0:
+            st.info("Aucun grand feu daté dans la période sélectionnée")
+        else:
+            null_m1, null_m2, null_m3, null_m4 = st.columns(4)
+            with null_m1:
+                st.metric("Ratio d'enrichissement", f"{null_model['enrichment_ratio']:.2f}",
+                          help="Petits feux observés / attendus sous le modèle nul")
+            with null_m2:
+                st.metric("p-value agrégée", f"{null_model['p_value']:.3f}")
+            with null_m3:
+                st.metric("Condition remplie (observé / nul)",
+                          f"{null_model['condition_rate']:.0%} / {null_model['null_condition_rate']:.0%}")
+            with null_m4:
+                st.metric("Coût par réplicat", f"{null_model['ms_per_replicate']:.1f} ms")
+            
+            st.plotly_chart(create_null_model_figure(null_model), width='stretch')
+            st.dataframe(null_model['per_fire'], width='stretch', hide_index=True, height=300)
+    
+    st.markdown("---")
+    
+    # ========== PRÉVISION ==========
+    st.header("Prévision des Grands Feux")
+    st.caption("Probabilité d'un grand feu dans une maille pendant les N jours suivants, "
+               "évaluée par validation à origine glissante (une année de test par pli)")
+    
+    fc_col1, fc_col2, fc_col3 = st.columns(3)
+    with fc_col1:
+        forecast_model = st.selectbox("Modèle", list(FORECAST_MODELS), format_func=FORECAST_MODELS.get,
+                                      key='forecast_model')
+    with fc_col2:
+        forecast_horizon = st.slider("Horizon (jours)", min_value=1, max_value=60, value=14,
+                                     key='forecast_horizon')
+    with fc_col3:
+        # Maille de 2 km : matrice au-delà du budget mémoire (MAX_MATRIX_BYTES)
+        forecast_cell_km = st.slider("Maille (km)", min_value=3, max_value=20, value=10,
+                                     key='forecast_cell_km')
+    
+    if st.button("Lancer le backtest", width='stretch', key="btn_forecast"):
+        with st.spinner('Construction des features et entraînement des plis...'):
+            try:
+                forecast_matrix = build_forecast_matrix(df_filtered, forecast_cell_km * 1000, forecast_horizon)
+            except MatrixTooLargeError as e:
+                st.warning(str(e))
+                forecast_matrix = None
+            forecast_metrics = (rolling_origin_backtest(forecast_matrix, forecast_model)
+                                if forecast_matrix is not None else None)
+        
+        if forecast_metrics is not None and len(forecast_metrics) > 0:
+            forecast_overall = forecast_metrics[forecast_metrics['saison'] == 'Toutes']
+            fc_m1, fc_m2, fc_m3 = st.columns(3)
+            with fc_m1:
+                st.metric("ROC-AUC moyenne", f"{forecast_overall['roc_auc'].mean():.3f}")
+            with fc_m2:
+                st.metric("PR-AUC moyenne", f"{forecast_overall['pr_auc'].mean():.4f}",
+                          help="À comparer au taux de base (prévision aléatoire)")
+            with fc_m3:
+                st.metric("Taux de base", f"{forecast_overall['taux_base'].mean():.4f}")
+            
+            st.plotly_chart(create_forecast_figure(forecast_metrics), width='stretch')
+            st.dataframe(forecast_metrics, width='stretch', hide_index=True, height=300)
+        elif forecast_metrics is not None:
+            st.info("Période trop courte pour une validation à origine glissante (3 années minimum)")
+    
+    st.markdown("---")
+    
+    # ========== RÉGLAGE AUTOMATIQUE ==========
+    st.header("Réglage Automatique des Paramètres")
+    st.caption("Seuils, rayon, fenêtre et nombre minimal de petits feux qui distinguent le mieux les vrais "
+               "grands feux de pseudo événements appariés (J de Youden), vérifiés sur des années mises de côté")
+    
+    years_available = sorted(df_filtered['annee'].dropna().astype(int).unique())
+    tune_col1, tune_col2 = st.columns(2)
+    with tune_col1:
+        tuning_strategy = st.radio("Stratégie", ['halving', 'random', 'grid'], horizontal=True,
+                                   format_func={'halving': 'Successive halving', 'random': 'Aléatoire',
+                                                'grid': 'Grille complète'}.get, key='tuning_strategy')
+    with tune_col2:
+        tuning_holdout = st.multiselect("Années de test", years_available, default=years_available[-1:],
+                                        key='tuning_holdout')
+    
+    if st.button("Lancer le réglage", width='stretch', key="btn_tuning"):
+        with st.spinner('Table de paires et évaluation des candidats...'):
+            tuning = tune_parameters(df_filtered, tuning_strategy, holdout_years=tuning_holdout or None)
+    
+        ranking = tuning['ranking']
+        if len(ranking) > 0:
+            best = ranking.iloc[0]
+            tune_m1, tune_m2, tune_m3, tune_m4 = st.columns(4)
+            with tune_m1:
+                st.metric("Seuils (ha)", f"< {best['seuil_petit']:g} / ≥ {best['seuil_grand']:g}")
+            with tune_m2:
+                st.metric("Rayon / fenêtre", f"{best['rayon_km']:g} km / {best['fenetre_jours']:g} j")
+            with tune_m3:
+                st.metric("Petits feux minimum", int(best['min_petits_feux']))
+            with tune_m4:
+                st.metric("J apprentissage / test", f"{best['score_apprentissage']:.2f} / {best['score_test']:.2f}")
+            st.caption(f"{tuning['n_evaluations']} évaluations sur {tuning['n_candidates']} candidats, "
+                       f"{tuning['n_pairs']:,} paires, {tuning['seconds']:.1f} s")
+            st.dataframe(ranking, width='stretch', hide_index=True, height=300)
+        else:
+            st.info("Pas assez de grands feux pour évaluer les candidats")
+    
+    st.markdown("---")
+    
     # ========== ANALYSE DE CORRÉLATION ==========
     st.header("Analyse de Corrélation: Petits Feux → Grands Feux")
     
@@ -435,66 +909,89 @@ def main():
     - **Mutual Information** : Quantifie l'information partagée entre les deux types d'incendies
     """)
     
-    # Créer les visualisations de corrélation
-    with st.spinner('Calcul des corrélations en cours...'):
-        try:
-            correlation_fig = create_correlation_analysis_figure(df_filtered)
-            st.plotly_chart(correlation_fig, width='stretch')
-            
-            st.markdown("---")
-            
-            # Tableau récapitulatif
-            st.subheader("Résumé des Corrélations")
-            summary_df = create_correlation_summary_table(df_filtered)
-            
-            # Appliquer un style au tableau
-            st.dataframe(
-                summary_df,
-                width='stretch',
-                hide_index=True,
-                height=200
-            )
+    # Emplacement rempli à la fin du rendu, quand le calcul en arrière-plan est terminé
+    correlation_slot = st.empty()
+    correlation_slot.caption("Calcul des corrélations en arrière-plan...")
+    
+    st.markdown("---")
+    
+    # ========== PROCESSUS AUTO-EXCITANT ==========
+    st.header("Déclenchement Feu par Feu (Processus de Hawkes)")
+    st.caption("Chaque feu augmente temporairement la probabilité de nouveaux feux à proximité ; "
+               "le modèle estime combien de feux de chaque catégorie un feu déclenche en moyenne")
+    
+    hawkes_col1, hawkes_col2 = st.columns(2)
+    with hawkes_col1:
+        hawkes_cutoff_km = st.slider("Portée spatiale max. (km)", min_value=2, max_value=30, value=10,
+                                     key='hawkes_cutoff_km')
+    with hawkes_col2:
+        hawkes_max_lag = st.slider("Portée temporelle max. (jours)", min_value=7, max_value=180, value=60,
+                                   key='hawkes_max_lag')
+    
+    if st.button("Ajuster le modèle", width='stretch', key="btn_hawkes"):
+        with st.spinner('Maximisation de la vraisemblance en cours...'):
+            hawkes = fit_hawkes(df_filtered, cutoff_km=hawkes_cutoff_km, max_lag_days=hawkes_max_lag)
+        
+        if 'alpha' in hawkes:
+            hawkes_m1, hawkes_m2, hawkes_m3, hawkes_m4 = st.columns(4)
+            with hawkes_m1:
+                st.metric("Grands feux déclenchés par petit feu", f"{hawkes['alpha'].loc['Petit feu', 'Grand feu']:.4f}")
+            with hawkes_m2:
+                st.metric("Grands feux attribuables aux petits", f"{hawkes['share_big_from_small']:.1%}")
+            with hawkes_m3:
+                st.metric("Demi-vie de l'excitation", f"{hawkes['half_life_days']:.1f} j")
+            with hawkes_m4:
+                st.metric("Paires évaluées", f"{hawkes['n_pairs']:,}".replace(',', ' '))
             
-        except Exception as e:
-            st.error(f"Erreur lors du calcul des corrélations: {str(e)}")
-            st.warning("Vérifiez que vous avez suffisamment de données pour l'analyse de corrélation.")
+            st.plotly_chart(create_hawkes_figure(hawkes), width='stretch')
+            st.dataframe(hawkes['big_fires'], width='stretch', hide_index=True, height=300)
+        else:
+            st.info("Pas assez de feux pour ajuster le modèle")
     
     st.markdown("---")
     
     # ========== EXPORT ==========
     st.header("Export des Données")
     
-    export_col1, export_col2, export_col3 = st.columns(3)
+    export_col1, export_col2, export_col3, export_col4 = st.columns(4)
     
     with export_col1:
         st.subheader("Excel Complet")
         st.caption("5 feuilles : Grands feux, Analyses, Buffers, Corrélation, Explications")
-        if st.button("Générer Excel", width='stretch', key="btn_excel"):
-            # Générer le tableau de corrélation
+        excel_streaming = st.checkbox("Export volumineux (écriture en flux sur disque)", key='excel_streaming',
+                                      help="Mémoire constante, feuilles découpées au-delà de 1 048 576 lignes")
+        
+        def build_excel(path):
+            # Tableau de corrélation repris du calcul en arrière-plan
             try:
-                correlation_summary = create_correlation_summary_table(df_filtered)
+                correlation_summary = correlation_job.result()['summary']
             except:
                 correlation_summary = None
-            
-            excel_data = export_results(big_fires, analysis_results, correlation_summary)
-            st.download_button(
-                label="Télécharger Excel",
-                data=excel_data,
-                file_name=f"analyse_incendies_{annee_debut}_{annee_fin}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                width='stretch',
-                key="dl_excel"
-            )
+            if excel_streaming:
+                export_results_to_file(big_fires, analysis_results, correlation_summary, path=path)
+            else:
+                bytes_builder(lambda: export_results(big_fires, analysis_results, correlation_summary))(path)
+        
+        st.download_button(
+            label="Télécharger Excel",
+            data=deferred_download('xlsx', data_version, fig_params + (excel_streaming,), 'xlsx', build_excel),
+            file_name=f"analyse_incendies_{annee_debut}_{annee_fin}.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            width='stretch',
+            key="dl_excel"
+        )
     
     with export_col2:
         st.subheader("CSV Filtré")
         st.caption("Données par période sélectionnée")
-        csv = export_csv(df_filtered)
+        csv_gzip = st.checkbox("Compresser (gzip)", key='csv_gzip')
+        csv_ext = 'csv.gz' if csv_gzip else 'csv'
         st.download_button(
             label="Télécharger CSV",
-            data=csv,
-            file_name=f"incendies_filtres_{annee_debut}_{annee_fin}.csv",
-            mime="text/csv",
+            data=deferred_download('csv', data_version, class_params, csv_ext,
+                                   lambda path: write_csv(df_filtered, path, compress=csv_gzip)),
+            file_name=f"incendies_filtres_{annee_debut}_{annee_fin}.{csv_ext}",
+            mime="application/gzip" if csv_gzip else "text/csv",
             width='stretch',
             key="dl_csv"
         )
@@ -502,15 +999,114 @@ def main():
     with export_col3:
         st.subheader("Résultats Analyse")
         st.caption("Tableau récapitulatif des analyses")
-        csv_results = results_df.to_csv(index=False, sep=';')
         st.download_button(
             label="Télécharger Résultats",
-            data=csv_results,
+            data=deferred_download('resultats_csv', data_version, fig_params, 'csv',
+                                   lambda path: write_csv(results_df, path)),
             file_name=f"resultats_analyse_{annee_debut}_{annee_fin}.csv",
             mime="text/csv",
             width='stretch',
             key="dl_results"
         )
+    
+    with export_col4:
+        st.subheader("Features Précurseurs")
+        st.caption("Tous les feux, toutes années : comptes par rayon et fenêtre (Parquet)")
+        if st.button("Générer les features", width='stretch', key="btn_features"):
+            with st.spinner('Construction de la table de features...'):
+                features = load_or_build_features(
+                    classified_fires(source, seuil_petit, seuil_grand), source.dataset_id, seuil_petit, seuil_grand
+                )
+            st.download_button(
+                label="Télécharger Parquet",
+                data=features.to_parquet(),
+                file_name=f"features_precurseurs_{seuil_petit:g}_{seuil_grand:g}.parquet",
+                mime="application/vnd.apache.parquet",
+                width='stretch',
+                key="dl_features"
+            )
+    
+    # Formats colonnes (Python, QGIS) : types conservés, fichiers compacts
+    st.subheader("Formats Colonnes et SIG")
+    columnar_col1, columnar_col2, columnar_col3 = st.columns(3)
+    
+    with columnar_col1:
+        columnar_format = st.radio("Format", ['Parquet', 'Arrow IPC'], horizontal=True, key='columnar_format')
+        columnar_export, columnar_ext, columnar_mime = (
+            (export_parquet, 'parquet', 'application/vnd.apache.parquet') if columnar_format == 'Parquet'
+            else (export_arrow, 'arrow', 'application/vnd.apache.arrow.file')
+        )
+    
+    with columnar_col2:
+        st.download_button(
+            label=f"Feux filtrés ({columnar_format})",
+            data=deferred_download(columnar_ext, data_version, class_params, columnar_ext,
+                                   bytes_builder(lambda: columnar_export(df_filtered))),
+            file_name=f"incendies_filtres_{annee_debut}_{annee_fin}.{columnar_ext}",
+            mime=columnar_mime,
+            width='stretch',
+            key="dl_columnar_fires"
+        )
+        st.download_button(
+            label=f"Résultats ({columnar_format})",
+            data=deferred_download(f'resultats_{columnar_ext}', data_version, fig_params, columnar_ext,
+                                   bytes_builder(lambda: columnar_export(big_fire_table(big_fires, analysis_results)))),
+            file_name=f"resultats_analyse_{annee_debut}_{annee_fin}.{columnar_ext}",
+            mime=columnar_mime,
+            width='stretch',
+            key="dl_columnar_results"
+        )
+    
+    with columnar_col3:
+        st.caption(f"Grands feux et buffers de {buffer_radius} km (Lambert-93)")
+        st.download_button(
+            label="GeoParquet",
+            data=deferred_download('geoparquet', data_version, fig_params, 'parquet',
+                                   bytes_builder(lambda: export_geoparquet(big_fires, analysis_results, buffer_radius))),
+            file_name=f"grands_feux_buffers_{annee_debut}_{annee_fin}.parquet",
+            mime="application/vnd.apache.parquet",
+            width='stretch',
+            key="dl_geoparquet"
+        )
+        if HAS_GEOPANDAS:
+            st.download_button(
+                label="GeoPackage",
+                data=deferred_download('gpkg', data_version, fig_params, 'gpkg',
+                                       bytes_builder(lambda: export_geopackage(big_fires, analysis_results,
+                                                                               buffer_radius))),
+                file_name=f"grands_feux_buffers_{annee_debut}_{annee_fin}.gpkg",
+                mime="application/geopackage+sqlite3",
+                width='stretch',
+                key="dl_gpkg"
+            )
+        else:
+            st.caption("GeoPackage : geopandas requis")
+    
+    # ========== SECTIONS LENTES (résultats des calculs en arrière-plan) ==========
+    # Points chauds et Moran encore en calcul au passage de leur section : emplacements remplis ici
+    render_pending()
+    
+    # ========== CORRÉLATIONS (résultat du calcul en arrière-plan) ==========
+    with correlation_slot.container():
+        try:
+            with st.spinner('Calcul des corrélations en cours...'):
+                correlation = correlation_job.result()
+            st.plotly_chart(correlation['figure'], width='stretch')
+            
+            st.markdown("---")
+            
+            # Tableau récapitulatif
+            st.subheader("Résumé des Corrélations")
+            st.dataframe(
+                correlation['summary'],
+                width='stretch',
+                hide_index=True,
+                height=200
+            )
+            
+        except Exception as e:
+            st.error(f"Erreur lors du calcul des corrélations: {str(e)}")
+            st.warning("Vérifiez que vous avez suffisamment de données pour l'analyse de corrélation.")
 
 main()
 
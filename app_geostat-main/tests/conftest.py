@@ -0,0 +1,25 @@
+"""
+Jeu de feux synthétique partagé par les tests
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def synthetic_fires():
+    """Fabrique de feux aléatoires triés par date, paramétrée par taille, graine, période, emprise et catégories"""
+    def build(n=600, seed=0, start='2020-01-01', years=1, extent_m=40000, probabilities=(0.75, 0.17, 0.08)):
+        rng = np.random.default_rng(seed)
+        categories = rng.choice(['Petit feu', 'Feu moyen', 'Grand feu'], size=n, p=list(probabilities))
+        minutes = np.sort(rng.integers(0, years * 365 * 24 * 60, n))
+        return pd.DataFrame({
+            'date_alerte': pd.Timestamp(start) + pd.to_timedelta(minutes, unit='min'),
+            'x': 900000 + rng.uniform(0, extent_m, n),
+            'y': 6300000 + rng.uniform(0, extent_m, n),
+            'categorie': categories,
+            'surface_ha': np.where(categories == 'Grand feu', 50.0, 0.5),
+            'commune': 'Test'
+        })
+    return build
@@ -0,0 +1,42 @@
+"""
+Une tâche remplacée n'est annulée que si aucune autre session ne l'attend
+"""
+
+import threading
+
+from modules.background import BackgroundJobs
+
+
+def _blocked_pool():
+    """Pool à un seul thread occupé : les tâches suivantes restent en attente"""
+    jobs = BackgroundJobs(max_workers=1)
+    gate = threading.Event()
+    jobs.submit('occupe', gate.wait, subscriber='x')
+    return jobs, gate
+
+
+def test_shared_job_survives_one_session_leaving():
+    jobs, gate = _blocked_pool()
+    shared = jobs.submit('a', lambda: 'A', subscriber='s1')
+    assert jobs.submit('a', lambda: 'autre', subscriber='s2') is shared
+
+    # s1 change de paramètres : s2 attend toujours 'a'
+    jobs.submit('b', lambda: 'B', subscriber='s1', replaces='a')
+    assert not shared.cancelled()
+
+    gate.set()
+    assert shared.result(timeout=5) == 'A'
+    assert jobs.cancelled == 0
+
+
+def test_orphan_job_is_cancelled():
+    jobs, gate = _blocked_pool()
+    stale = jobs.submit('a', lambda: 'A', subscriber='s1')
+    fresh = jobs.submit('b', lambda: 'B', subscriber='s1', replaces='a')
+    assert stale.cancelled()
+    assert jobs.cancelled == 1
+
+    gate.set()
+    assert fresh.result(timeout=5) == 'B'
+    # La clé annulée est relancée si une session la redemande
+    assert jobs.submit('a', lambda: 'A', subscriber='s2').result(timeout=5) == 'A'
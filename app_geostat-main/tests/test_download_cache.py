@@ -0,0 +1,38 @@
+"""
+Un fichier épinglé survit à l'éviction, un constructeur en échec ne laisse pas de verrou
+"""
+
+import pytest
+
+from modules.download_cache import DownloadCache
+
+
+def _writer(payload):
+    def build(path):
+        with open(path, 'wb') as f:
+            f.write(payload)
+    return build
+
+
+def test_pinned_file_is_not_evicted(tmp_path):
+    cache = DownloadCache(root=str(tmp_path), max_bytes=150)
+    with cache.pinned('a', 'bin', _writer(b'a' * 100)) as path_a:
+        # Construction concurrente au-delà du budget : 'a' est le plus ancien mais épinglé
+        assert cache.read('b', 'bin', _writer(b'b' * 100)) == b'b' * 100
+        with open(path_a, 'rb') as f:
+            assert f.read() == b'a' * 100
+    # Plus rien d'épinglé : le budget est de nouveau respecté
+    assert cache.stats()['entries'] == 1
+    assert cache.stats()['bytes'] == 100
+
+
+def test_failed_builder_releases_build_lock(tmp_path):
+    cache = DownloadCache(root=str(tmp_path))
+
+    def fail(path):
+        raise RuntimeError('échec')
+
+    with pytest.raises(RuntimeError):
+        cache.read('a', 'bin', fail)
+    assert cache._building == {}
+    assert cache.read('a', 'bin', _writer(b'ok')) == b'ok'
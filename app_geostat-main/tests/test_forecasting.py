@@ -0,0 +1,37 @@
+"""
+Matrice de prévision : budget mémoire et résultats identiques en série et en parallèle
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.forecasting import FEATURE_COLUMNS, MatrixTooLargeError, build_forecast_matrix, rolling_origin_backtest
+
+
+@pytest.fixture
+def fires(synthetic_fires):
+    return synthetic_fires(n=3000, start='2018-01-01', years=4, extent_m=60000, probabilities=(0.7, 0.2, 0.1))
+
+
+def test_matrix_layout(fires):
+    matrix = build_forecast_matrix(fires, cell_size_m=20000, horizon_days=14)
+    assert matrix['X'].dtype == np.float32
+    assert matrix['X'].shape == (len(matrix['dates']) * matrix['n_cells'], len(FEATURE_COLUMNS))
+    assert matrix['columns'] == FEATURE_COLUMNS
+    # Historique des grands feux du voisinage : cumul croissant dans le temps pour chaque cellule
+    historique = matrix['X'][:, FEATURE_COLUMNS.index('grands_historique')].reshape(-1, matrix['n_cells'])
+    assert (np.diff(historique, axis=0) >= 0).all()
+
+
+def test_matrix_budget(fires):
+    with pytest.raises(MatrixTooLargeError):
+        build_forecast_matrix(fires, cell_size_m=20000, max_bytes=1024)
+
+
+def test_parallel_backtest_matches_serial(fires):
+    matrix = build_forecast_matrix(fires, cell_size_m=20000, horizon_days=14)
+    serial = rolling_origin_backtest(matrix, 'logistic', n_jobs=1).drop(columns='secondes')
+    parallel = rolling_origin_backtest(matrix, 'logistic', n_jobs=2).drop(columns='secondes')
+    assert len(serial) > 0
+    pd.testing.assert_frame_equal(serial, parallel)
@@ -0,0 +1,27 @@
+"""
+category_counts (recherches dichotomiques) donne les mêmes comptes que la classification np.select
+"""
+
+import numpy as np
+import pandas as pd
+
+from modules.core.ingest import FIRE_CATEGORIES, category_counts, classify_fires
+
+
+def _select_counts(surface, seuil_petit, seuil_grand):
+    categories = classify_fires(pd.DataFrame({'surface_ha': surface}), seuil_petit, seuil_grand)['categorie']
+    return {c: int((categories == c).sum()) for c in FIRE_CATEGORIES[:3]}
+
+
+def test_counts_match_classification_for_random_thresholds():
+    rng = np.random.default_rng(0)
+    # Surfaces arrondies : beaucoup d'ex aequo, seuils souvent égaux à une surface
+    surface = np.round(rng.lognormal(0, 2, 2000), 1)
+    sorted_surface = np.sort(surface)
+    pairs = [tuple(rng.choice(surface, 2)) for _ in range(200)]
+    pairs += [(a, a) for a in rng.choice(surface, 20)]
+    pairs += [(5.0, 1.0), (1.0, 5.0), (0.0, 0.0), (1e9, 0.0)]
+
+    for seuil_petit, seuil_grand in pairs:
+        assert category_counts(sorted_surface, seuil_petit, seuil_grand) == \
+            _select_counts(surface, seuil_petit, seuil_grand), (seuil_petit, seuil_grand)
@@ -0,0 +1,17 @@
+"""
+Le modèle nul renvoie un résultat vide, sans erreur, quand aucun grand feu n'est daté
+"""
+
+import numpy as np
+import pandas as pd
+
+from modules.null_model import precursor_null_model
+
+
+def test_no_big_fires(synthetic_fires):
+    df = synthetic_fires(n=50, extent_m=20000, probabilities=(1, 0, 0))
+    for big_fires in (df.iloc[:0], df.iloc[:3].assign(date_alerte=pd.NaT)):
+        result = precursor_null_model(df, big_fires, 5, 30, 3, n_replicates=10, n_jobs=1)
+        assert result['n_big_fires'] == 0
+        assert len(result['per_fire']) == 0
+        assert np.isnan(result['enrichment_ratio'])
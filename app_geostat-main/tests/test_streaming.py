@@ -0,0 +1,44 @@
+"""
+Le détecteur en ligne compte les mêmes feux que analyze_fires_before_big_fire
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.core.precursors import analyze_fires_before_big_fire
+from modules.streaming import PrecursorDetector, replay_events
+
+
+@pytest.mark.parametrize('radius_km, same_day', [(2, False), (5, False), (20, False), (5, True)])
+def test_big_fire_counts_match_batch_analysis(synthetic_fires, radius_km, same_day):
+    # Petite emprise : les voisinages carré 3×3 et cercle diffèrent souvent
+    df = synthetic_fires()
+    if same_day:
+        # Dates arrondies au jour : feux simultanés au grand feu, exclus de sa fenêtre [t - w, t)
+        df['date_alerte'] = df['date_alerte'].dt.floor('D')
+    window_days, min_fires = 30, 3
+    detector = PrecursorDetector(radius_km, window_days, min_fires)
+    for _ in detector.run(replay_events(df)):
+        pass
+
+    big_fires = df[df['categorie'] == 'Grand feu'].sort_values('date_alerte', kind='stable')
+    assert len(detector.big_fires) == len(big_fires) > 0
+    for online, (_, big_fire) in zip(detector.big_fires, big_fires.iterrows()):
+        batch = analyze_fires_before_big_fire(df, big_fire, window_days, radius_km, min_fires)
+        assert online['small_fires_count'] == batch['small_fires_count']
+        assert online['medium_fires_count'] == batch['medium_fires_count']
+        assert online['condition_met'] == batch['condition_met']
+
+
+def test_alert_counts_stay_within_radius(synthetic_fires):
+    df = synthetic_fires(seed=1)
+    detector = PrecursorDetector(5, 30, 2, cooldown_days=0)
+    alerts = list(detector.run(replay_events(df)))
+    assert alerts
+    small = df[df['categorie'] == 'Petit feu']
+    for alert in alerts:
+        start = alert['date_alerte'] - pd.Timedelta(days=30)
+        in_window = small[(small['date_alerte'] >= start) & (small['date_alerte'] <= alert['date_alerte'])]
+        distance_km = np.sqrt((in_window['x'] - alert['x']) ** 2 + (in_window['y'] - alert['y']) ** 2) / 1000
+        assert alert['small_fires_count'] == int((distance_km <= 5).sum())